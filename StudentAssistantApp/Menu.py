@@ -1,3 +1,4 @@
+import bisect
 import tkinter as tk
 from tkinter import messagebox, ttk
 from datetime import datetime, timedelta
@@ -5,6 +6,7 @@ import gpa_calculator
 import calendar_app
 import simple_reminder_app
 import room_booking
+import shared_store
 
 
 # --- Main Application Class ---
@@ -16,8 +18,24 @@ class TARUMTApp:
         self.root.configure(bg="#e0f7fa") # Light cyan background
 
         self.frames = {}
+        # The apps share the data loaded here (see shared_store), and the
+        # status line follows their changes.
+        self.status_var = tk.StringVar()
+        self.events = shared_store.calendar_events()
+        self.reminders = shared_store.reminders()
+        self.events.subscribe(self._update_status)
+        self.reminders.subscribe(self._update_status)
+        self._update_status()
         self._create_main_menu()
 
+    def _update_status(self, change=None, item=None):
+        upcoming = self.events.next_events(datetime.now(), 1)
+        next_event = f"{upcoming[0][0]} {upcoming[0][1]} {upcoming[0][2]}" if upcoming else "none"
+        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        order = self.reminders.order  # sorted (time, id)
+        due = len(order) - bisect.bisect_left(order, (now,))
+        self.status_var.set(f"Next event: {next_event}   |   Upcoming reminders: {due}")
+
     def _create_main_menu(self):
         # Clear existing content
         for widget in self.root.winfo_children():
@@ -27,6 +45,7 @@ class TARUMTApp:
         main_frame.pack(pady=50, padx=50, fill="both", expand=True)
 
         tk.Label(main_frame, text="Student Intranet", font=("Arial", 24, "bold"), bg="#e0f7fa", fg="#00796b").pack(pady=20)
+        tk.Label(main_frame, textvariable=self.status_var, font=("Arial", 11), bg="#e0f7fa", fg="#004d40").pack()
 
         button_style = {"font": ("Arial", 16), "bg": "#4db6ac", "fg": "white", "width": 25, "height": 2, "relief": "raised", "bd": 5}
 
@@ -0,0 +1,84 @@
+"""Per-date occupancy bitmaps for the room availability chart.
+
+Each date maps to one int with a bit per (venue, time slot) cell, bit
+number venue_index * len(time_slots) + slot_index, where time_slots is the
+grid of (start_time, end_time) steps. A booking sets the bit of every
+step its interval overlaps. A date's bitmap is built once from that
+date's bookings the first time it is asked for and is then kept current
+by booked()/released() as bookings change, so drawing a day, or a week
+of days, never looks at the full booking list.
+"""
+import bisect
+from datetime import datetime, timedelta
+
+
+class AvailabilityMatrix:
+    def __init__(self, venues, time_slots, bookings_on):
+        # bookings_on(date_str) returns the bookings for one date.
+        self.venues = list(venues)
+        self.time_slots = list(time_slots)
+        self.slot_starts = [start for start, _ in self.time_slots]
+        self.venue_pos = {venue: i for i, venue in enumerate(self.venues)}
+        self.slot_pos = {slot: i for i, slot in enumerate(self.time_slots)}
+        self.bookings_on = bookings_on
+        self.rows = {}
+
+    def bit(self, venue, time_slot):
+        """Return the mask for one cell, or 0 if the venue or slot is not on the chart."""
+        venue_idx = self.venue_pos.get(venue)
+        slot_idx = self.slot_pos.get(time_slot)
+        if venue_idx is None or slot_idx is None:
+            return 0
+        return 1 << (venue_idx * len(self.time_slots) + slot_idx)
+
+    def mask(self, booking):
+        """Return the bits of every grid step the booking's interval overlaps."""
+        venue_idx = self.venue_pos.get(booking["venue"])
+        if venue_idx is None:
+            return 0
+        # Steps [first, last) are those starting before the booking ends and
+        # ending after it starts.
+        first = max(0, bisect.bisect_right(self.slot_starts, booking["start_time"]) - 1)
+        if first < len(self.time_slots) and self.time_slots[first][1] <= booking["start_time"]:
+            first += 1
+        last = bisect.bisect_left(self.slot_starts, booking["end_time"])
+        if last <= first:
+            return 0
+        offset = venue_idx * len(self.time_slots)
+        return ((1 << (last - first)) - 1) << (offset + first)
+
+    def bitmap(self, date_str):
+        row = self.rows.get(date_str)
+        if row is None:
+            row = 0
+            for booking in self.bookings_on(date_str):
+                row |= self.mask(booking)
+            self.rows[date_str] = row
+        return row
+
+    def is_booked(self, date_str, venue, time_slot):
+        return bool(self.bitmap(date_str) & self.bit(venue, time_slot))
+
+    def week(self, date_str):
+        """Return [(date_str, bitmap)] for the Monday-to-Sunday week containing date_str."""
+        day = datetime.strptime(date_str, "%Y-%m-%d").date()
+        monday = day - timedelta(days=day.weekday())
+        dates = [(monday + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+        return [(d, self.bitmap(d)) for d in dates]
+
+    def free_count(self, date_str):
+        return len(self.venues) * len(self.time_slots) - bin(self.bitmap(date_str)).count("1")
+
+    def reset(self):
+        """Forget every bitmap; each date is rebuilt from the store when next drawn."""
+        self.rows = {}
+
+    def booked(self, booking):
+        # Dates that were never drawn are built from the store when first needed.
+        if booking["date"] in self.rows:
+            self.rows[booking["date"]] |= self.mask(booking)
+
+    def released(self, booking):
+        # Bookings never overlap, so no other booking shares these bits.
+        if booking["date"] in self.rows:
+            self.rows[booking["date"]] &= ~self.mask(booking)
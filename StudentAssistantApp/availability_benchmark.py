@@ -0,0 +1,102 @@
+"""Widget churn benchmark for room_booking.AvailabilityChart.
+
+    python availability_benchmark.py [--venues 20] [--open 08:00] [--close 24:00] [--refreshes 200]
+
+Drives the chart with stand-in widgets, so it needs no display: each
+refresh shows a date with a random share of the cells booked, and the run
+reports the labels created and reconfigured per refresh. It exits with
+status 1 if any refresh after the first creates a widget, since the grid
+should only be built once per shape.
+"""
+import argparse
+import random
+import sys
+import time
+
+import room_booking
+from room_config import RoomConfig
+
+
+class StubWidget:
+    configured = 0
+
+    def __init__(self, master=None, **options):
+        self.children = []
+        if master is not None:
+            master.children.append(self)
+
+    def grid(self, **options):
+        pass
+
+    def bind(self, sequence, handler):
+        pass
+
+    def configure(self, **options):
+        StubWidget.configured += 1
+
+    def destroy(self):
+        pass
+
+    def winfo_children(self):
+        return list(self.children)
+
+    def grid_columnconfigure(self, index, **options):
+        pass
+
+    def grid_rowconfigure(self, index, **options):
+        pass
+
+
+class StubTtk:
+    Label = StubWidget
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count widgets the availability chart creates per refresh.")
+    parser.add_argument("--venues", type=int, default=20)
+    parser.add_argument("--open", default="08:00")
+    parser.add_argument("--close", default="24:00")
+    parser.add_argument("--refreshes", type=int, default=200)
+    parser.add_argument("--booked", type=float, default=0.3, help="share of cells booked on each date")
+    args = parser.parse_args(argv)
+
+    room_booking.ttk = StubTtk  # the chart makes its labels through ttk.Label
+    config = RoomConfig([{"name": f"Room {i + 1}", "open": args.open, "close": args.close}
+                         for i in range(args.venues)])
+    chart = room_booking.AvailabilityChart(StubWidget(), lambda venue, date_str, time_slot: "")
+    rng = random.Random(1)
+
+    def refresh(booked):
+        created, configured = chart.widgets_created, StubWidget.configured
+        started = time.perf_counter()
+        chart.render(config.venues, config.time_slots, "2030-01-01",
+                     lambda venue, time_slot: "booked" if (venue, time_slot) in booked else "available")
+        return chart.widgets_created - created, StubWidget.configured - configured, time.perf_counter() - started
+
+    cells = [(venue, time_slot) for venue in config.venues for time_slot in config.time_slots]
+    booked = set()
+    first = refresh(booked)
+    print(f"{len(config.venues)} venues x {len(config.time_slots)} slots")
+    print(f"  first draw       created {first[0]:5}  reconfigured {first[1]:5}  {first[2] * 1000:7.2f} ms")
+    runs = {"unchanged": [], "one booking": [], "new date": []}
+    for i in range(args.refreshes):
+        kind = ("unchanged", "one booking", "new date")[i % 3]
+        if kind == "one booking":
+            booked ^= {rng.choice(cells)}
+        elif kind == "new date":
+            booked = {cell for cell in cells if rng.random() < args.booked}
+        runs[kind].append(refresh(booked))
+    created_later = 0
+    for kind, results in runs.items():
+        created = sum(r[0] for r in results)
+        created_later += created
+        print(f"  {kind:15}  created {created / len(results):5.1f}  reconfigured "
+              f"{sum(r[1] for r in results) / len(results):5.1f}  "
+              f"{sum(r[2] for r in results) / len(results) * 1000:7.2f} ms  (mean of {len(results)})")
+    if created_later:
+        print(f"FAIL: {created_later} widgets created after the first draw")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
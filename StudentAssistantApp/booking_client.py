@@ -0,0 +1,121 @@
+"""Client for booking_server.py with the same methods as BookingService.
+
+The Tk app can use a BookingClient in place of a local BookingService to
+book through a shared server. Inputs are checked locally first for quick
+feedback; the server checks them again before storing anything.
+"""
+import http.client
+import json
+from urllib.parse import urlencode, urlsplit, quote
+
+from booking_service import BookingError, validate_booking
+from room_config import RoomConfig
+
+
+class BookingClient:
+    def __init__(self, server_url="http://127.0.0.1:8765"):
+        url = urlsplit(server_url)
+        self.server_url = server_url
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or 80
+        self.conn = None
+        self.room_config = None
+
+    def load(self):
+        config = self._request("GET", "/config")
+        self.room_config = RoomConfig(config["venues"], config.get("slot_minutes", 60))
+        return []  # the server reports its own load problems
+
+    def _request(self, method, path, body=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        # A kept-alive connection the server has since closed fails on first
+        # use, so a request gets one retry on a fresh connection. A GET is
+        # always safe to send again; a write is retried only if it could not
+        # be sent on a reused connection, since once sent the server may have
+        # applied it even though no answer came back.
+        for attempt in (1, 2):
+            reused = self.conn is not None
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+            sent = False
+            try:
+                self.conn.request(method, path, payload, headers)
+                sent = True
+                response = self.conn.getresponse()
+                answer = json.loads(response.read() or b"null")
+                break
+            except (OSError, http.client.HTTPException, ValueError):
+                self.conn.close()
+                self.conn = None
+                if attempt == 2 or not (method == "GET" or (reused and not sent)):
+                    raise BookingError(503, "Server Unavailable",
+                                       f"Could not reach the booking server at {self.server_url}.")
+        if response.status >= 400:
+            answer = answer if isinstance(answer, dict) else {}
+            raise BookingError(response.status, answer.get("title", "Server Error"),
+                               answer.get("message", f"The server answered {response.status}."))
+        return answer
+
+    def save(self):
+        # The server saves; nothing is held here.
+        pass
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def validate(self, booking):
+        validate_booking(self.room_config, booking)
+
+    # Queries
+
+    def get(self, booking_id):
+        try:
+            return self._request("GET", f"/bookings/{quote(booking_id)}")
+        except BookingError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def page(self, offset, limit):
+        return self._request("GET", "/bookings?" + urlencode({"offset": offset, "limit": limit}))
+
+    def on_date(self, date_str):
+        return self._request("GET", "/bookings?" + urlencode({"date": date_str}))
+
+    def for_venue(self, venue):
+        return self._request("GET", "/bookings?" + urlencode({"venue": venue}))
+
+    def by_name(self, name):
+        return self._request("GET", "/bookings?" + urlencode({"name": name}))
+
+    def find_conflict(self, venue, date_str, start_time, end_time, ignore_id=None):
+        query = {"venue": venue, "date": date_str, "start_time": start_time, "end_time": end_time}
+        if ignore_id is not None:
+            query["ignore_id"] = ignore_id
+        return self._request("GET", "/overlap?" + urlencode(query))["booking"]
+
+    def changes_since(self, version):
+        path = "/changes" if version is None else f"/changes?since={version}"
+        answer = self._request("GET", path)
+        changes = answer["changes"]
+        if changes is not None:
+            changes = [tuple(change) for change in changes]
+        return answer["version"], changes
+
+    # Writes
+
+    def book(self, fields):
+        return self._request("POST", "/bookings", fields)
+
+    def book_many(self, bookings, skip_conflicts=False):
+        answer = self._request("POST", "/bookings/batch", {"bookings": bookings, "skip_conflicts": skip_conflicts})
+        return answer["booked"], [tuple(conflict) for conflict in answer["conflicts"]]
+
+    def update(self, booking_id, changes):
+        return self._request("PUT", f"/bookings/{quote(booking_id)}", changes)
+
+    def cancel(self, booking_id):
+        return self._request("DELETE", f"/bookings/{quote(booking_id)}")
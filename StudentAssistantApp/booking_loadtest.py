@@ -0,0 +1,158 @@
+"""Load generator for booking_server.py.
+
+    python booking_loadtest.py [--url http://127.0.0.1:8765] [--clients 20] [--seconds 10]
+
+Without --url it starts a server of its own on a temporary bookings file
+and stops it afterwards. Each client keeps one connection open and sends a
+mix of bookings, cancellations of its own bookings and queries, then the
+run reports requests/sec and latency percentiles for each kind of request.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode, urlsplit
+
+# Share of each request kind; the rest are queries.
+BOOK_SHARE = 0.2
+CANCEL_SHARE = 0.1
+
+
+class Connection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Content-Length: {len(payload)}\r\n\r\n").encode("latin-1") + payload)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def client(host, port, config, deadline, latencies, statuses, seed):
+    rng = random.Random(seed)
+    conn = Connection(host, port)
+    own = []
+    venues = config["venues"]
+    slot = timedelta(minutes=config.get("slot_minutes", 60))
+    try:
+        while time.perf_counter() < deadline:
+            day = (date.today() + timedelta(days=rng.randint(1, 60))).isoformat()
+            venue = rng.choice(venues)
+            roll = rng.random()
+            if roll < BOOK_SHARE:
+                kind = "book"
+                opening = datetime.strptime(venue["open"], "%H:%M")
+                steps = int((datetime.strptime(venue["close"], "%H:%M") - opening) / slot)
+                first = rng.randrange(steps)
+                length = rng.randint(1, min(2, steps - first))
+                body = {"venue": venue["name"], "date": day, "name": f"load-{seed}",
+                        "start_time": (opening + first * slot).strftime("%H:%M"),
+                        "end_time": (opening + (first + length) * slot).strftime("%H:%M")}
+                request = ("POST", "/bookings", body)
+            elif roll < BOOK_SHARE + CANCEL_SHARE and own:
+                kind = "cancel"
+                request = ("DELETE", f"/bookings/{own.pop(rng.randrange(len(own)))}", None)
+            else:
+                kind = "query"
+                request = ("GET", "/bookings?" + urlencode({"date": day}), None)
+            started = time.perf_counter()
+            status, answer = await conn.request(*request)
+            latencies.setdefault(kind, []).append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if kind == "book" and status == 201:
+                own.append(answer["id"])
+    finally:
+        conn.close()
+
+
+async def wait_for_server(host, port, timeout=10):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            conn = Connection(host, port)
+            status, config = await conn.request("GET", "/config")
+            conn.close()
+            return config
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run(host, port, clients, seconds):
+    config = await wait_for_server(host, port)
+    latencies, statuses = {}, {}
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, config, started + seconds, latencies, statuses, seed)
+                           for seed in range(clients)))
+    elapsed = time.perf_counter() - started
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total} requests from {clients} clients in {elapsed:.1f}s: {total / elapsed:.0f} req/s")
+    for kind, values in sorted(latencies.items()):
+        values.sort()
+        print(f"  {kind:6} {len(values):7} requests  p50 {percentile(values, 0.5) * 1000:6.2f} ms"
+              f"  p99 {percentile(values, 0.99) * 1000:6.2f} ms")
+    everything = sorted(value for values in latencies.values() for value in values)
+    print(f"  all    {total:7} requests  p50 {percentile(everything, 0.5) * 1000:6.2f} ms"
+          f"  p99 {percentile(everything, 0.99) * 1000:6.2f} ms")
+    print("  statuses: " + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send mixed booking traffic to a booking server.")
+    parser.add_argument("--url", help="server to test; by default a temporary one is started")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8766, help="port for the temporary server")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        url = urlsplit(args.url)
+        asyncio.run(run(url.hostname, url.port or 80, args.clients, args.seconds))
+        return
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as workdir:
+        server = subprocess.Popen([sys.executable, os.path.join(here, "booking_server.py"),
+                                   "--port", str(args.port), "--config", os.path.join(here, "rooms.json"),
+                                   os.path.join(workdir, "bookings.json")],
+                                  stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(run("127.0.0.1", args.port, args.clients, args.seconds))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Conflict lookup benchmark for BookingService.find_conflict.
+
+    python booking_lookup_benchmark.py [--sizes 1000,10000,100000,200000] [--lookups 20000] [--sqlite]
+
+Fills a temporary store, venue by venue and day by day, up to each size in
+turn, and times find_conflict on random (venue, date, slot) queries over
+the days filled so far. The lookup is an index probe, so the time per
+lookup should stay about the same as the store grows.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from booking_service import BookingService
+from booking_store import open_store
+from room_config import RoomConfig
+
+VENUES = 50
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time conflict checks as the number of bookings grows.")
+    parser.add_argument("--sizes", default="1000,10000,100000,200000")
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--sqlite", action="store_true", help="use the SQLite store instead of JSON")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    config = RoomConfig([{"name": f"Room {i + 1}", "open": "09:00", "close": "17:00"} for i in range(VENUES)])
+    per_day = VENUES * len(config.time_slots)
+    first_day = date.today() + timedelta(days=1)
+    rng = random.Random(1)
+
+    def booking(n):
+        day, rest = divmod(n, per_day)
+        venue, slot = divmod(rest, len(config.time_slots))
+        start_time, end_time = config.time_slots[slot]
+        return {"venue": config.venues[venue], "date": (first_day + timedelta(days=day)).isoformat(),
+                "start_time": start_time, "end_time": end_time, "name": f"Student {n % 997}"}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        service = BookingService(open_store(os.path.join(workdir, "bookings.db" if args.sqlite else "bookings.json")),
+                                 config)
+        service.load()
+        booked = 0
+        for size in sizes:
+            started = time.perf_counter()
+            service.book_many([booking(n) for n in range(booked, size)])
+            fill = time.perf_counter() - started
+            booked = size
+            days = -(-size // per_day)
+            queries = []
+            for _ in range(args.lookups):
+                start_time, end_time = rng.choice(config.time_slots)
+                queries.append((rng.choice(config.venues), (first_day + timedelta(days=rng.randrange(days))).isoformat(),
+                                start_time, end_time))
+            hits = 0
+            started = time.perf_counter()
+            for query in queries:
+                if service.find_conflict(*query) is not None:
+                    hits += 1
+            elapsed = time.perf_counter() - started
+            print(f"{size:8} bookings  {elapsed / len(queries) * 1e6:7.2f} us/lookup  "
+                  f"({hits} of {len(queries)} booked; filled in {fill:.1f} s)")
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""HTTP/JSON API for BookingService, so many clients can book at once.
+
+    python booking_server.py [--host 127.0.0.1] [--port 8765] [bookings.json]
+
+Endpoints (bodies and answers are JSON):
+
+    GET    /config                      venues, hours and slot length
+    GET    /bookings?offset=0&limit=200 one page of bookings
+    GET    /bookings?date=YYYY-MM-DD    bookings on a date (also venue=, name=)
+    GET    /bookings/<id>               one booking
+    GET    /overlap?venue=&date=&start_time=&end_time=[&ignore_id=]
+                                        {"booking": overlapping booking or null}
+    GET    /changes?since=<version>     {"version", "changes": [[old, new]] or null}
+    POST   /bookings                    book one booking
+    POST   /bookings/batch              {"bookings": [...], "skip_conflicts": false}
+                                        -> {"booked": [...], "conflicts": [[booking, clash]]}
+    PUT    /bookings/<id>               change a booking
+    DELETE /bookings/<id>               cancel a booking
+
+Errors answer with the BookingError status and {"title", "message"}; a
+malformed request answers 400, and a failure the service did not expect
+answers 500 without dropping the connection.
+
+The service and its store are only touched from one worker thread, so the
+event loop keeps reading requests while a write waits on the disk, and
+every service call sees the store between writes, never during one.
+Writes also queue on an asyncio lock per venue, so the writes to one venue
+are applied one at a time in the order they arrived, however many clients
+send them.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from booking_service import BOOKING_INPUTS, BookingError, BookingService, not_found
+from booking_store import open_store
+from room_config import RoomConfig
+
+MAX_BODY = 1 << 20
+
+
+class BadRequest(Exception):
+    pass
+
+
+def check_fields(fields):
+    """Raise BadRequest unless fields is an object whose booking inputs are strings."""
+    if not isinstance(fields, dict):
+        raise BadRequest("Expected a booking object.")
+    for field in BOOKING_INPUTS:
+        if field in fields and not isinstance(fields[field], str):
+            raise BadRequest(f"{field} must be a string.")
+
+
+class BookingServer:
+    def __init__(self, service):
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.venue_locks = collections.defaultdict(asyncio.Lock)
+        self.server = None
+
+    def run(self, action, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, action, *args)
+
+    async def start(self, host="127.0.0.1", port=8765):
+        for problem in await self.run(self.service.load):
+            print(problem)
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.run(self.service.save)
+        await self.run(self.service.close)
+        self.executor.shutdown()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode("latin-1").split()
+                    headers = await self.read_headers(reader)
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        raise BadRequest("Request body too large.")
+                    body = await reader.readexactly(length) if length else b""
+                    status, answer = await self.dispatch(method, target, body)
+                except (BadRequest, ValueError) as e:
+                    status, answer = 400, {"title": "Bad Request", "message": str(e)}
+                    headers = {"connection": "close"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self.write_response(writer, status, answer, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def read_headers(reader):
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    def write_response(writer, status, answer, keep_alive):
+        body = json.dumps(answer).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        data = json.loads(body) if body else {}
+        if not isinstance(data, dict):
+            raise BadRequest("Expected a JSON object.")
+        try:
+            if method == "GET":
+                return 200, await self.query(parts, query)
+            if parts == ["bookings"] and method == "POST":
+                return 201, await self.book(data)
+            if parts == ["bookings", "batch"] and method == "POST":
+                return 201, await self.book_many(data)
+            if len(parts) == 2 and parts[0] == "bookings" and method == "PUT":
+                return 200, await self.update(parts[1], data)
+            if len(parts) == 2 and parts[0] == "bookings" and method == "DELETE":
+                return 200, await self.cancel(parts[1])
+        except BookingError as e:
+            return e.status, {"title": e.title, "message": e.message}
+        except (BadRequest, ValueError):
+            raise
+        except Exception:
+            traceback.print_exc()
+            return 500, {"title": "Server Error", "message": "The server could not handle this request."}
+        return 404, {"title": "Not Found", "message": f"No such endpoint: {method} {url.path}"}
+
+    async def query(self, parts, query):
+        service = self.service
+        if parts == ["config"]:
+            return service.room_config.as_dict()
+        if parts == ["bookings"]:
+            if "date" in query:
+                return await self.run(service.on_date, query["date"])
+            if "venue" in query:
+                return await self.run(service.for_venue, query["venue"])
+            if "name" in query:
+                return await self.run(service.by_name, query["name"])
+            return await self.run(service.page, int(query.get("offset", 0)), int(query.get("limit", 200)))
+        if len(parts) == 2 and parts[0] == "bookings":
+            booking = await self.run(service.get, parts[1])
+            if booking is None:
+                raise not_found()
+            return booking
+        if parts == ["overlap"]:
+            try:
+                args = [query[field] for field in ("venue", "date", "start_time", "end_time")]
+            except KeyError as e:
+                raise BadRequest(f"Missing query parameter {e}.")
+            return {"booking": await self.run(service.find_conflict, *args, query.get("ignore_id"))}
+        if parts == ["changes"]:
+            since = int(query["since"]) if "since" in query else None
+            version, changes = await self.run(service.changes_since, since)
+            return {"version": version, "changes": changes}
+        raise BookingError(404, "Not Found", "No such endpoint.")
+
+    async def locked(self, venues, action, *args):
+        # Sorted so two writes that both need two venues cannot deadlock.
+        venues = sorted(set(venues), key=str)
+        for venue in venues:
+            await self.venue_locks[venue].acquire()
+        try:
+            return await self.run(action, *args)
+        finally:
+            for venue in venues:
+                self.venue_locks[venue].release()
+
+    async def book(self, data):
+        check_fields(data)
+        return await self.locked([data.get("venue")], self.service.book, data)
+
+    async def book_many(self, data):
+        bookings = data.get("bookings", [])
+        if not isinstance(bookings, list):
+            raise BadRequest("Expected a list of bookings.")
+        for booking in bookings:
+            check_fields(booking)
+        venues = [booking.get("venue") for booking in bookings]
+        booked, conflicts = await self.locked(venues, self.service.book_many, bookings, bool(data.get("skip_conflicts")))
+        return {"booked": booked, "conflicts": conflicts}
+
+    async def update(self, booking_id, data):
+        check_fields(data)
+        booking = await self.run(self.service.get, booking_id)
+        if booking is None:
+            raise not_found()
+        # The booking may move between venues, so both are held.
+        return await self.locked([booking["venue"], data.get("venue", booking["venue"])],
+                                 self.service.update, booking_id, data)
+
+    async def cancel(self, booking_id):
+        booking = await self.run(self.service.get, booking_id)
+        if booking is None:
+            raise not_found()
+        return await self.locked([booking["venue"]], self.service.cancel, booking_id)
+
+
+async def serve(bookings_file, host, port, config_file="rooms.json"):
+    service = BookingService(open_store(bookings_file), RoomConfig.load(config_file))
+    server = BookingServer(service)
+    await server.start(host, port)
+    print(f"Serving {bookings_file} on http://{host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve room bookings over HTTP.")
+    parser.add_argument("bookings_file", nargs="?", default="bookings.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", default="rooms.json")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.bookings_file, args.host, args.port, args.config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
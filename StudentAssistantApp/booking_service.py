@@ -0,0 +1,240 @@
+"""Booking rules with no user interface.
+
+BookingService checks, books, edits and cancels bookings on top of a
+BookingStore. It is used directly by the Tk app and, through
+booking_server.py, by clients over HTTP. Anything that goes wrong is
+raised as a BookingError carrying a title and a message for the user, and
+an HTTP status for the server.
+
+Every change the service makes or picks up from other processes is given
+a version number and kept in a bounded log, so clients can ask for the
+changes since the version they last saw (changes_since).
+"""
+import collections
+import itertools
+from datetime import datetime
+
+from booking_store import BookingConflict, DaySchedule, STORE_ERRORS, slot_label
+
+BOOKING_INPUTS = ("venue", "date", "start_time", "end_time", "name")
+
+
+class BookingError(Exception):
+    def __init__(self, status, title, message):
+        # status is the HTTP status the server answers with: 400 bad input,
+        # 404 unknown booking, 409 conflict, 500 storage failure.
+        super().__init__(message)
+        self.status = status
+        self.title = title
+        self.message = message
+
+
+def validate_booking(room_config, booking, today=None):
+    """Raise BookingError(400) unless booking's venue, date, times and name can be booked."""
+    if not all(isinstance(booking.get(field), str) and booking[field] for field in BOOKING_INPUTS):
+        raise BookingError(400, "Input Error", "All fields must be filled.")
+    venue, start_time, end_time = booking["venue"], booking["start_time"], booking["end_time"]
+    if venue not in room_config.hours:
+        raise BookingError(400, "Input Error", f"Unknown venue: {venue}.")
+    if start_time not in room_config.boundaries or end_time not in room_config.boundaries:
+        raise BookingError(400, "Invalid Time", "Start and end times must be on the booking grid.")
+    if start_time >= end_time:
+        raise BookingError(400, "Invalid Time", "End time must be after start time.")
+    if not room_config.is_open(venue, start_time, end_time):
+        opening, closing = room_config.hours[venue]
+        raise BookingError(400, "Venue Closed", f"{venue} can only be booked between {opening} and {closing}.")
+    try:
+        booking_date = datetime.strptime(booking["date"], "%Y-%m-%d").date()
+    except ValueError:
+        raise BookingError(400, "Invalid Date", "Please enter date in YYYY-MM-DD format.")
+    if booking_date < (today or datetime.now().date()):
+        raise BookingError(400, "Invalid Date", "Booking date cannot be in the past.")
+
+
+def save_failed():
+    return BookingError(500, "Data Save Error", "Could not save booking data to file.")
+
+
+def not_found():
+    return BookingError(404, "Booking Not Found", "This booking no longer exists.")
+
+
+class BookingService:
+    CHANGE_LOG_SIZE = 1000
+
+    def __init__(self, store, room_config):
+        self.store = store
+        self.room_config = room_config
+        # log holds (old booking, new booking) for versions
+        # log_start + 1 .. version, oldest first.
+        self.version = 0
+        self.log_start = 0
+        self.log = collections.deque(maxlen=self.CHANGE_LOG_SIZE)
+
+    def load(self):
+        """Return messages about stored bookings that were kept but left out
+        (see BookingStore.load_problems). Raises ValueError if the stored
+        bookings cannot be read."""
+        self.store.load()
+        return self.store.load_problems()
+
+    def save(self):
+        try:
+            self.store.save()
+        except STORE_ERRORS:
+            raise save_failed()
+
+    def close(self):
+        self.store.close()
+
+    def validate(self, booking):
+        validate_booking(self.room_config, booking)
+
+    def _new_booking(self, fields, timestamp):
+        booking = {field: fields.get(field) for field in BOOKING_INPUTS}
+        self.validate(booking)
+        booking["time_slot"] = slot_label(booking["start_time"], booking["end_time"])
+        booking["timestamp"] = timestamp
+        return booking
+
+    @staticmethod
+    def _now():
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def _record(self, old_booking, booking):
+        if len(self.log) == self.log.maxlen:
+            self.log_start += 1
+        self.version += 1
+        self.log.append((old_booking, booking))
+
+    def _record_store_changes(self, changes):
+        # Changes other processes made through the store; None means unknown.
+        if changes is None:
+            self.version += 1
+            self.log_start = self.version
+            self.log.clear()
+        else:
+            for old_booking, booking in changes:
+                self._record(old_booking, booking)
+
+    def _record_write(self, old_booking, booking):
+        # Whatever other processes did before this write goes in the log first.
+        self._record_store_changes(self.store.pending_changes())
+        self._record(old_booking, booking)
+
+    # Queries
+
+    def get(self, booking_id):
+        return self.store.get(booking_id)
+
+    def page(self, offset, limit):
+        return self.store.page(offset, limit)
+
+    def on_date(self, date_str):
+        return self.store.on_date(date_str)
+
+    def for_venue(self, venue):
+        return self.store.for_venue(venue)
+
+    def by_name(self, name):
+        return self.store.by_name(name)
+
+    def find_conflict(self, venue, date_str, start_time, end_time, ignore_id=None):
+        """Return a booking of this venue that overlaps the given times, or None."""
+        return self.store.find_overlap(venue, date_str, start_time, end_time, ignore_id)
+
+    def changes_since(self, version):
+        """Return (current version, [(old booking, new booking)] made after
+        version). The list is None if those changes are no longer all known,
+        in which case the caller should re-read everything. With version None,
+        just return the current version."""
+        try:
+            self._record_store_changes(self.store.poll_changes())
+        except STORE_ERRORS:
+            pass
+        if version is None:
+            return self.version, []
+        if version < self.log_start or version > self.version:
+            return self.version, None
+        return self.version, list(itertools.islice(self.log, version - self.log_start, None))
+
+    # Writes
+
+    def book(self, fields):
+        """Validate and store one booking; return it with its id."""
+        booking = self._new_booking(fields, self._now())
+        try:
+            self.store.add(booking)
+        except BookingConflict:
+            raise BookingError(409, "Booking Conflict",
+                               f"The room {booking['venue']} is already booked for {booking['date']} "
+                               f"between {booking['start_time']} and {booking['end_time']}.")
+        except STORE_ERRORS:
+            raise save_failed()
+        self._record_write(None, booking)
+        return booking
+
+    def book_many(self, bookings, skip_conflicts=False):
+        """Book several bookings with one conflict pass and one store write.
+
+        Returns (booked, conflicts), where conflicts lists (booking, clashing
+        booking) pairs. If anything conflicts and skip_conflicts is False,
+        nothing is booked; otherwise the free bookings are booked together.
+        """
+        timestamp = self._now()
+        free, conflicts = [], []
+        batch = {}  # (venue, date) -> DaySchedule of the free bookings so far
+        for fields in bookings:
+            booking = self._new_booking(fields, timestamp)
+            schedule = batch.setdefault((booking["venue"], booking["date"]), DaySchedule())
+            clash = (self.find_conflict(booking["venue"], booking["date"], booking["start_time"], booking["end_time"])
+                     or schedule.overlapping(booking["start_time"], booking["end_time"]))
+            if clash:
+                conflicts.append((booking, clash))
+            else:
+                free.append(booking)
+                schedule.insert(booking)
+        if (conflicts and not skip_conflicts) or not free:
+            return [], conflicts
+        try:
+            self.store.add_many(free)
+        except BookingConflict:
+            # Another process took one of the slots after the conflict pass.
+            raise BookingError(409, "Booking Conflict", "Someone else booked one of these dates just now. Please try again.")
+        except STORE_ERRORS:
+            raise save_failed()
+        self._record_store_changes(self.store.pending_changes())
+        for booking in free:
+            self._record(None, booking)
+        return free, conflicts
+
+    def update(self, booking_id, changes):
+        """Apply changes (any of the booking inputs) to a booking and return the new version."""
+        old_booking = self.store.get(booking_id)
+        if old_booking is None:
+            raise not_found()
+        fields = dict(old_booking)
+        fields.update((field, changes[field]) for field in BOOKING_INPUTS if field in changes)
+        booking = self._new_booking(fields, self._now())
+        try:
+            booking = self.store.update(booking_id, booking)
+        except BookingConflict:
+            raise BookingError(409, "Booking Conflict",
+                               f"The room {booking['venue']} is already booked for {booking['date']} "
+                               f"between {booking['start_time']} and {booking['end_time']} by another booking.")
+        except KeyError:
+            raise not_found()
+        except STORE_ERRORS:
+            raise save_failed()
+        self._record_write(old_booking, booking)
+        return booking
+
+    def cancel(self, booking_id):
+        try:
+            booking = self.store.remove(booking_id)
+        except KeyError:
+            raise not_found()
+        except STORE_ERRORS:
+            raise save_failed()
+        self._record_write(booking, None)
+        return booking
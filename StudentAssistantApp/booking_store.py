@@ -0,0 +1,735 @@
+"""Storage backends for room bookings.
+
+BookingManager talks to a BookingStore. Two implementations exist:
+
+JsonBookingStore keeps bookings.json as a plain JSON list that acts as
+the snapshot. Every mutation is appended as one JSON line to
+bookings.json.journal, so a write costs the same no matter how many
+bookings exist. Loading reads the snapshot and replays the journal on top
+of it. Compaction writes a fresh snapshot through a temp file and an
+atomic rename, then empties the journal. Queries are answered from
+in-memory hash indexes, and overlaps from a sorted interval list per
+venue and date. Bookings saved before overlaps were checked can overlap
+earlier ones; loading leaves those out and moves them to
+bookings.json.conflicts rather than dropping them.
+
+SqliteBookingStore keeps bookings in an SQLite table (WAL mode). The
+overlap check and the write run in one IMMEDIATE transaction, and a
+UNIQUE (venue, date, time_slot) constraint backs it up, so the database
+itself rejects double-booking. Queries use SQL indexes.
+
+This module does not import tkinter so it can be used headless.
+"""
+import bisect
+import contextlib
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import uuid
+
+from file_utils import atomic_write, append_line, file_lock, file_signature
+
+BOOKING_FIELDS = ("venue", "date", "start_time", "end_time", "time_slot", "name", "timestamp")
+
+# Errors a store raises when the underlying file or database fails.
+STORE_ERRORS = (OSError, sqlite3.Error)
+
+
+class BookingConflict(Exception):
+    """Raised when a booking would overlap one that is already held."""
+
+
+def slot_key(booking):
+    return (booking["venue"], booking["date"], booking["time_slot"])
+
+
+def slot_label(start_time, end_time):
+    return f"{start_time} - {end_time}"
+
+
+def new_booking_id():
+    return uuid.uuid4().hex
+
+
+def normalise_times(booking):
+    """Fill in start_time/end_time from a legacy "HH:MM - HH:MM" time_slot, and
+    keep time_slot as the label for start_time/end_time."""
+    if "start_time" not in booking:
+        booking["start_time"], booking["end_time"] = booking["time_slot"].split(" - ")
+    booking["time_slot"] = slot_label(booking["start_time"], booking["end_time"])
+    return booking
+
+
+class DaySchedule:
+    """Non-overlapping bookings for one venue on one date, sorted by start time.
+    Times are "HH:MM" strings, which sort the same way as the times they name."""
+    def __init__(self):
+        self.starts = []
+        self.bookings = []
+
+    def __len__(self):
+        return len(self.bookings)
+
+    def overlapping(self, start_time, end_time, ignore_id=None):
+        """Return a booking that overlaps [start_time, end_time), or None.
+
+        Bookings never overlap each other, so only the last one (or two,
+        when skipping ignore_id) starting before end_time can reach past
+        start_time.
+        """
+        idx = bisect.bisect_left(self.starts, end_time)
+        for booking in reversed(self.bookings[max(0, idx - 2):idx]):
+            if ignore_id is not None and booking["id"] == ignore_id:
+                continue
+            return booking if booking["end_time"] > start_time else None
+        return None
+
+    def insert(self, booking):
+        idx = bisect.bisect_left(self.starts, booking["start_time"])
+        self.starts.insert(idx, booking["start_time"])
+        self.bookings.insert(idx, booking)
+
+    def remove(self, booking):
+        idx = bisect.bisect_left(self.starts, booking["start_time"])
+        while self.bookings[idx]["id"] != booking["id"]:
+            idx += 1
+        del self.starts[idx]
+        del self.bookings[idx]
+
+
+class BookingStore:
+    """Interface for booking storage. Bookings are dicts with BOOKING_FIELDS
+    plus a stable string "id" that the store assigns on add."""
+
+    def load(self):
+        """Open the underlying storage. Raises ValueError if the data is corrupt,
+        in which case the store is left empty."""
+        raise NotImplementedError
+
+    def load_problems(self):
+        """Return messages for the user about bookings the last load kept but
+        could not use."""
+        return []
+
+    def all(self):
+        raise NotImplementedError
+
+    def page(self, offset, limit):
+        """Return up to limit bookings in display order, starting at offset."""
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def get(self, booking_id):
+        """Return the booking with this id, or None."""
+        raise NotImplementedError
+
+    def find_overlap(self, venue, date_str, start_time, end_time, ignore_id=None):
+        """Return a booking of this venue that overlaps the given times, or None."""
+        raise NotImplementedError
+
+    def on_date(self, date_str):
+        raise NotImplementedError
+
+    def for_venue(self, venue):
+        raise NotImplementedError
+
+    def by_name(self, name):
+        raise NotImplementedError
+
+    def add(self, booking):
+        """Store a new booking and return it. Raises BookingConflict if it
+        overlaps an existing booking."""
+        raise NotImplementedError
+
+    def add_many(self, bookings):
+        """Store several bookings with a single write and return them. If any
+        of them overlaps an existing booking or another one in the batch,
+        BookingConflict is raised and nothing is stored."""
+        raise NotImplementedError
+
+    def update(self, booking_id, changes):
+        """Apply changes to a booking and return the updated booking.
+        Raises BookingConflict if it would overlap another booking."""
+        raise NotImplementedError
+
+    def remove(self, booking_id):
+        """Delete a booking and return it."""
+        raise NotImplementedError
+
+    def poll_changes(self):
+        """Return [(old booking, new booking)] for changes other processes made
+        since the last call (old is None for additions, new is None for
+        removals), or None if the caller should re-read everything."""
+        return []
+
+    def pending_changes(self):
+        """Like poll_changes, but only return the changes the last write already
+        picked up, which all happened before it, without looking for new ones."""
+        return []
+
+    def save(self):
+        """Flush everything to durable storage."""
+
+    def close(self):
+        self.save()
+
+
+class BookingJournal:
+    """Append-only log of booking mutations on top of a JSON snapshot.
+
+    The journal remembers how far into the log it has read (offset) and
+    which snapshot it loaded, so changes appended by other processes can be
+    picked up without reading everything again.
+    """
+    def __init__(self, snapshot_file="bookings.json", min_compact=500):
+        self.snapshot_file = snapshot_file
+        self.journal_file = snapshot_file + ".journal"
+        self.lock_file = snapshot_file + ".lock"
+        self.min_compact = min_compact
+        self.journal_records = 0
+        self.offset = 0
+        self.snapshot_signature = None
+
+    def load(self):
+        """Return the bookings from the snapshot plus the replayed journal.
+
+        Raises ValueError if the snapshot itself is not valid JSON.
+        """
+        bookings = []
+        self.snapshot_signature = file_signature(self.snapshot_file)
+        if self.snapshot_signature is not None:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                bookings = json.load(f)
+        self.journal_records = 0
+        self.offset = 0
+        return self._replay(bookings, self.read_new())
+
+    def _replay(self, bookings, records):
+        # Every record sets or deletes whole slot keys, so replaying a record
+        # that is already in the snapshot (crash between compaction and
+        # truncating the journal) leaves the result unchanged.
+        order = list(bookings)
+        state = {slot_key(b): b for b in bookings}
+        for record in records:
+            op = record["op"]
+            if op in ("add", "add_many"):
+                for booking in record.get("bookings", [record.get("booking")]):
+                    booking = dict(booking)
+                    state[slot_key(booking)] = booking
+                    order.append(booking)
+            elif op == "update":
+                booking = state.pop(tuple(record["key"]), None)
+                if booking is None:
+                    booking = {}
+                    order.append(booking)
+                booking.clear()
+                booking.update(record["booking"])
+                state[slot_key(booking)] = booking
+            elif op == "remove":
+                state.pop(tuple(record["key"]), None)
+        return [b for b in order if state.get(slot_key(b)) is b]
+
+    def changed(self):
+        """Say what another process changed since we last read: "snapshot"
+        (compacted, reload everything), "journal" (new records) or None."""
+        if file_signature(self.snapshot_file) != self.snapshot_signature:
+            return "snapshot"
+        signature = file_signature(self.journal_file)
+        if (signature[2] if signature else 0) != self.offset:
+            return "journal"
+        return None
+
+    def read_new(self):
+        """Return the records appended since the last read."""
+        records = []
+        if not os.path.exists(self.journal_file):
+            return records
+        with open(self.journal_file, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn last line from a crash mid-append
+                self.offset += len(line)
+                try:
+                    record = json.loads(line)
+                    record["op"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self.journal_records += 1
+                records.append(record)
+        return records
+
+    def append(self, op, booking=None, key=None, bookings=None):
+        record = {"op": op}
+        if key is not None:
+            record["key"] = list(key)
+        if booking is not None:
+            record["booking"] = booking
+        if bookings is not None:
+            record["bookings"] = bookings
+        self.offset = append_line(self.journal_file, json.dumps(record))
+        self.journal_records += 1
+
+    def needs_compaction(self, booking_count):
+        # Compacting once the journal is as long as the snapshot keeps the
+        # amortised cost per write constant.
+        return self.journal_records >= max(self.min_compact, booking_count)
+
+    def compact(self, bookings):
+        atomic_write(self.snapshot_file, json.dumps(bookings, indent=4))
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.snapshot_signature = file_signature(self.snapshot_file)
+        self.journal_records = 0
+        self.offset = 0
+
+
+class NeedsReload(Exception):
+    """A journal record cannot be applied incrementally (written before bookings had ids)."""
+
+
+class JsonBookingStore(BookingStore):
+    """bookings.json plus journal, held in memory with hash indexes.
+
+    Several processes may share the same file. Every write holds an
+    advisory lock on bookings.json.lock, first applies whatever other
+    processes appended since this one last looked, then re-checks for
+    overlaps against that merged state before appending its own record.
+    """
+    def __init__(self, bookings_file="bookings.json"):
+        self.journal = BookingJournal(bookings_file)
+        self.conflicts_file = bookings_file + ".conflicts"
+        # conflicts: bookings the last load left out because they overlap
+        # earlier ones; set_aside: those not yet written to conflicts_file.
+        self.conflicts = []
+        self.set_aside = []
+        self.external_changes = []
+        self.reset()
+
+    def reset(self):
+        # rows: booking id -> booking, in display order
+        # schedules: (venue, date) -> DaySchedule
+        # date_index / venue_index / name_index: field -> {booking id: booking}
+        self.rows = {}
+        self.schedules = {}
+        self.date_index = {}
+        self.venue_index = {}
+        self.name_index = {}
+
+    def _locked(self):
+        return file_lock(self.journal.lock_file)
+
+    def load(self):
+        with self._locked():
+            self._reload()
+
+    def _reload(self):
+        self.reset()
+        self.conflicts = []
+        missing_ids = False
+        for booking in self.journal.load():
+            normalise_times(booking)
+            if self.find_overlap(booking["venue"], booking["date"], booking["start_time"], booking["end_time"]):
+                self.conflicts.append(booking)
+                continue
+            if "id" not in booking:
+                booking["id"] = new_booking_id()
+                missing_ids = True
+            self.rows[booking["id"]] = booking
+            self._index(booking)
+        self.set_aside = list(self.conflicts)
+        if missing_ids or self.set_aside:
+            # Persist the ids handed out to bookings saved before ids existed
+            # and move the overlapping ones out of the snapshot. If that fails
+            # the ids are simply handed out again next time, and the next
+            # compaction tries the move again before it writes the snapshot.
+            try:
+                self._compact()
+            except OSError:
+                pass
+
+    def load_problems(self):
+        if not self.conflicts:
+            return []
+        where = self.journal.snapshot_file if self.set_aside else self.conflicts_file
+        return [f"{len(self.conflicts)} saved booking(s) overlap earlier ones and were left out; "
+                f"they are kept in {where}."]
+
+    def _sync(self):
+        """Apply other processes' writes. Call with the lock held."""
+        change = self.journal.changed()
+        if change == "journal":
+            try:
+                for record in self.journal.read_new():
+                    self._apply(record)
+                return
+            except NeedsReload:
+                change = "snapshot"
+        if change == "snapshot":
+            self._reload()
+            self.external_changes = None
+
+    def _apply(self, record):
+        op = record["op"]
+        if op in ("add", "add_many"):
+            bookings = record.get("bookings", [record.get("booking")])
+        else:
+            bookings = [record.get("booking")]
+        for booking in bookings:
+            if booking is None or "id" not in booking:
+                raise NeedsReload()
+            old_booking = self.rows.get(booking["id"])
+            if old_booking is not None:
+                self._unindex(old_booking)
+            if op == "remove":
+                if old_booking is not None:
+                    del self.rows[booking["id"]]
+                    self._note_change(old_booking, None)
+                continue
+            booking = normalise_times(dict(booking))
+            self.rows[booking["id"]] = booking
+            self._index(booking)
+            self._note_change(old_booking, booking)
+
+    def _note_change(self, old_booking, booking):
+        if self.external_changes is not None:
+            self.external_changes.append((old_booking, booking))
+
+    def poll_changes(self):
+        if self.external_changes == [] and self.journal.changed() is None:
+            return []
+        with self._locked():
+            self._sync()
+        return self.pending_changes()
+
+    def pending_changes(self):
+        changes, self.external_changes = self.external_changes, []
+        return changes
+
+    def _index(self, booking):
+        booking_id = booking["id"]
+        self.schedules.setdefault((booking["venue"], booking["date"]), DaySchedule()).insert(booking)
+        self.date_index.setdefault(booking["date"], {})[booking_id] = booking
+        self.venue_index.setdefault(booking["venue"], {})[booking_id] = booking
+        self.name_index.setdefault(booking["name"].lower(), {})[booking_id] = booking
+
+    def _unindex(self, booking):
+        schedule_key = (booking["venue"], booking["date"])
+        self.schedules[schedule_key].remove(booking)
+        if not self.schedules[schedule_key]:
+            del self.schedules[schedule_key]
+        for index, field in ((self.date_index, booking["date"]),
+                             (self.venue_index, booking["venue"]),
+                             (self.name_index, booking["name"].lower())):
+            bucket = index[field]
+            del bucket[booking["id"]]
+            if not bucket:
+                del index[field]
+
+    def all(self):
+        return list(self.rows.values())
+
+    def page(self, offset, limit):
+        return list(itertools.islice(self.rows.values(), offset, offset + limit))
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, booking_id):
+        return self.rows.get(booking_id)
+
+    def find_overlap(self, venue, date_str, start_time, end_time, ignore_id=None):
+        schedule = self.schedules.get((venue, date_str))
+        if schedule is None:
+            return None
+        return schedule.overlapping(start_time, end_time, ignore_id)
+
+    def on_date(self, date_str):
+        return list(self.date_index.get(date_str, {}).values())
+
+    def for_venue(self, venue):
+        return list(self.venue_index.get(venue, {}).values())
+
+    def by_name(self, name):
+        return list(self.name_index.get(name.strip().lower(), {}).values())
+
+    def _check_free(self, booking, ignore_id=None):
+        if self.find_overlap(booking["venue"], booking["date"], booking["start_time"],
+                             booking["end_time"], ignore_id):
+            raise BookingConflict(slot_key(booking))
+
+    def add(self, booking):
+        normalise_times(booking)
+        with self._locked():
+            self._sync()
+            self._check_free(booking)
+            booking.setdefault("id", new_booking_id())
+            self.journal.append("add", booking=booking)
+            self.rows[booking["id"]] = booking
+            self._index(booking)
+            self._maybe_compact()
+        return booking
+
+    def add_many(self, bookings):
+        with self._locked():
+            self._sync()
+            batch = {}
+            for booking in bookings:
+                normalise_times(booking)
+                self._check_free(booking)
+                schedule = batch.setdefault((booking["venue"], booking["date"]), DaySchedule())
+                if schedule.overlapping(booking["start_time"], booking["end_time"]):
+                    raise BookingConflict(slot_key(booking))
+                schedule.insert(booking)
+            for booking in bookings:
+                booking.setdefault("id", new_booking_id())
+            self.journal.append("add_many", bookings=bookings)
+            for booking in bookings:
+                self.rows[booking["id"]] = booking
+                self._index(booking)
+            self._maybe_compact()
+        return bookings
+
+    def update(self, booking_id, changes):
+        with self._locked():
+            self._sync()
+            old_booking = self.rows[booking_id]
+            booking = normalise_times(dict(old_booking, **changes))
+            booking["id"] = booking_id
+            self._check_free(booking, ignore_id=booking_id)
+            self.journal.append("update", booking=booking, key=slot_key(old_booking))
+            self._unindex(old_booking)
+            self.rows[booking_id] = booking
+            self._index(booking)
+            self._maybe_compact()
+        return booking
+
+    def remove(self, booking_id):
+        with self._locked():
+            self._sync()
+            booking = self.rows[booking_id]
+            self.journal.append("remove", key=slot_key(booking), booking=booking)
+            del self.rows[booking_id]
+            self._unindex(booking)
+            self._maybe_compact()
+        return booking
+
+    def _maybe_compact(self):
+        if self.journal.needs_compaction(len(self.rows)):
+            self._compact()
+
+    def _compact(self):
+        # The snapshot only holds the bookings in use, so bookings set aside
+        # must reach the conflicts file (one JSON line each) first.
+        if self.set_aside:
+            append_line(self.conflicts_file, "\n".join(json.dumps(booking) for booking in self.set_aside))
+            self.set_aside = []
+        self.journal.compact(self.all())
+
+    def save(self):
+        with self._locked():
+            self._sync()
+            self._compact()
+
+
+class SqliteBookingStore(BookingStore):
+    """Bookings in an SQLite database; queries run against SQL indexes.
+    A booking's id is its integer primary key, as a string."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY,
+            venue TEXT NOT NULL,
+            date TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            time_slot TEXT NOT NULL,
+            name TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            UNIQUE (venue, date, time_slot)
+        );
+    """
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS bookings_by_start ON bookings (venue, date, start_time);
+        CREATE INDEX IF NOT EXISTS bookings_by_date ON bookings (date);
+        CREATE INDEX IF NOT EXISTS bookings_by_name ON bookings (name COLLATE NOCASE);
+    """
+    COLUMNS = ", ".join(BOOKING_FIELDS)
+    PLACEHOLDERS = ", ".join("?" for _ in BOOKING_FIELDS)
+
+    def __init__(self, db_file="bookings.db"):
+        self.db_file = db_file
+        self.conn = None
+
+    def load(self):
+        # Nothing is read up front; queries go to the database as needed.
+        # SQLite itself serialises writers across processes.
+        if self.conn is None:
+            # Autocommit mode: writes open their own IMMEDIATE transactions.
+            self.conn = sqlite3.connect(self.db_file, isolation_level=None)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self.conn.executescript(self.SCHEMA)
+            self._upgrade_schema()
+            self.conn.executescript(self.INDEXES)
+        except sqlite3.DatabaseError as e:
+            raise ValueError(str(e))
+        self.data_version = self._data_version()
+
+    def _data_version(self):
+        # Changes whenever another connection commits to the database.
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll_changes(self):
+        version = self._data_version()
+        if version == self.data_version:
+            return []
+        self.data_version = version
+        return None
+
+    def _upgrade_schema(self):
+        # Databases created before start/end times were stored only have time_slot.
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(bookings)")}
+        if "start_time" not in columns:
+            with self._transaction():
+                self.conn.execute("ALTER TABLE bookings ADD COLUMN start_time TEXT NOT NULL DEFAULT ''")
+                self.conn.execute("ALTER TABLE bookings ADD COLUMN end_time TEXT NOT NULL DEFAULT ''")
+                self.conn.execute("UPDATE bookings SET start_time = substr(time_slot, 1, 5), "
+                                  "end_time = substr(time_slot, 9, 5)")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _query(self, where="", params=()):
+        sql = f"SELECT id, {self.COLUMNS} FROM bookings {where}"
+        return [dict(row, id=str(row["id"])) for row in self.conn.execute(sql, params)]
+
+    def all(self):
+        return self._query("ORDER BY id")
+
+    def page(self, offset, limit):
+        return self._query("ORDER BY id LIMIT ? OFFSET ?", (limit, offset))
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+    def get(self, booking_id):
+        rows = self._query("WHERE id = ?", (int(booking_id),))
+        return rows[0] if rows else None
+
+    def find_overlap(self, venue, date_str, start_time, end_time, ignore_id=None):
+        # Same reasoning as DaySchedule.overlapping: only the last booking
+        # starting before end_time can overlap, found with one index probe.
+        rows = self._query(
+            "WHERE venue = ? AND date = ? AND start_time < ? AND id != ? ORDER BY start_time DESC LIMIT 1",
+            (venue, date_str, end_time, -1 if ignore_id is None else int(ignore_id)))
+        if rows and rows[0]["end_time"] > start_time:
+            return rows[0]
+        return None
+
+    def on_date(self, date_str):
+        return self._query("WHERE date = ? ORDER BY id", (date_str,))
+
+    def for_venue(self, venue):
+        return self._query("WHERE venue = ? ORDER BY id", (venue,))
+
+    def by_name(self, name):
+        return self._query("WHERE name = ? COLLATE NOCASE ORDER BY id", (name.strip(),))
+
+    def _insert(self, booking):
+        if self.find_overlap(booking["venue"], booking["date"], booking["start_time"], booking["end_time"]):
+            raise BookingConflict(slot_key(booking))
+        try:
+            cursor = self.conn.execute(
+                f"INSERT INTO bookings ({self.COLUMNS}) VALUES ({self.PLACEHOLDERS})",
+                [booking[field] for field in BOOKING_FIELDS])
+        except sqlite3.IntegrityError:
+            raise BookingConflict(slot_key(booking))
+        booking["id"] = str(cursor.lastrowid)
+        return booking
+
+    def add(self, booking):
+        normalise_times(booking)
+        with self._transaction():
+            return self._insert(booking)
+
+    def add_many(self, bookings):
+        with self._transaction():
+            for booking in bookings:
+                self._insert(normalise_times(booking))
+        return bookings
+
+    def update(self, booking_id, changes):
+        with self._transaction():
+            booking = self.get(booking_id)
+            if booking is None:
+                raise KeyError(booking_id)
+            booking.update(changes)
+            booking["id"] = booking_id
+            normalise_times(booking)
+            if self.find_overlap(booking["venue"], booking["date"], booking["start_time"],
+                                 booking["end_time"], ignore_id=booking_id):
+                raise BookingConflict(slot_key(booking))
+            assignments = ", ".join(f"{field} = ?" for field in BOOKING_FIELDS)
+            try:
+                self.conn.execute(f"UPDATE bookings SET {assignments} WHERE id = ?",
+                                  [booking[field] for field in BOOKING_FIELDS] + [int(booking_id)])
+            except sqlite3.IntegrityError:
+                raise BookingConflict(slot_key(booking))
+        return booking
+
+    def remove(self, booking_id):
+        with self._transaction():
+            booking = self.get(booking_id)
+            if booking is None:
+                raise KeyError(booking_id)
+            self.conn.execute("DELETE FROM bookings WHERE id = ?", (int(booking_id),))
+        return booking
+
+    def save(self):
+        if self.conn is not None:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        if self.conn is not None:
+            self.save()
+            self.conn.close()
+            self.conn = None
+
+
+def open_store(bookings_file):
+    """Pick a backend from the file extension: .db/.sqlite use SQLite, anything else JSON."""
+    if os.path.splitext(bookings_file)[1].lower() in (".db", ".sqlite", ".sqlite3"):
+        return SqliteBookingStore(bookings_file)
+    return JsonBookingStore(bookings_file)
+
+
+def migrate_json_to_sqlite(json_file, db_file):
+    """Copy every booking from a JSON store into an SQLite store in one transaction."""
+    source = JsonBookingStore(json_file)
+    source.load()
+    target = SqliteBookingStore(db_file)
+    target.load()
+    try:
+        target.add_many([dict(booking) for booking in source.all()])
+    finally:
+        target.close()
+    return source.count()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python booking_store.py bookings.json bookings.db")
+    print(f"Migrated {migrate_json_to_sqlite(sys.argv[1], sys.argv[2])} bookings.")
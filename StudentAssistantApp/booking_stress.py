@@ -0,0 +1,161 @@
+"""Multi-process stress test for the booking stores' overlap checks.
+
+    python booking_stress.py [--writers 8] [--attempts 2000] [--days 2] [--sqlite]
+
+Starts the given number of writer processes on one temporary bookings
+file. They all wait at a barrier, then race to book random spans of one
+venue on the same few days, singly and two at a time, and cancel some of
+their own bookings to free slots for the others. Each writer opens its
+own store, so the only thing keeping them apart is the store's locking
+(file_utils.file_lock for JSON, SQLite transactions for --sqlite). The
+JSON store compacts every few writes so that compaction races too.
+
+Afterwards the file is loaded again and the test exits with status 1 if
+any two stored bookings overlap, if a booking that a writer was told it
+got (and did not cancel) is missing or changed, if a booking no writer
+holds is stored, or if the load reports problems.
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from booking_store import BookingConflict, open_store
+
+VENUE = "Library Discussion Room"
+OPENING, CLOSING = 9, 17  # hours
+CANCEL_SHARE = 0.25
+BATCH_SHARE = 0.25
+COMPACT_EVERY = 20  # journal records, for the JSON store
+
+
+def random_booking(rng, days, writer):
+    start = rng.randrange(OPENING, CLOSING)
+    end = min(CLOSING, start + rng.randint(1, 3))
+    return {"venue": VENUE, "date": rng.choice(days), "start_time": f"{start:02d}:00",
+            "end_time": f"{end:02d}:00", "name": f"Writer {writer}", "timestamp": "2025-01-01 00:00:00"}
+
+
+def writer(bookings_file, number, attempts, days, barrier, results):
+    rng = random.Random(number)
+    store = open_store(bookings_file)
+    store.load()
+    if hasattr(store, "journal"):
+        store.journal.min_compact = COMPACT_EVERY
+    kept = {}
+    booked = conflicts = cancelled = 0
+    barrier.wait()
+    for _ in range(attempts):
+        roll = rng.random()
+        try:
+            if roll < CANCEL_SHARE and kept:
+                booking_id = rng.choice(list(kept))
+                store.remove(booking_id)
+                del kept[booking_id]
+                cancelled += 1
+            elif roll < CANCEL_SHARE + BATCH_SHARE:
+                added = store.add_many([random_booking(rng, days, number) for _ in range(2)])
+                kept.update((booking["id"], dict(booking)) for booking in added)
+                booked += len(added)
+            else:
+                booking = store.add(random_booking(rng, days, number))
+                kept[booking["id"]] = dict(booking)
+                booked += 1
+        except BookingConflict:
+            conflicts += 1
+    store.close()
+    results.put((number, list(kept.values()), booked, conflicts, cancelled))
+
+
+def overlaps(bookings):
+    """Return pairs of bookings of the same venue and date whose times overlap."""
+    found = []
+    by_day = {}
+    for booking in bookings:
+        by_day.setdefault((booking["venue"], booking["date"]), []).append(booking)
+    for day in by_day.values():
+        day.sort(key=lambda booking: booking["start_time"])
+        for before, after in zip(day, day[1:]):
+            if after["start_time"] < before["end_time"]:
+                found.append((before, after))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Race writer processes on one bookings file.")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=2)
+    parser.add_argument("--sqlite", action="store_true", help="use the SQLite store instead of JSON")
+    args = parser.parse_args(argv)
+
+    first_day = date.today() + timedelta(days=1)
+    days = [(first_day + timedelta(days=n)).isoformat() for n in range(args.days)]
+    with tempfile.TemporaryDirectory() as workdir:
+        bookings_file = os.path.join(workdir, "bookings.db" if args.sqlite else "bookings.json")
+        store = open_store(bookings_file)  # create it before anyone races to
+        store.load()
+        store.close()
+        barrier = multiprocessing.Barrier(args.writers)
+        results = multiprocessing.Queue()
+        writers = [multiprocessing.Process(target=writer, args=(bookings_file, n, args.attempts, days,
+                                                                  barrier, results))
+                   for n in range(args.writers)]
+        started = time.perf_counter()
+        for process in writers:
+            process.start()
+        outcomes = []
+        while len(outcomes) < len(writers):
+            try:
+                outcomes.append(results.get(timeout=1))
+            except queue.Empty:
+                if not any(process.is_alive() for process in writers) and results.empty():
+                    break
+        for process in writers:
+            process.join()
+        elapsed = time.perf_counter() - started
+        if len(outcomes) < len(writers):
+            print(f"FAIL: {len(writers) - len(outcomes)} writer process(es) crashed")
+            sys.exit(1)
+
+        store = open_store(bookings_file)
+        store.load()
+        stored = {booking["id"]: booking for booking in store.all()}
+        problems = store.load_problems()
+        store.close()
+
+    booked = sum(outcome[2] for outcome in outcomes)
+    conflicts = sum(outcome[3] for outcome in outcomes)
+    cancelled = sum(outcome[4] for outcome in outcomes)
+    print(f"{args.writers} writers, {args.attempts} attempts each, in {elapsed:.1f} s: "
+          f"{booked} booked, {conflicts} refused as conflicts, {cancelled} cancelled")
+    print(f"  {len(stored)} bookings stored")
+    failures = []
+    for before, after in overlaps(stored.values()):
+        failures.append(f"{before['date']} {before['time_slot']} ({before['name']}) overlaps "
+                        f"{after['time_slot']} ({after['name']})")
+    kept_ids = set()
+    for _, kept, _, _, _ in outcomes:
+        for booking in kept:
+            kept_ids.add(booking["id"])
+            found = stored.get(booking["id"])
+            if found is None or any(found[field] != booking[field] for field in booking):
+                failures.append(f"booking {booking['id']} ({booking['name']}, {booking['date']} "
+                                f"{booking['time_slot']}) was lost or changed")
+    for booking_id in stored.keys() - kept_ids:
+        failures.append(f"booking {booking_id} is stored but no writer holds it")
+    failures += problems
+    if failures:
+        for failure in failures[:20]:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print("  no overlaps, no lost bookings")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import tkinter as tk
-from tkinter import messagebox, ttk
-from datetime import datetime, timedelta
+from tkinter import filedialog, messagebox, simpledialog, ttk
+from datetime import date, datetime, timedelta
 import calendar
+import functools
 import os
+from event_rules import FREQUENCIES, RecurrenceRule
+from event_search import words
+import shared_store
 
 BG_COLOR = "#2c2f33"
 FG_COLOR = "#ffffff"
@@ -11,7 +15,20 @@ SELECT_COLOR = "#5865f2"
 TODAY_COLOR = "#43b581"
 EVENT_COLOR = "#faa61a"
 DISABLED_COLOR = "#99aab5"
-FILENAME = "timetable.txt"
+HEAT_COLORS = [BG_COLOR, "#6b4f1d", "#b07a1b", EVENT_COLOR]  # year view: 0, 1, 2, 3+ events
+YEAR_CELL = 14  # pixels per day in the year view
+NO_REPEAT = "Does not repeat"
+GRID_WEEKS = 6  # a month spans at most six Monday-to-Sunday weeks
+
+
+@functools.lru_cache(maxsize=48)
+def month_layout(year, month):
+    """Return the GRID_WEEKS * 7 dates shown for a month, Monday first,
+    padded with the following days when the month needs fewer weeks."""
+    days = [day for week in calendar.Calendar(firstweekday=0).monthdatescalendar(year, month) for day in week]
+    while len(days) < GRID_WEEKS * 7:
+        days.append(days[-1] + timedelta(days=1))
+    return tuple(days)
 
 class BaseCalendar(tk.Tk):
     """Base calendar window with navigation and date selection."""
@@ -92,33 +109,18 @@ class BaseCalendar(tk.Tk):
         # To be overridden in subclass
         pass
 
-class EventManager:
-    """Handles loading, saving, and managing events."""
-    def __init__(self):
-        self.events = self.load_events()
-
-    def load_events(self):
-        events = {}
-        if os.path.exists(FILENAME):
-            with open(FILENAME, "r") as f:
-                for line in f:
-                    date, time, name = line.strip().split(" | ")
-                    if date not in events:
-                        events[date] = []
-                    events[date].append((time, name))
-        return events
-
-    def save_events(self):
-        with open(FILENAME, "w") as f:
-            for date in self.events:
-                for time, name in self.events[date]:
-                    f.write(f"{date} | {time} | {name}\n")
-
-class DarkCalendar(BaseCalendar, EventManager):
-    """Main calendar app with event management and UI."""
-    def __init__(self):
+class DarkCalendar(BaseCalendar):
+    """Main calendar app with event management and UI.
+
+    The events are those of the shared EventManager (see shared_store), so
+    every open calendar window shows the same events; each redraws when
+    the manager publishes a change.
+    """
+    def __init__(self, manager=None):
         BaseCalendar.__init__(self)
-        EventManager.__init__(self)
+        self.manager = manager or shared_store.calendar_events()
+        self.reported_bad_rows = 0
+        self.shown_events = []
 
         self.event_label = tk.Label(self, text="Events:", bg=BG_COLOR, fg=FG_COLOR, font=("Arial", 12))
         self.event_label.pack(pady=5)
@@ -141,6 +143,26 @@ class DarkCalendar(BaseCalendar, EventManager):
                                      bg="#e74c3c", fg="white", relief="flat", width=12)
         delete_event_btn.grid(row=0, column=2, padx=5)
 
+        agenda_btn = tk.Button(event_btns, text="Agenda", command=self.show_agenda,
+                               bg=BTN_COLOR, fg="white", relief="flat", width=12)
+        agenda_btn.grid(row=0, column=3, padx=5)
+
+        year_btn = tk.Button(event_btns, text="Year View", command=self.show_year,
+                             bg=BTN_COLOR, fg="white", relief="flat", width=12)
+        year_btn.grid(row=1, column=0, padx=5, pady=5)
+
+        import_btn = tk.Button(event_btns, text="Import .ics", command=self.import_calendar,
+                               bg=BTN_COLOR, fg="white", relief="flat", width=12)
+        import_btn.grid(row=1, column=1, padx=5, pady=5)
+
+        export_btn = tk.Button(event_btns, text="Export .ics", command=self.export_calendar,
+                               bg=BTN_COLOR, fg="white", relief="flat", width=12)
+        export_btn.grid(row=1, column=2, padx=5, pady=5)
+
+        week_btn = tk.Button(event_btns, text="Week View", command=self.show_week,
+                             bg=BTN_COLOR, fg="white", relief="flat", width=12)
+        week_btn.grid(row=1, column=3, padx=5, pady=5)
+
         input_frame = tk.Frame(self, bg=BG_COLOR)
         input_frame.pack(pady=5)
 
@@ -155,61 +177,131 @@ class DarkCalendar(BaseCalendar, EventManager):
         self.event_entry = tk.Entry(input_frame, width=20)
         self.event_entry.grid(row=0, column=3, padx=5)
 
+        tk.Label(input_frame, text="Repeat:", bg=BG_COLOR, fg=FG_COLOR).grid(row=1, column=0, padx=5, pady=5)
+        self.repeat_var = tk.StringVar(value=NO_REPEAT)
+        repeats = [NO_REPEAT] + [freq.capitalize() for freq in FREQUENCIES]
+        ttk.Combobox(input_frame, textvariable=self.repeat_var, values=repeats, state="readonly",
+                     width=14).grid(row=1, column=1, padx=5, pady=5)
+
+        tk.Label(input_frame, text="Until (YYYY-MM-DD):", bg=BG_COLOR, fg=FG_COLOR).grid(row=1, column=2, padx=5, pady=5)
+        self.until_entry = tk.Entry(input_frame, width=20)
+        self.until_entry.grid(row=1, column=3, padx=5, pady=5)
+
+        self.remind_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(input_frame, text="🔔 Remind me", variable=self.remind_var, bg=BG_COLOR, fg=FG_COLOR,
+                       selectcolor=BG_COLOR, activebackground=BG_COLOR).grid(row=0, column=4, padx=5)
+
+        search_frame = tk.Frame(self, bg=BG_COLOR)
+        search_frame.pack(pady=5)
+
+        tk.Label(search_frame, text="Search:", bg=BG_COLOR, fg=FG_COLOR).grid(row=0, column=0, padx=5)
+        self.search_entry = tk.Entry(search_frame, width=30)
+        self.search_entry.grid(row=0, column=1, padx=5)
+        self.search_entry.bind("<Return>", lambda e: self.show_search())
+
+        search_btn = tk.Button(search_frame, text="Find", command=self.show_search,
+                               bg=BTN_COLOR, fg="white", relief="flat", width=8)
+        search_btn.grid(row=0, column=2, padx=5)
+
+        self.build_grid()
         self.draw_calendar()
+        self.unsubscribe = self.manager.subscribe(self.on_events_changed)
 
-    def draw_calendar(self):
-        # Draw the calendar grid for the current month
-        for widget in self.cal_frame.winfo_children():
-            widget.destroy()
+    def destroy(self):
+        self.unsubscribe()
+        super().destroy()
 
-        year = self.current_date.year
-        month = self.current_date.month
-        self.date_label.config(text=self.current_date.strftime("%B %Y"))
+    def on_events_changed(self, change, item):
+        self.draw_calendar()
+        if self.selected_date:
+            self.show_events(self.selected_date)
 
+    def build_grid(self):
+        # The weekday header and GRID_WEEKS x 7 day cells are made once;
+        # draw_calendar only reconfigures them.
         days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
         for i, day in enumerate(days):
             tk.Label(self.cal_frame, text=day, bg=BG_COLOR, fg=FG_COLOR, width=6).grid(row=0, column=i)
 
-        cal = calendar.Calendar(firstweekday=0)
-        month_days = cal.monthdatescalendar(year, month)
-
-        for row, week in enumerate(month_days, start=1):
-            for col, day in enumerate(week):
-                if day.month != month:
-                    lbl = tk.Label(self.cal_frame, text=day.day, bg=BG_COLOR, fg=DISABLED_COLOR, width=6)
-                else:
-                    bg = BG_COLOR
-                    fg = FG_COLOR
-                    date_str = day.strftime("%Y-%m-%d")
-
-                    if self.selected_date and day == self.selected_date:
-                        bg = SELECT_COLOR
-                        fg = "white"
-                    elif day == self.today.date():
-                        bg = TODAY_COLOR
-                        fg = "white"
-                    elif date_str in self.events:
-                        bg = EVENT_COLOR
-                        fg = "black"
-
-                    lbl = tk.Label(self.cal_frame, text=day.day, bg=bg, fg=fg, width=6)
-                    lbl.bind("<Button-1>", lambda e, d=day: self.select_date(d))
-                lbl.grid(row=row, column=col, padx=2, pady=2)
+        self.day_cells = []
+        self.cell_looks = []
+        self.cell_dates = []
+        for index in range(GRID_WEEKS * 7):
+            lbl = tk.Label(self.cal_frame, text="", bg=BG_COLOR, fg=FG_COLOR, width=6)
+            lbl.bind("<Button-1>", lambda e, i=index: self.on_cell_click(i))
+            lbl.grid(row=index // 7 + 1, column=index % 7, padx=2, pady=2)
+            self.day_cells.append(lbl)
+            self.cell_looks.append(None)
+            self.cell_dates.append(None)
+        self.cells_configured = 0
+
+    def on_cell_click(self, index):
+        day = self.cell_dates[index]
+        if day is not None and day.month == self.current_date.month:
+            self.select_date(day)
+
+    def draw_calendar(self):
+        # Reconfigure the day cells for the current month; only cells whose
+        # look changed are touched, so moving the selection costs two.
+        year = self.current_date.year
+        month = self.current_date.month
+        self.manager.load_month(year, month)
+        self.report_bad_rows()
+        self.date_label.config(text=self.current_date.strftime("%B %Y"))
+
+        event_days = self.manager.event_days(year, month)
+        today = self.today.date()
+        for index, day in enumerate(month_layout(year, month)):
+            if day.month != month:
+                look = (day.day, BG_COLOR, DISABLED_COLOR)
+            elif self.selected_date and day == self.selected_date:
+                look = (day.day, SELECT_COLOR, "white")
+            elif day == today:
+                look = (day.day, TODAY_COLOR, "white")
+            elif day.day in event_days:
+                look = (day.day, EVENT_COLOR, "black")
+            else:
+                look = (day.day, BG_COLOR, FG_COLOR)
+            self.cell_dates[index] = day
+            if self.cell_looks[index] != look:
+                text, bg, fg = look
+                self.day_cells[index].config(text=text, bg=bg, fg=fg)
+                self.cell_looks[index] = look
+                self.cells_configured += 1
 
         self.month_var.set(calendar.month_name[month])
         self.year_var.set(str(year))
 
+    def report_bad_rows(self):
+        if len(self.manager.bad_rows) > self.reported_bad_rows:
+            new_rows = self.manager.bad_rows[self.reported_bad_rows:]
+            self.reported_bad_rows = len(self.manager.bad_rows)
+            details = "\n".join(f"{os.path.basename(row.path)}{f' line {row.line_no}' if row.line_no else ''}: {row.reason}"
+                                for row in new_rows[:5])
+            if len(new_rows) > 5:
+                details += f"\n... and {len(new_rows) - 5} more"
+            messagebox.showwarning("Timetable Errors", f"Skipped {len(new_rows)} unreadable line(s):\n{details}")
+
     def show_events(self, date):
+        self.manager.load_month(date.year, date.month)
         date_str = date.strftime("%Y-%m-%d")
         self.event_list.delete(0, tk.END)
         self.event_list.insert(tk.END, f"📅 {date.strftime('%d-%m-%Y')}")
         self.event_list.insert(tk.END, "-" * 40)
-        if date_str in self.events:
-            for time, name in sorted(self.events[date_str]):
-                self.event_list.insert(tk.END, f" ⏰ {time} - {name}")
-        else:
+        self.shown_events = self.manager.day_events(date_str)
+        for time, name, rule_id in self.shown_events:
+            repeat = " 🔁" if rule_id else ""
+            self.event_list.insert(tk.END, f" ⏰ {time} - {name}{repeat}")
+        if not self.shown_events:
             self.event_list.insert(tk.END, " No events.")
 
+    def selected_event(self):
+        """Return the (time, name, rule_id) selected in the event list, or None."""
+        selection = self.event_list.curselection()
+        if not selection or selection[0] < 2 or selection[0] - 2 >= len(self.shown_events):
+            return None
+        return self.shown_events[selection[0] - 2]
+
     def add_event(self):
         if not self.selected_date:
             messagebox.showwarning("No Date Selected", "Please select a date first.")
@@ -223,15 +315,38 @@ class DarkCalendar(BaseCalendar, EventManager):
             messagebox.showwarning("Input Error", "Please enter both time and event name.")
             return
 
-        if date_str not in self.events:
-            self.events[date_str] = []
-        self.events[date_str].append((time, name))
-        self.save_events()
-        self.show_events(self.selected_date)
-        self.draw_calendar()
+        repeat = self.repeat_var.get()
+        remind = self.remind_var.get()
+        if remind and repeat == NO_REPEAT and datetime.strptime(f"{date_str} {time}", "%Y-%m-%d %H:%M") < datetime.now():
+            messagebox.showwarning("Input Error", "Reminders can only be set for events in the future.")
+            return
+        if repeat == NO_REPEAT:
+            self.manager.insert_event(date_str, time, name)
+            if remind:
+                shared_store.reminders().add(name, f"{date_str} {time}", event=(date_str, time, name))
+        else:
+            until = self.until_entry.get().strip() or None
+            try:
+                if until and datetime.strptime(until, "%Y-%m-%d").date() < self.selected_date:
+                    raise ValueError
+            except ValueError:
+                messagebox.showwarning("Input Error", "The until date must be a YYYY-MM-DD date on or after the event.")
+                return
+            rule = RecurrenceRule(date_str, time, name, repeat.lower(), 1, until)
+            if remind:
+                try:
+                    shared_store.reminders().add(name, f"{date_str} {time}", rule.freq, until, rule=rule.rule_id,
+                                                 interval=rule.interval)
+                except ValueError:
+                    messagebox.showwarning("Input Error", "Reminders can only be set for events in the future.")
+                    return
+            self.manager.add_rule(rule)
 
         self.time_var.set("")
         self.event_entry.delete(0, tk.END)
+        self.repeat_var.set(NO_REPEAT)
+        self.until_entry.delete(0, tk.END)
+        self.remind_var.set(False)
 
     def delete_event(self):
         if not self.selected_date:
@@ -239,34 +354,38 @@ class DarkCalendar(BaseCalendar, EventManager):
             return
 
         date_str = self.selected_date.strftime("%Y-%m-%d")
-
-        try:
-            selection = self.event_list.curselection()
-            if not selection or selection[0] < 2:
-                raise IndexError
-            event_index = selection[0] - 2
-            del self.events[date_str][event_index]
-            if not self.events[date_str]:
-                del self.events[date_str]
-            self.save_events()
-            self.show_events(self.selected_date)
-            self.draw_calendar()
-        except IndexError:
+        event = self.selected_event()
+        if event is None:
             messagebox.showwarning("No Event Selected", "Please select an event to delete.")
+            return
+
+        time, name, rule_id = event
+        if rule_id is None:
+            self.manager.remove_event(date_str, self.manager.events.position(date_str, time, name))
+        else:
+            answer = messagebox.askyesnocancel(
+                "Delete Repeating Event",
+                f"'{name}' repeats {self.manager.recurring.rules[rule_id].describe()}.\n\n"
+                "Yes: delete every occurrence\nNo: delete only this date")
+            if answer is None:
+                return
+            if answer:
+                self.manager.remove_rule(rule_id)
+            else:
+                self.manager.skip_occurrence(rule_id, date_str)
 
     def edit_event(self):
         if not self.selected_date:
             messagebox.showwarning("No Date Selected", "Please select a date first.")
             return
 
-        selection = self.event_list.curselection()
-        if not selection or selection[0] < 2:
+        event = self.selected_event()
+        if event is None:
             messagebox.showwarning("No Event Selected", "Please select an event to edit.")
             return
 
         date_str = self.selected_date.strftime("%Y-%m-%d")
-        event_index = selection[0] - 2
-        old_time, old_name = self.events[date_str][event_index]
+        old_time, old_name, rule_id = event
 
         self.time_var.set(old_time)
         self.event_entry.delete(0, tk.END)
@@ -278,21 +397,254 @@ class DarkCalendar(BaseCalendar, EventManager):
             if not new_time or not new_name:
                 messagebox.showwarning("Input Error", "Please enter both time and event name.")
                 return
-            self.events[date_str][event_index] = (new_time, new_name)
-            self.save_events()
-            self.show_events(self.selected_date)
-            self.draw_calendar()
+            if rule_id is None:
+                self.manager.replace_event(date_str, self.manager.events.position(date_str, old_time, old_name), new_time, new_name)
+            else:
+                self.manager.update_rule(rule_id, new_time, new_name)
             edit_window.destroy()
 
         edit_window = tk.Toplevel(self)
         edit_window.title("Edit Event")
         edit_window.configure(bg=BG_COLOR)
 
-        tk.Label(edit_window, text="Editing Event:", bg=BG_COLOR, fg=FG_COLOR).pack(pady=5)
+        heading = "Editing Event:" if rule_id is None else "Editing every occurrence of:"
+        tk.Label(edit_window, text=heading, bg=BG_COLOR, fg=FG_COLOR).pack(pady=5)
         tk.Label(edit_window, text=f"{old_time} - {old_name}", bg=BG_COLOR, fg=FG_COLOR).pack(pady=5)
         tk.Button(edit_window, text="Save Changes", command=save_edit,
                   bg=BTN_COLOR, fg="white", relief="flat").pack(pady=10)
 
+    def show_agenda(self):
+        # The selected date's week, then what is coming up from now.
+        day = self.selected_date or self.today.date()
+        agenda_window = tk.Toplevel(self)
+        agenda_window.title("Agenda")
+        agenda_window.configure(bg=BG_COLOR)
+        agenda_list = tk.Listbox(agenda_window, width=50, height=20, bg=BG_COLOR, fg=FG_COLOR, selectbackground=SELECT_COLOR)
+        agenda_list.pack(padx=10, pady=10)
+
+        monday = day - timedelta(days=day.weekday())
+        agenda_list.insert(tk.END, f"📅 Week of {monday.strftime('%d-%m-%Y')}")
+        agenda_list.insert(tk.END, "-" * 50)
+        week = self.manager.week_events(day)
+        for date_str, time, name in week:
+            weekday = datetime.strptime(date_str, "%Y-%m-%d").strftime("%a")
+            agenda_list.insert(tk.END, f" {weekday} {date_str[8:]} ⏰ {time} - {name}")
+        if not week:
+            agenda_list.insert(tk.END, " No events.")
+
+        agenda_list.insert(tk.END, "")
+        agenda_list.insert(tk.END, "⏭ Upcoming")
+        agenda_list.insert(tk.END, "-" * 50)
+        upcoming = self.manager.next_events(datetime.now(), 10)
+        for date_str, time, name in upcoming:
+            agenda_list.insert(tk.END, f" {date_str} ⏰ {time} - {name}")
+        if not upcoming:
+            agenda_list.insert(tk.END, " No upcoming events.")
+
+    def show_year(self):
+        # Twelve small months coloured by how many events each day has. The
+        # squares are made once; changing year only recolours them from
+        # day_counts.
+        year_window = tk.Toplevel(self)
+        year_window.title("Year View")
+        year_window.configure(bg=BG_COLOR)
+        state = {"year": (self.selected_date or self.today.date()).year}
+
+        header = tk.Frame(year_window, bg=BG_COLOR)
+        header.pack(pady=5)
+        year_label = tk.Label(header, text="", bg=BG_COLOR, fg=FG_COLOR, font=("Arial", 14), width=8)
+        canvas = tk.Canvas(year_window, bg=BG_COLOR, highlightthickness=0,
+                           width=4 * 8 * YEAR_CELL, height=3 * 8.5 * YEAR_CELL)
+        canvas.pack(padx=10, pady=10)
+
+        squares, cell_dates = [], []
+        for month in range(12):
+            left = (month % 4) * 8 * YEAR_CELL
+            top = (month // 4) * 8.5 * YEAR_CELL
+            canvas.create_text(left + 3.5 * YEAR_CELL, top + YEAR_CELL / 2, text=calendar.month_abbr[month + 1],
+                               fill=FG_COLOR)
+            for index in range(GRID_WEEKS * 7):
+                x = left + (index % 7) * YEAR_CELL
+                y = top + (index // 7 + 1.2) * YEAR_CELL
+                square = canvas.create_rectangle(x, y, x + YEAR_CELL - 2, y + YEAR_CELL - 2, outline="")
+                canvas.tag_bind(square, "<Button-1>", lambda e, i=len(squares): open_day(i))
+                squares.append(square)
+                cell_dates.append(None)
+
+        def draw():
+            year = state["year"]
+            year_label.config(text=str(year))
+            counts = self.manager.day_counts(year)
+            first = date(year, 1, 1).toordinal()
+            for month in range(12):
+                for index, day in enumerate(month_layout(year, month + 1)):
+                    cell = month * GRID_WEEKS * 7 + index
+                    if day.month != month + 1:
+                        canvas.itemconfigure(squares[cell], state="hidden")
+                        cell_dates[cell] = None
+                        continue
+                    count = counts[day.toordinal() - first]
+                    canvas.itemconfigure(squares[cell], state="normal", fill=HEAT_COLORS[min(count, 3)],
+                                         outline="" if count else "#40444b")
+                    cell_dates[cell] = day
+
+        def open_day(cell):
+            if cell_dates[cell] is not None:
+                self.select_date(cell_dates[cell])
+
+        def change_year(step):
+            state["year"] += step
+            draw()
+
+        tk.Button(header, text="Prev.", command=lambda: change_year(-1),
+                  bg=BTN_COLOR, fg="white", relief="flat", width=8).grid(row=0, column=0, padx=10)
+        year_label.grid(row=0, column=1)
+        tk.Button(header, text="Next", command=lambda: change_year(1),
+                  bg=BTN_COLOR, fg="white", relief="flat", width=8).grid(row=0, column=2, padx=10)
+        draw()
+
+    def show_week(self):
+        # One column per day of the selected date's week, headed with its
+        # event count; Prev./Next move a week at a time.
+        week_window = tk.Toplevel(self)
+        week_window.title("Week View")
+        week_window.configure(bg=BG_COLOR)
+        day = self.selected_date or self.today.date()
+        state = {"monday": day - timedelta(days=day.weekday())}
+
+        header = tk.Frame(week_window, bg=BG_COLOR)
+        header.pack(pady=5)
+        week_label = tk.Label(header, text="", bg=BG_COLOR, fg=FG_COLOR, font=("Arial", 14), width=22)
+        days_frame = tk.Frame(week_window, bg=BG_COLOR)
+        days_frame.pack(padx=10, pady=10)
+
+        day_labels, day_lists = [], []
+        for column in range(7):
+            label = tk.Label(days_frame, text="", bg=BG_COLOR, fg=FG_COLOR, width=16)
+            label.grid(row=0, column=column)
+            day_list = tk.Listbox(days_frame, width=16, height=12, bg=BG_COLOR, fg=FG_COLOR,
+                                  selectbackground=SELECT_COLOR)
+            day_list.grid(row=1, column=column, padx=2)
+            day_list.bind("<Double-Button-1>", lambda e, c=column: self.select_date(state["monday"] + timedelta(days=c)))
+            day_labels.append(label)
+            day_lists.append(day_list)
+
+        def draw():
+            monday = state["monday"]
+            week_label.config(text=f"Week of {monday.strftime('%d-%m-%Y')}")
+            for day_list in day_lists:
+                day_list.delete(0, tk.END)
+            for date_str, time, name in self.manager.week_events(monday):
+                day_lists[datetime.strptime(date_str, "%Y-%m-%d").weekday()].insert(tk.END, f"{time} {name}")
+            for column in range(7):
+                day = monday + timedelta(days=column)
+                count = self.manager.day_counts(day.year)[day.toordinal() - date(day.year, 1, 1).toordinal()]
+                today = day == self.today.date()
+                day_labels[column].config(text=f"{day.strftime('%a %d')} ({count})",
+                                          bg=TODAY_COLOR if today else (EVENT_COLOR if count else BG_COLOR),
+                                          fg="black" if count and not today else FG_COLOR)
+
+        def change_week(step):
+            state["monday"] += timedelta(weeks=step)
+            draw()
+
+        tk.Button(header, text="Prev.", command=lambda: change_week(-1),
+                  bg=BTN_COLOR, fg="white", relief="flat", width=8).grid(row=0, column=0, padx=10)
+        week_label.grid(row=0, column=1)
+        tk.Button(header, text="Next", command=lambda: change_week(1),
+                  bg=BTN_COLOR, fg="white", relief="flat", width=8).grid(row=0, column=2, padx=10)
+        draw()
+
+    def show_search(self):
+        # Upcoming matches first, then the most recent earlier ones; picking
+        # one opens its date.
+        query = self.search_entry.get().strip()
+        if not words(query):
+            messagebox.showwarning("Input Error", "Please enter a word to search for.")
+            return
+        now = (datetime.now().strftime("%Y-%m-%d"), datetime.now().strftime("%H:%M"))
+        if self.manager.search_index is None:
+            self.config(cursor="watch")
+            self.update_idletasks()
+            try:
+                self.manager.build_search_index()
+            finally:
+                self.config(cursor="")
+        upcoming = self.manager.search_events(query, now)
+        earlier = self.manager.search_events(query, now, reverse=True)
+
+        results_window = tk.Toplevel(self)
+        results_window.title(f"Search: {query}")
+        results_window.configure(bg=BG_COLOR)
+        results_list = tk.Listbox(results_window, width=50, height=20, bg=BG_COLOR, fg=FG_COLOR, selectbackground=SELECT_COLOR)
+        results_list.pack(padx=10, pady=10)
+
+        rows = []  # listbox line -> date string, or None for headings
+        for heading, found in (("⏭ Upcoming", upcoming), ("⏮ Earlier", earlier)):
+            results_list.insert(tk.END, heading)
+            results_list.insert(tk.END, "-" * 50)
+            rows += [None, None]
+            for date_str, time, name in found:
+                results_list.insert(tk.END, f" {date_str} ⏰ {time} - {name}")
+                rows.append(date_str)
+            if not found:
+                results_list.insert(tk.END, " No matches.")
+                rows.append(None)
+            results_list.insert(tk.END, "")
+            rows.append(None)
+
+        def open_result(event):
+            selection = results_list.curselection()
+            if selection and rows[selection[0]]:
+                self.select_date(datetime.strptime(rows[selection[0]], "%Y-%m-%d").date())
+
+        results_list.bind("<<ListboxSelect>>", open_result)
+
+    def import_calendar(self):
+        path = filedialog.askopenfilename(title="Import Calendar",
+                                          filetypes=[("iCalendar files", "*.ics"), ("All files", "*.*")])
+        if not path:
+            return
+        self.config(cursor="watch")
+        self.update_idletasks()
+        try:
+            counts = self.manager.import_ics(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import Failed", f"Could not import {os.path.basename(path)}:\n{e}")
+            return
+        finally:
+            self.config(cursor="")
+        summary = "\n".join(f"{what.capitalize()}: {counts[what]}" for what in
+                            ("added", "updated", "unchanged", "duplicate", "cancelled", "skipped") if counts[what])
+        messagebox.showinfo("Import Complete", summary or "The file has no events.")
+
+    def export_calendar(self):
+        first = self.current_date.replace(day=1).strftime("%Y-%m-%d")
+        last = self.current_date.replace(day=calendar.monthrange(self.current_date.year, self.current_date.month)[1])
+        start = simpledialog.askstring("Export Calendar", "From (YYYY-MM-DD):", initialvalue=first, parent=self)
+        if not start:
+            return
+        end = simpledialog.askstring("Export Calendar", "To (YYYY-MM-DD):", initialvalue=last.strftime("%Y-%m-%d"),
+                                     parent=self)
+        if not end:
+            return
+        try:
+            if datetime.strptime(end, "%Y-%m-%d") < datetime.strptime(start, "%Y-%m-%d"):
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("Input Error", "Please enter two YYYY-MM-DD dates, the first not after the second.")
+            return
+        path = filedialog.asksaveasfilename(title="Export Calendar", defaultextension=".ics",
+                                            filetypes=[("iCalendar files", "*.ics")])
+        if not path:
+            return
+        try:
+            count = self.manager.export_ics(path, start, end)
+        except OSError as e:
+            messagebox.showerror("Export Failed", f"Could not write {os.path.basename(path)}:\n{e}")
+            return
+        messagebox.showinfo("Export Complete", f"Exported {count} event(s).")
+
 def run_calender_app():
     app = DarkCalendar()
     app.mainloop()
@@ -0,0 +1,163 @@
+"""Calendar events kept in order, for range and "what's next" queries.
+
+Events are held compactly. A day is keyed by its ordinal (days since
+0001-01-01), and days is a dict of ordinal -> Day. dates is a sorted
+array of the ordinals that have events. A Day holds its events as two
+parallel columns, sorted by (minute, name):
+- minutes is an array of minutes past midnight, 2 bytes each.
+- names is a list of interned name strings, so each distinct name is
+  stored once however often it recurs.
+Finding where a range starts is a binary search on dates and then on the
+first day's minutes; the range is then read off in order, so a query
+costs O(log n) plus the events it returns.
+
+"YYYY-MM-DD" and "HH:MM" strings are what the methods take and return,
+for the file format and the UI. They are converted at these edges only,
+through cached tables, and comparisons inside are on integers. Ranges
+are half-open: start <= event < end.
+"""
+import array
+import bisect
+import functools
+import itertools
+import sys
+from datetime import date
+
+TIMES = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(24 * 60)]
+
+
+@functools.lru_cache(maxsize=8192)
+def day_number(date_str):
+    return date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10])).toordinal()
+
+
+@functools.lru_cache(maxsize=8192)
+def day_string(ordinal):
+    return date.fromordinal(ordinal).isoformat()
+
+
+@functools.lru_cache(maxsize=2048)
+def minute_of(time_str):
+    """Minutes past midnight for "HH:MM"."""
+    return int(time_str[:2]) * 60 + int(time_str[3:5])
+
+
+class Day:
+    __slots__ = ("minutes", "names")
+
+    def __init__(self):
+        self.minutes = array.array("H")
+        self.names = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, minute, name):
+        """Return the position just after every event equal to or before (minute, name)."""
+        low = bisect.bisect_left(self.minutes, minute)
+        high = bisect.bisect_right(self.minutes, minute, low)
+        return bisect.bisect_right(self.names, name, low, high)
+
+    def insert(self, minute, name):
+        position = self.find(minute, name)
+        self.minutes.insert(position, minute)
+        self.names.insert(position, name)
+        return position
+
+    def events(self):
+        return [(TIMES[minute], name) for minute, name in zip(self.minutes, self.names)]
+
+
+class EventIndex:
+    def __init__(self):
+        self.days = {}
+        self.dates = array.array("i")
+
+    def __contains__(self, date_str):
+        return day_number(date_str) in self.days
+
+    def __len__(self):
+        return sum(len(day) for day in self.days.values())
+
+    def _day(self, ordinal):
+        day = self.days.get(ordinal)
+        if day is None:
+            day = self.days[ordinal] = Day()
+            bisect.insort(self.dates, ordinal)
+        return day
+
+    def on(self, date_str):
+        """Return the day's [(time, name)] in time order."""
+        day = self.days.get(day_number(date_str))
+        return day.events() if day else []
+
+    def position(self, date_str, time_str, name):
+        """Return the position of an event within its day, or raise ValueError."""
+        day = self.days.get(day_number(date_str))
+        minute = minute_of(time_str)
+        position = day.find(minute, name) - 1 if day else -1
+        if position < 0 or day.minutes[position] != minute or day.names[position] != name:
+            raise ValueError(f"no event {time_str} {name!r} on {date_str}")
+        return position
+
+    def add(self, date_str, time_str, name):
+        """Insert one event and return its position within the day."""
+        return self._day(day_number(date_str)).insert(minute_of(time_str), sys.intern(name))
+
+    def add_day(self, date_str, events):
+        """Add several events to one day at once (used when loading)."""
+        day = self._day(day_number(date_str))
+        intern = sys.intern
+        rows = [(minute_of(time_str), intern(name)) for time_str, name in events]
+        rows.extend(zip(day.minutes, day.names))
+        rows.sort()
+        day.minutes = array.array("H", [minute for minute, _ in rows])
+        day.names = [name for _, name in rows]
+
+    def remove(self, date_str, position):
+        """Remove and return the (time, name) at position within the day."""
+        ordinal = day_number(date_str)
+        day = self.days[ordinal]
+        minute, name = day.minutes.pop(position), day.names.pop(position)
+        if not day.names:
+            del self.days[ordinal]
+            del self.dates[bisect.bisect_left(self.dates, ordinal)]
+        return TIMES[minute], name
+
+    def _span(self, start_date, end_date):
+        return (bisect.bisect_left(self.dates, day_number(start_date)),
+                bisect.bisect_right(self.dates, day_number(end_date)))
+
+    def drop_between(self, start_date, end_date):
+        """Forget every event from start_date to end_date (inclusive)."""
+        low, high = self._span(start_date, end_date)
+        for ordinal in self.dates[low:high]:
+            del self.days[ordinal]
+        del self.dates[low:high]
+
+    def days_between(self, start_date, end_date):
+        """Return the ordinals of the days from start_date to end_date (inclusive) that have events."""
+        low, high = self._span(start_date, end_date)
+        return self.dates[low:high]
+
+    def dates_between(self, start_date, end_date):
+        """Return the dates from start_date to end_date (inclusive) that have events."""
+        return [day_string(ordinal) for ordinal in self.days_between(start_date, end_date)]
+
+    def between(self, start_date, start_time, end_date, end_time):
+        """Yield (date, time, name) from (start_date, start_time) up to, not
+        including, (end_date, end_time), in order."""
+        first, last = day_number(start_date), day_number(end_date)
+        low, high = bisect.bisect_left(self.dates, first), bisect.bisect_right(self.dates, last)
+        for i in range(low, high):
+            ordinal = self.dates[i]
+            day = self.days[ordinal]
+            start = bisect.bisect_left(day.minutes, minute_of(start_time)) if ordinal == first else 0
+            end = bisect.bisect_left(day.minutes, minute_of(end_time)) if ordinal == last else len(day)
+            date_str = day_string(ordinal)
+            for minute, name in zip(day.minutes[start:end], day.names[start:end]):
+                yield date_str, TIMES[minute], name
+
+    def after(self, date_str, time_str, count):
+        """Return the first count events at or after (date_str, time_str)."""
+        return list(itertools.islice(self.between(date_str, time_str, "9999-12-31", "99:99"), count))
@@ -0,0 +1,119 @@
+"""Memory and query benchmark for event_index.EventIndex.
+
+    python event_index_benchmark.py [--events 1000000] [--years 10]
+
+Builds a synthetic timetable a month at a time, the way
+EventManager.load_month does, twice:
+- into an EventIndex;
+- into the representation it replaced, a dict of "YYYY-MM-DD" -> sorted
+  list of (time, name) tuples, with strings as fresh as if read from a
+  file.
+It reports the memory each holds (measured with tracemalloc), the build
+time, and the time of a "next 10 events" query and of a full range scan.
+It exits with status 1 if the index does not save at least 3x the memory.
+"""
+import argparse
+import bisect
+import itertools
+import random
+import sys
+import time
+import tracemalloc
+
+from event_index import EventIndex
+
+NAMES = 5300  # distinct event names
+MIN_SAVING = 3
+
+
+def month_rows(year, month, count, rng):
+    """Return {date: [(time, name)]} for one month, every string made afresh."""
+    days = {}
+    for _ in range(count):
+        date_str = f"{year:04d}-{month:02d}-{rng.randrange(1, 29):02d}"
+        days.setdefault(date_str, []).append((f"{rng.randrange(8, 20):02d}:{rng.choice((0, 30)):02d}",
+                                              f"Course {rng.randrange(NAMES)} lecture"))
+    return days
+
+
+def months(years):
+    return [(2025 + n // 12, n % 12 + 1) for n in range(years * 12)]
+
+
+def build_index(events, years):
+    index, rng = EventIndex(), random.Random(1)
+    for year, month in months(years):
+        for date_str, day_events in month_rows(year, month, events // (years * 12), rng).items():
+            index.add_day(date_str, day_events)
+    return index
+
+
+def build_dict(events, years):
+    by_date, rng = {}, random.Random(1)
+    for year, month in months(years):
+        for date_str, day_events in month_rows(year, month, events // (years * 12), rng).items():
+            by_date.setdefault(date_str, []).extend(day_events)
+            by_date[date_str].sort()
+    return by_date
+
+
+def dict_after(by_date, sorted_dates, date_str, time_str, count):
+    found = []
+    for day in itertools.islice(sorted_dates, bisect.bisect_left(sorted_dates, date_str), None):
+        for time_str_, name in by_date[day]:
+            if (day, time_str_) >= (date_str, time_str):
+                found.append((day, time_str_, name))
+                if len(found) == count:
+                    return found
+    return found
+
+
+def dict_between(by_date, sorted_dates):
+    for day in sorted_dates:
+        for time_str, name in by_date[day]:
+            yield day, time_str, name
+
+
+def measure(build, events, years):
+    tracemalloc.start()
+    started = time.perf_counter()
+    built = build(events, years)
+    elapsed = time.perf_counter() - started
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, held, elapsed
+
+
+def timed(action, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        action()
+    return (time.perf_counter() - started) / runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare EventIndex with the dict of tuples it replaced.")
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    index, index_memory, index_build = measure(build_index, args.events, args.years)
+    by_date, dict_memory, dict_build = measure(build_dict, args.events, args.years)
+    sorted_dates = sorted(by_date)
+    print(f"{len(index)} events over {args.years} years")
+    print(f"  memory   dict {dict_memory / 1e6:7.1f} MB   index {index_memory / 1e6:7.1f} MB   "
+          f"({dict_memory / index_memory:.1f}x smaller)")
+    print(f"  build    dict {dict_build:7.2f} s    index {index_build:7.2f} s   (under tracemalloc)")
+    query = ("2030-06-15", "12:00", 10)
+    print(f"  after()  dict {timed(lambda: dict_after(by_date, sorted_dates, *query), 2000) * 1e6:7.1f} us   "
+          f"index {timed(lambda: index.after(*query), 2000) * 1e6:7.1f} us")
+    scan_dict = timed(lambda: sum(1 for _ in dict_between(by_date, sorted_dates)), 3)
+    scan_index = timed(lambda: sum(1 for _ in index.between("2025-01-01", "00:00", "9999-12-31", "23:59")), 3)
+    print(f"  scan     dict {scan_dict:7.2f} s    index {scan_index:7.2f} s")
+    if dict_memory < MIN_SAVING * index_memory:
+        print(f"FAIL: less than {MIN_SAVING}x smaller")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""Calendar events with no user interface.
+
+EventManager loads, saves and queries the events that calendar_app's
+windows show, and is shared with the other apps through shared_store. It
+needs no display, so scripts can use it as well (see ics_benchmark.py).
+"""
+import array
+import calendar
+import collections
+import heapq
+import itertools
+import json
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import ics_format
+from event_index import EventIndex, day_number
+from event_rules import AFTER_HORIZON, RecurringEvents
+from event_search import EventSearch, matches, words
+from file_utils import atomic_write, atomic_writer
+from shared_store import Publisher
+from timetable_format import BadRow
+from timetable_store import MonthShards
+
+FILENAME = "timetable.txt"  # single-file layout, migrated to EVENTS_DIR on first run
+EVENTS_DIR = "timetable.d"
+RULES_FILE = "recurring_events.json"
+IMPORTS_FILE = "imported_events.json"  # .ics UID -> what importing it added
+IMPORT_SEP = "\x1f"  # between the fields of an IMPORTS_FILE entry
+SEARCH_RESULTS = 50  # results shown for each of upcoming and earlier
+EVENT_DAYS_CACHE_SIZE = 24  # months whose event-day sets are kept
+
+
+class EventManager(Publisher):
+    """Handles loading, saving, and managing events.
+
+    Events are kept one file per month (see timetable_store) and read a
+    month at a time, when a month is first needed, so self.events (an
+    EventIndex) only holds the months listed in self.loaded_months. Range
+    queries load the months they cover first. Rows that cannot be read are
+    collected in self.bad_rows.
+
+    Repeating events are kept as rules in self.recurring (see event_rules)
+    and their occurrences are merged into the day, range and "next" queries.
+
+    self.search_index (an EventSearch) covers every month, loaded or not.
+    It is built by the first search and then kept up to date by the
+    methods that add, change and remove events.
+
+    Each change is published (see shared_store) as ("added", event),
+    ("removed", event), ("replaced", (old_event, new_event)) with events as
+    (date, time, name), ("rules", rule_id) or ("imported", counts).
+    """
+    def __init__(self):
+        Publisher.__init__(self)
+        self.timetable = MonthShards(EVENTS_DIR, FILENAME)
+        self.events = EventIndex()
+        self.loaded_months = set()
+        self.bad_rows = []
+        # (year, month) -> frozenset of day numbers with events, least
+        # recently used first; entries are dropped when their month changes.
+        self.event_days_cache = collections.OrderedDict()
+        # year -> array of the number of events on each day of the year,
+        # counted when a year is first shown and then kept up to date.
+        self.year_counts = {}
+        self.search_index = None
+        self.recurring = RecurringEvents(RULES_FILE)
+        try:
+            self.recurring.load()
+        except ValueError as e:
+            self.bad_rows.append(BadRow(RULES_FILE, 0, "", str(e)))
+
+    def event_days(self, year, month):
+        """Return the set of day numbers in a month that have events."""
+        key = (year, month)
+        days = self.event_days_cache.get(key)
+        if days is None:
+            self.load_month(year, month)
+            month_key = f"{year:04d}-{month:02d}"
+            first = day_number(f"{month_key}-01")
+            last_day = f"{month_key}-{calendar.monthrange(year, month)[1]:02d}"
+            days = frozenset(ordinal - first + 1 for ordinal in self.events.days_between(f"{month_key}-01", last_day))
+            days |= {int(date_str[8:]) for date_str in self.recurring.month(year, month)}
+            self.event_days_cache[key] = days
+            if len(self.event_days_cache) > EVENT_DAYS_CACHE_SIZE:
+                self.event_days_cache.popitem(last=False)
+        else:
+            self.event_days_cache.move_to_end(key)
+        return days
+
+    def load_events(self, start=None, end=None):
+        """Return {date: [(time, name)]} for dates from start to end ("YYYY-MM-DD", inclusive)."""
+        events = {}
+        for date_str, time_str, name in self.timetable.read(start, end, self.bad_rows):
+            events.setdefault(date_str, []).append((time_str, name))
+        return events
+
+    def load_month(self, year, month):
+        month_key = f"{year:04d}-{month:02d}"
+        if month_key not in self.loaded_months:
+            days = {}
+            for date_str, time_str, name in self.timetable.read_month(month_key, self.bad_rows):
+                days.setdefault(date_str, []).append((time_str, name))
+            for date_str, events in days.items():
+                self.events.add_day(date_str, events)
+            self.loaded_months.add(month_key)
+
+    def load_months_between(self, start_month, end_month):
+        for month_key in self.timetable.months():
+            if start_month <= month_key <= end_month:
+                self.load_month(int(month_key[:4]), int(month_key[5:]))
+
+    def save_events(self, date_str):
+        """Write out the month of date_str; other months are not touched."""
+        year, month = int(date_str[:4]), int(date_str[5:7])
+        self.event_days_cache.pop((year, month), None)
+        self.load_month(year, month)
+        rows = []
+        for day in range(1, calendar.monthrange(year, month)[1] + 1):
+            day_str = f"{date_str[:8]}{day:02d}"
+            rows.extend((day_str, time, name) for time, name in self.events.on(day_str))
+        self.timetable.write_month(date_str[:7], rows)
+
+    def insert_event(self, date_str, time, name):
+        """Add an event and save its month; return its position in the day's list."""
+        self.load_month(int(date_str[:4]), int(date_str[5:7]))
+        position = self.events.add(date_str, time, name)
+        self.save_events(date_str)
+        self._count(date_str, 1)
+        if self.search_index is not None:
+            self.search_index.add(date_str, time, name)
+        self.publish("added", (date_str, time, name))
+        return position
+
+    def day_events(self, date_str):
+        """Return the day's [(time, name, rule_id)] in time order; rule_id is
+        None for one-off events."""
+        self.load_month(int(date_str[:4]), int(date_str[5:7]))
+        one_off = ((time, name, None) for time, name in self.events.on(date_str))
+        return list(heapq.merge(one_off, self.recurring.on(date_str), key=lambda event: event[:2]))
+
+    def day_counts(self, year):
+        """Return an array of how many events each day of year has, 1 January first."""
+        counts = self.year_counts.get(year)
+        if counts is None:
+            counts = array.array("I", [0]) * 366
+            first = date(year, 1, 1).toordinal()
+            for date_str, _, _ in self.timetable.read(f"{year}-01-01", f"{year}-12-31"):
+                counts[date.fromisoformat(date_str).toordinal() - first] += 1
+            for month in range(1, 13):
+                for date_str, occurrences in self.recurring.month(year, month).items():
+                    counts[date.fromisoformat(date_str).toordinal() - first] += len(occurrences)
+            self.year_counts[year] = counts
+        return counts
+
+    def _count(self, date_str, change):
+        counts = self.year_counts.get(int(date_str[:4]))
+        if counts is not None:
+            day = date.fromisoformat(date_str)
+            counts[day.toordinal() - date(day.year, 1, 1).toordinal()] += change
+
+    def _count_rule(self, rule, change):
+        for year in self.year_counts:
+            for day in rule.dates(date(year, 1, 1), date(year, 12, 31)):
+                self._count(day.isoformat(), change)
+
+    def add_rule(self, rule):
+        self.recurring.add(rule)
+        self.event_days_cache.clear()
+        self._count_rule(rule, 1)
+        self.publish("rules", rule.rule_id)
+
+    def remove_rule(self, rule_id):
+        rule = self.recurring.remove(rule_id)
+        self.event_days_cache.clear()
+        self._count_rule(rule, -1)
+        self.publish("rules", rule_id)
+
+    def skip_occurrence(self, rule_id, date_str):
+        if date_str not in self.recurring.rules[rule_id].exceptions:
+            self._count(date_str, -1)
+        self.recurring.skip(rule_id, date_str)
+        self.event_days_cache.pop((int(date_str[:4]), int(date_str[5:7])), None)
+        self.publish("rules", rule_id)
+
+    def update_rule(self, rule_id, time, name):
+        self.recurring.update(rule_id, time, name)
+        self.publish("rules", rule_id)
+
+    def remove_event(self, date_str, position):
+        event = self.events.remove(date_str, position)
+        self.save_events(date_str)
+        self._count(date_str, -1)
+        if self.search_index is not None:
+            self.search_index.remove(date_str, *event)
+        self.publish("removed", (date_str,) + event)
+        return event
+
+    def replace_event(self, date_str, position, time, name):
+        old_time, old_name = self.events.remove(date_str, position)
+        position = self.events.add(date_str, time, name)
+        self.save_events(date_str)
+        if self.search_index is not None:
+            self.search_index.remove(date_str, old_time, old_name)
+            self.search_index.add(date_str, time, name)
+        self.publish("replaced", ((date_str, old_time, old_name), (date_str, time, name)))
+        return position
+
+    def build_search_index(self):
+        index = EventSearch()
+        index.add_many(self.timetable.read())
+        self.search_index = index
+
+    def search_events(self, query, start=None, limit=SEARCH_RESULTS, reverse=False):
+        """Return up to limit (date, time, name) whose names match query (see
+        event_search), from (date_str, time_str) start on, or going back
+        from just before start if reverse. Repeating events are included."""
+        if self.search_index is None:
+            self.build_search_index()
+        streams = [self.search_index.search(query, start, limit, reverse)]
+        terms = words(query)
+        start_date = date.fromisoformat(start[0]) if start else None
+        for rule in self.recurring.rules.values():
+            if not terms or not matches(rule.name, terms):
+                continue
+            if reverse:
+                dates = list(rule.dates(rule.start_date, start_date or date.max))[-limit - 1:][::-1]
+            else:
+                first = start_date or rule.start_date
+                dates = itertools.islice(rule.dates(first, first + AFTER_HORIZON), limit + 1)
+            occurrences = ((day.isoformat(), rule.time, rule.name) for day in dates)
+            if start:
+                occurrences = (event for event in occurrences if (event[:2] < start) == reverse)
+            streams.append(occurrences)
+        return list(itertools.islice(heapq.merge(*streams, reverse=reverse), limit))
+
+    def events_between(self, start, end):
+        """Return [(date, time, name)] for events from datetime start up to, not including, end."""
+        self.load_months_between(start.strftime("%Y-%m"), end.strftime("%Y-%m"))
+        bounds = (start.strftime("%Y-%m-%d"), start.strftime("%H:%M"), end.strftime("%Y-%m-%d"), end.strftime("%H:%M"))
+        return list(heapq.merge(self.events.between(*bounds), self.recurring.between(*bounds)))
+
+    def next_events(self, after, count=10):
+        """Return the first count events at or after datetime after."""
+        date_str, time_str = after.strftime("%Y-%m-%d"), after.strftime("%H:%M")
+        one_off = self._next_one_off(date_str, time_str, count)
+        merged = heapq.merge(one_off, self.recurring.after(date_str, time_str, count))
+        return list(itertools.islice(merged, count))
+
+    def _next_one_off(self, date_str, time_str, count):
+        # Months are loaded in order until the count-th event found lies in a
+        # month that is loaded, with every month before it.
+        for month_key in self.timetable.months():
+            if month_key < date_str[:7]:
+                continue
+            self.load_month(int(month_key[:4]), int(month_key[5:]))
+            found = self.events.after(date_str, time_str, count)
+            if len(found) == count and found[-1][0][:7] <= month_key:
+                return found
+        return self.events.after(date_str, time_str, count)
+
+    def week_events(self, day):
+        """Return the events of the Monday-to-Sunday week containing date day."""
+        monday = datetime.combine(day - timedelta(days=day.weekday()), datetime.min.time())
+        return self.events_between(monday, monday + timedelta(days=7))
+
+    def unload_month(self, month_key):
+        """Forget a month read earlier, so it is read again when next needed."""
+        year, month = int(month_key[:4]), int(month_key[5:])
+        self.events.drop_between(f"{month_key}-01", f"{month_key}-{calendar.monthrange(year, month)[1]:02d}")
+        self.loaded_months.discard(month_key)
+        self.event_days_cache.pop((year, month), None)
+
+    def import_ics(self, path):
+        """Add the events of an .ics file and return a Counter of what happened
+        to them ("added", "updated", "unchanged", "duplicate", "cancelled",
+        "skipped").
+
+        Events are matched to earlier imports by UID (see IMPORTS_FILE), so
+        importing a newer copy of a timetable replaces the events it changed
+        rather than adding them twice. The file is read one event at a time
+        and all the changes are written together at the end, one rewrite per
+        month touched. Events that cannot be imported go to self.bad_rows.
+        """
+        imported = {}
+        if os.path.exists(IMPORTS_FILE):
+            with open(IMPORTS_FILE, "r", encoding="utf-8") as f:
+                imported = json.load(f)
+        counts = collections.Counter()
+        batch = self.timetable.batch()
+        seen = set()
+        new_rules, removed_rule_ids = [], []
+        changed_dates = {}  # UID -> dates of its occurrences that were changed on their own
+
+        with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+            for line_no, props in ics_format.iter_vevents(ics_format.unfold(f)):
+                try:
+                    event = ics_format.event_from(props)
+                    rules = ics_format.rules_for(event) if event.rrule and not event.cancelled else []
+                except ValueError as e:
+                    self.bad_rows.append(BadRow(path, line_no, "", str(e)))
+                    counts["skipped"] += 1
+                    continue
+                if event.key in seen:
+                    counts["duplicate"] += 1
+                    continue
+                seen.add(event.key)
+                if event.recurrence_date:
+                    changed_dates.setdefault(event.uid, set()).add(event.recurrence_date)
+                # Entries are "signature|event|date|time|name" or
+                # "signature|rules|id id ..." with IMPORT_SEP for |, kept as
+                # one string each since there may be hundreds of thousands.
+                old = imported.get(event.key)
+                if old and old.startswith(event.signature):
+                    counts["unchanged"] += 1
+                    continue
+                if old:
+                    _, kind, *fields = old.split(IMPORT_SEP, 4)
+                    if kind == "event":
+                        batch.remove(*fields)
+                    else:
+                        removed_rule_ids.extend(fields[0].split())
+                if event.cancelled:
+                    imported.pop(event.key, None)
+                    counts["cancelled"] += 1
+                    continue
+                if rules:
+                    new_rules.extend(rules)
+                    fields = ["rules", " ".join(rule.rule_id for rule in rules)]
+                else:
+                    batch.add(event.date, event.time, event.name)
+                    fields = ["event", event.date, event.time, event.name]
+                imported[event.key] = IMPORT_SEP.join([event.signature] + fields)
+                counts["updated" if old else "added"] += 1
+
+        for month_key in batch.commit():
+            self.unload_month(month_key)
+        self.search_index = None  # rebuilt by the next search
+        self.year_counts.clear()
+        # A changed occurrence of a repeating event was added as an event of
+        # its own, so the series leaves that date out.
+        rules = {rule.rule_id: rule for rule in new_rules}
+        for uid, dates in changed_dates.items():
+            _, kind, *fields = imported.get(uid, IMPORT_SEP * 2).split(IMPORT_SEP, 4)
+            for rule_id in fields[0].split() if kind == "rules" else ():
+                rule = rules.get(rule_id) or self.recurring.rules.get(rule_id)
+                if rule is not None and not dates <= rule.exceptions:
+                    rule.exceptions |= dates
+                    rules[rule_id] = rule
+        if rules or removed_rule_ids:
+            self.recurring.apply(rules.values(), removed_rule_ids)
+            self.event_days_cache.clear()
+        atomic_write(IMPORTS_FILE, json.dumps(imported))
+        self.publish("imported", counts)
+        return counts
+
+    def export_ics(self, path, start, end):
+        """Write the events from start to end ("YYYY-MM-DD", inclusive) to an
+        .ics file, one event per occurrence, and return how many there were."""
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        day_after = (date.fromisoformat(end) + timedelta(days=1)).isoformat()
+        rows = itertools.chain(self.timetable.read(start, end, self.bad_rows),
+                               self.recurring.between(start, "00:00", day_after, "00:00"))
+        count = 0
+        with atomic_writer(path, "wb") as f:
+            f.write(ics_format.CALENDAR_START.encode("utf-8"))
+            for date_str, time_str, name in rows:
+                f.write(ics_format.format_vevent(date_str, time_str, name, stamp).encode("utf-8"))
+                count += 1
+            f.write(ics_format.CALENDAR_END.encode("utf-8"))
+        return count
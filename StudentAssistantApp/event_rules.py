@@ -0,0 +1,209 @@
+"""Recurring calendar events, stored as rules rather than as occurrences.
+
+A rule repeats one event daily, weekly or monthly, every `interval`
+days/weeks/months from its start date, optionally until an end date, and
+skips any dates listed in its exceptions. Monthly rules fall on the start
+date's day of the month and skip months without that day.
+
+Occurrences are never stored. They are worked out arithmetically for the
+month being drawn or the range being queried, and each month's expansion
+is cached until the rules change, so memory and the rules file grow with
+the number of rules, not the number of occurrences.
+"""
+import collections
+import heapq
+import itertools
+import json
+import os
+import uuid
+from datetime import date, timedelta
+
+from file_utils import atomic_write
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+MONTH_CACHE_SIZE = 24
+AFTER_HORIZON = timedelta(days=3660)  # how far ahead after() looks for occurrences
+
+
+class RecurrenceRule:
+    def __init__(self, start, time, name, freq="weekly", interval=1, until=None, exceptions=(), rule_id=None):
+        # start and until are "YYYY-MM-DD" strings; until is inclusive.
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency: {freq}")
+        if interval < 1:
+            raise ValueError("Interval must be at least 1.")
+        self.rule_id = rule_id or uuid.uuid4().hex
+        self.start = start
+        self.time = time
+        self.name = name
+        self.freq = freq
+        self.interval = interval
+        self.until = until
+        self.exceptions = set(exceptions)
+        self.start_date = date.fromisoformat(start)
+        self.until_date = date.fromisoformat(until) if until else None
+
+    def to_dict(self):
+        return {
+            "id": self.rule_id, "start": self.start, "time": self.time, "name": self.name,
+            "freq": self.freq, "interval": self.interval, "until": self.until,
+            "exceptions": sorted(self.exceptions),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["start"], data["time"], data["name"], data.get("freq", "weekly"),
+                   data.get("interval", 1), data.get("until"), data.get("exceptions", ()), data.get("id"))
+
+    def describe(self):
+        unit = {"daily": "day", "weekly": "week", "monthly": "month"}[self.freq]
+        every = f"every {unit}" if self.interval == 1 else f"every {self.interval} {unit}s"
+        return f"{every} from {self.start}" + (f" until {self.until}" if self.until else "")
+
+    def dates(self, first, last):
+        """Yield the occurrence dates from date first to date last, inclusive, in order."""
+        if self.until_date and self.until_date < last:
+            last = self.until_date
+        first = max(first, self.start_date)
+        if first > last:
+            return
+        if self.freq == "monthly":
+            occurrences = self._monthly(first, last)
+        else:
+            step = self.interval * (7 if self.freq == "weekly" else 1)
+            skipped = -(-(first - self.start_date).days // step)  # steps before first, rounded up
+            first_day = self.start_date + timedelta(days=skipped * step)
+            occurrences = (first_day + timedelta(days=i * step) for i in range((last - first_day).days // step + 1))
+        for day in occurrences:
+            if day.isoformat() not in self.exceptions:
+                yield day
+
+    def next_after(self, after):
+        """Return the first occurrence after after ("YYYY-MM-DD HH:MM") as
+        "YYYY-MM-DD HH:MM", or None if the rule has ended."""
+        for day in self.dates(date.fromisoformat(after[:10]), self.until_date or date.max):
+            time_str = f"{day.isoformat()} {self.time}"
+            if time_str > after:
+                return time_str
+        return None
+
+    def _monthly(self, first, last):
+        start = self.start_date
+        months = (first.year - start.year) * 12 + first.month - start.month
+        n = -(-months // self.interval) * self.interval
+        while True:
+            year, month = divmod(start.month - 1 + n, 12)
+            year += start.year
+            if date(year, month + 1, 1) > last:
+                return
+            try:
+                day = date(year, month + 1, start.day)
+            except ValueError:  # e.g. the 31st in a 30-day month
+                day = None
+            if day is not None and first <= day <= last:
+                yield day
+            n += self.interval
+
+
+class RecurringEvents:
+    def __init__(self, rules_file="recurring_events.json"):
+        self.rules_file = rules_file
+        self.rules = {}
+        # (year, month) -> {date_str: [(time, name, rule_id)]}, least recently used first
+        self.month_cache = collections.OrderedDict()
+
+    def load(self):
+        """Raises ValueError if the rules file is not valid."""
+        self.rules = {}
+        self.month_cache.clear()
+        if os.path.exists(self.rules_file):
+            with open(self.rules_file, "r", encoding="utf-8") as f:
+                try:
+                    for data in json.load(f):
+                        rule = RecurrenceRule.from_dict(data)
+                        self.rules[rule.rule_id] = rule
+                except (KeyError, TypeError, AttributeError) as e:
+                    raise ValueError(f"Invalid recurring event: {e}")
+
+    def save(self):
+        atomic_write(self.rules_file, json.dumps([rule.to_dict() for rule in self.rules.values()], indent=4))
+
+    def _changed(self):
+        self.month_cache.clear()
+        self.save()
+
+    def add(self, rule):
+        self.rules[rule.rule_id] = rule
+        self._changed()
+        return rule
+
+    def remove(self, rule_id):
+        rule = self.rules.pop(rule_id)
+        self._changed()
+        return rule
+
+    def apply(self, added=(), removed_ids=()):
+        """Remove and add many rules with a single save; an added rule
+        replaces any rule with the same id."""
+        for rule_id in removed_ids:
+            self.rules.pop(rule_id, None)
+        for rule in added:
+            self.rules[rule.rule_id] = rule
+        self._changed()
+
+    def update(self, rule_id, time, name):
+        rule = self.rules[rule_id]
+        rule.time, rule.name = time, name
+        self._changed()
+        return rule
+
+    def skip(self, rule_id, date_str):
+        """Leave out a single occurrence."""
+        self.rules[rule_id].exceptions.add(date_str)
+        self._changed()
+
+    def month(self, year, month):
+        """Return {date_str: [(time, name, rule_id)]} for one month, sorted by time."""
+        key = (year, month)
+        days = self.month_cache.get(key)
+        if days is not None:
+            self.month_cache.move_to_end(key)
+            return days
+        first = date(year, month, 1)
+        last = (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+        days = {}
+        for rule in self.rules.values():
+            for day in rule.dates(first, last):
+                days.setdefault(day.isoformat(), []).append((rule.time, rule.name, rule.rule_id))
+        for occurrences in days.values():
+            occurrences.sort()
+        self.month_cache[key] = days
+        if len(self.month_cache) > MONTH_CACHE_SIZE:
+            self.month_cache.popitem(last=False)
+        return days
+
+    def on(self, date_str):
+        return self.month(int(date_str[:4]), int(date_str[5:7])).get(date_str, [])
+
+    def between(self, start_date, start_time, end_date, end_time):
+        """Yield (date, time, name) like EventIndex.between, month by month from the cache."""
+        year, month = int(start_date[:4]), int(start_date[5:7])
+        while f"{year:04d}-{month:02d}" <= end_date[:7]:
+            days = self.month(year, month)
+            for date_str in sorted(days):
+                if start_date <= date_str <= end_date:
+                    for time, name, _ in days[date_str]:
+                        if (date_str, time) >= (start_date, start_time) and (date_str, time) < (end_date, end_time):
+                            yield date_str, time, name
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    def after(self, date_str, time_str, count):
+        """Return the first count occurrences at or after (date_str, time_str)."""
+        start = date.fromisoformat(date_str)
+        streams = []
+        for rule in self.rules.values():
+            # count + 1 dates are enough even if the first day's occurrence is too early.
+            dates = itertools.islice(rule.dates(start, start + AFTER_HORIZON), count + 1)
+            streams.append(((day.isoformat(), rule.time, rule.name) for day in dates))
+        merged = (event for event in heapq.merge(*streams) if event[:2] >= (date_str, time_str))
+        return list(itertools.islice(merged, count))
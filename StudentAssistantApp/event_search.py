@@ -0,0 +1,142 @@
+"""Word search over event names.
+
+Names are split into lower-case words. Each word maps to the set of
+distinct names containing it, and each name to the sorted times of its
+events, so a timetable that repeats a handful of course names many times
+costs a few entries per name plus eight bytes per event. The words are
+also kept in a sorted list, so every word starting with a prefix is found
+with one binary search.
+
+A query matches a name when each of its words is the start of some word
+of the name: "oper sys" finds "Operating Systems exam".
+"""
+import array
+import bisect
+import heapq
+import itertools
+import re
+
+from event_index import TIMES, day_number, day_string, minute_of
+
+WORD_RE = re.compile(r"\w+")
+
+
+def words(text):
+    return WORD_RE.findall(text.casefold())
+
+
+def matches(name, terms):
+    """True if every term starts some word of name."""
+    name_words = words(name)
+    return all(any(word.startswith(term) for word in name_words) for term in terms)
+
+
+def stamp(date_str, time_str):
+    """Minutes since 0001-01-01 00:00 for a date and time."""
+    return day_number(date_str) * 1440 + minute_of(time_str)
+
+
+def unstamp(value):
+    day, minute = divmod(value, 1440)
+    return day_string(day), TIMES[minute]
+
+
+class EventSearch:
+    def __init__(self):
+        self.word_names = {}  # word -> set of names
+        self.sorted_words = []
+        self.times = {}  # name -> array of stamps, sorted
+
+    def __len__(self):
+        return sum(len(times) for times in self.times.values())
+
+    def add(self, date_str, time_str, name):
+        value = stamp(date_str, time_str)
+        times = self.times.get(name)
+        if times is None:
+            self.add_name(name, array.array("q", [value]))
+        else:
+            times.insert(bisect.bisect_right(times, value), value)
+
+    def add_many(self, rows):
+        """Add (date, time, name) rows in bulk, sorting each name's times once."""
+        pending = {}
+        for date_str, time_str, name in rows:
+            times = pending.get(name)
+            if times is None:
+                times = pending[name] = array.array("q")
+            times.append(day_number(date_str) * 1440 + minute_of(time_str))
+        for name, times in pending.items():
+            if name in self.times:
+                times.extend(self.times.pop(name))
+            self.add_name(name, array.array("q", sorted(times)))
+
+    def add_name(self, name, times):
+        self.times[name] = times
+        for word in set(words(name)):
+            names = self.word_names.get(word)
+            if names is None:
+                names = self.word_names[word] = set()
+                bisect.insort(self.sorted_words, word)
+            names.add(name)
+
+    def remove(self, date_str, time_str, name):
+        times = self.times.get(name)
+        value = stamp(date_str, time_str)
+        position = bisect.bisect_left(times, value) if times else 0
+        if not times or position == len(times) or times[position] != value:
+            return
+        del times[position]
+        if not times:
+            del self.times[name]
+            for word in set(words(name)):
+                names = self.word_names[word]
+                names.discard(name)
+                if not names:
+                    del self.word_names[word]
+                    del self.sorted_words[bisect.bisect_left(self.sorted_words, word)]
+
+    def names(self, query):
+        """Return the set of names matching query."""
+        found = None
+        for term in sorted(set(words(query)), key=len, reverse=True):  # longest, so fewest names, first
+            names = set()
+            for word in itertools.islice(self.sorted_words, bisect.bisect_left(self.sorted_words, term), None):
+                if not word.startswith(term):
+                    break
+                names |= self.word_names[word]
+            found = names if found is None else found & names
+            if not found:
+                break
+        return found or set()
+
+    def search(self, query, start=None, limit=50, reverse=False):
+        """Return up to limit (date, time, name) matching query, from
+        (date, time) start on, or before start going back if reverse."""
+        # A heap of (time, name, position) holds the next event of each
+        # matching name; times are negated when going back.
+        sign = -1 if reverse else 1
+        target = stamp(*start) if start else None
+        heap = []
+        for name in self.names(query):
+            times = self.times[name]
+            if reverse:
+                position = (bisect.bisect_left(times, target) if target is not None else len(times)) - 1
+                if position >= 0:
+                    heap.append((-times[position], name, position))
+            else:
+                position = bisect.bisect_left(times, target) if target is not None else 0
+                if position < len(times):
+                    heap.append((times[position], name, position))
+        heapq.heapify(heap)
+        found = []
+        while heap and len(found) < limit:
+            value, name, position = heap[0]
+            found.append(unstamp(value * sign) + (name,))
+            times = self.times[name]
+            position += sign
+            if 0 <= position < len(times):
+                heapq.heapreplace(heap, (times[position] * sign, name, position))
+            else:
+                heapq.heappop(heap)
+        return found
@@ -0,0 +1,91 @@
+"""Build time, memory and query latency benchmark for event_search.EventSearch.
+
+    python event_search_benchmark.py [--events 1000000] [--years 10] [--check]
+
+Makes a synthetic timetable of about 5,300 distinct names, most of which
+share the word "lecture", builds the index from it the way
+EventManager.build_search_index does, and reports the build time, the
+memory the index holds (measured with tracemalloc in a second build) and
+the mean time of some typical queries and of the worst case. --check
+also compares every query's results with a scan of all the events.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import date
+
+from event_search import EventSearch, matches, words
+
+SUBJECTS = ["Operating Systems", "Calculus", "Data Structures", "Software Engineering", "Computer Networks",
+            "Database Systems", "Linear Algebra", "Statistics", "Discrete Mathematics", "Web Development"]
+QUERIES = [("oper sys", False), ("calc exam", False), ("data struct tutorial", False),
+           ("statistics", True), ("networks lab 12", False), ("nothing like this", False)]
+WORST_QUERY = "lecture"
+LIMIT = 50
+
+
+def names(rng):
+    found = [f"{subject} exam" for subject in SUBJECTS]
+    found += [f"{subject} lab {n}" for subject in SUBJECTS for n in range(1, 31)]
+    found += [f"{subject} tutorial {n}" for subject in SUBJECTS for n in range(1, 3)]
+    found += [f"{rng.choice(SUBJECTS)} lecture group {n}" for n in range(5000)]
+    return found
+
+
+def timetable(events, years, rng):
+    event_names = names(rng)
+    first = date(2025, 1, 1).toordinal()
+    for _ in range(events):
+        day = date.fromordinal(first + rng.randrange(365 * years)).isoformat()
+        yield day, f"{rng.randrange(8, 20):02d}:{rng.choice(('00', '30'))}", rng.choice(event_names)
+
+
+def brute_force(rows, query, start, reverse):
+    terms = words(query)
+    found = sorted(row for row in rows if matches(row[2], terms) and (row[:2] < start) == reverse)
+    if reverse:  # latest first, names at the same time still in order
+        found = sorted(found, key=lambda row: row[:2], reverse=True)
+    return found[:LIMIT]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and size the event name search index.")
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--check", action="store_true", help="compare results with a full scan")
+    args = parser.parse_args(argv)
+
+    rows = list(timetable(args.events, args.years, random.Random(1)))
+    started = time.perf_counter()
+    index = EventSearch()
+    index.add_many(rows)
+    build = time.perf_counter() - started
+    print(f"{len(index)} events, {len(index.times)} distinct names")
+    print(f"  build          {build:6.2f} s")
+
+    tracemalloc.start()
+    measured = EventSearch()
+    measured.add_many(rows)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+    print(f"  memory         {held / 1e6:6.1f} MB held, {peak / 1e6:.1f} MB peak")
+
+    start = ("2030-01-01", "12:00")
+    for query, reverse in QUERIES + [(WORST_QUERY, False)]:
+        runs = 200 if query != WORST_QUERY else 20
+        started = time.perf_counter()
+        for _ in range(runs):
+            results = index.search(query, start, LIMIT, reverse)
+        elapsed = (time.perf_counter() - started) / runs
+        print(f"  {query!r:24} {'back' if reverse else 'on':4} {elapsed * 1000:7.2f} ms  "
+              f"({len(index.names(query))} names, {len(results)} results)")
+        if args.check and results != brute_force(rows, query, start, reverse):
+            raise SystemExit(f"FAIL: results for {query!r} differ from a full scan")
+    if args.check:
+        print("  results match a full scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import atexit
+import contextlib
+import os
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def atomic_write(path, text, backup=None):
+    """Write text to path via a temp file and rename, so readers never see a partial file."""
+    with atomic_writer(path, backup=backup) as f:
+        f.write(text)
+
+
+@contextlib.contextmanager
+def atomic_writer(path, mode="w", backup=None):
+    """Yield a temp file to write path's new contents to; it replaces path only
+    if the block finishes without an exception. If backup is given, the old
+    contents are kept there, so path always holds a whole file."""
+    tmp_path = f"{path}.tmp"
+    encoding = None if "b" in mode else "utf-8"
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if backup and os.path.exists(path):
+        if os.path.exists(backup):
+            os.remove(backup)
+        try:
+            os.link(path, backup)
+        except OSError:  # no hard links on this file system
+            shutil.copyfile(path, backup)
+    os.replace(tmp_path, path)
+
+
+def append_line(path, line):
+    """Append one line to path, fsync it, and return the file size afterwards."""
+    with open(path, "ab") as f:
+        f.write(line.encode("utf-8") + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def file_signature(path):
+    """Return (inode, mtime, size) for path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on path (created if missing) for the block.
+
+    The lock is not reentrant: do not take it again while holding it.
+    """
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DebouncedWriter:
+    """Writes a file from a background thread, once per burst of changes.
+
+    changed() asks for a write. The file is written when no change has come
+    for delay seconds, or max_delay seconds after the first change if they
+    keep coming, with the text snapshot() returns then, through
+    atomic_write. A change stays pending until a write taken after it
+    succeeds. A failed background write is kept in self.error and tried
+    again max_delay seconds later. flush() writes any pending change at
+    once and raises the OSError if that fails; it is also called at exit.
+    """
+    def __init__(self, path, snapshot, delay=0.5, max_delay=5.0, backup=None):
+        self.path = path
+        self.snapshot = snapshot
+        self.delay = delay
+        self.max_delay = max_delay
+        self.backup = backup
+        self.error = None
+        self.writes = 0
+        self.changes = self.written = 0  # changes asked for, and covered by a successful write
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.first_change = self.last_change = None
+        self.thread = None
+        atexit.register(self.flush)
+
+    def pending(self):
+        return self.written < self.changes
+
+    def changed(self):
+        with self.cond:
+            now = time.monotonic()
+            self.changes += 1
+            if self.first_change is None:
+                self.first_change = now
+            self.last_change = now
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name=f"writer {self.path}", daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while True:
+                    if self.first_change is None:
+                        self.cond.wait()
+                        continue
+                    wait = min(self.last_change + self.delay, self.first_change + self.max_delay) - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self.cond.wait(wait)
+                self.first_change = self.last_change = None
+            if not self.pending():  # flush() wrote it meanwhile
+                continue
+            try:
+                self._write()
+            except OSError:
+                time.sleep(self.max_delay)
+                with self.cond:
+                    if self.first_change is None:
+                        self.first_change = self.last_change = time.monotonic() - self.delay
+
+    def _write(self):
+        # The snapshot is taken under the lock, so writes land in the order
+        # their snapshots were taken.
+        with self.write_lock:
+            with self.cond:
+                covered = self.changes
+            try:
+                atomic_write(self.path, self.snapshot(), self.backup)
+            except OSError as e:
+                self.error = e
+                raise
+            with self.cond:
+                self.written = max(self.written, covered)
+            self.writes += 1
+            self.error = None
+
+    def flush(self):
+        """Write now if a change is pending, and wait for any write under way."""
+        with self.cond:
+            self.first_change = self.last_change = None
+        with self.write_lock:
+            pass
+        if self.pending():
+            self._write()
@@ -0,0 +1,92 @@
+"""Throughput benchmark for EventManager.import_ics and export_ics.
+
+    python ics_benchmark.py [--events 500000] [--years 10]
+
+Writes a synthetic .ics file of the given number of one-off events spread
+over the years, plus a weekly repeating event for each course, then, in a
+temporary directory:
+- imports it into an empty calendar;
+- imports it again, when nothing has changed;
+- exports the whole range.
+It reports the time and events per second of each step and the peak
+resident memory. Everything is local; nothing needs the network.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+import ics_format
+from event_manager import EventManager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+COURSES = 300  # distinct event names
+
+
+def write_ics(path, events, years, rng):
+    first = date(2025, 1, 1)
+    days = 365 * years
+    stamp = "20250101T000000Z"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(ics_format.CALENDAR_START)
+        for n in range(events):
+            day = (first + timedelta(days=rng.randrange(days))).isoformat()
+            f.write(ics_format.format_vevent(day, f"{rng.randrange(8, 20):02d}:{rng.choice(('00', '30'))}",
+                                             f"Course {n % COURSES} lecture", stamp))
+        for n in range(COURSES):
+            start = (first + timedelta(days=n % 7)).strftime("%Y%m%d")
+            f.write(f"BEGIN:VEVENT\r\nUID:weekly-{n}@benchmark\r\nDTSTAMP:{stamp}\r\n"
+                    f"DTSTART:{start}T090000\r\nRRULE:FREQ=WEEKLY;COUNT=14\r\n"
+                    f"SUMMARY:Course {n} tutorial\r\nEND:VEVENT\r\n")
+        f.write(ics_format.CALENDAR_END)
+    return first.isoformat(), (first + timedelta(days=days)).isoformat()
+
+
+def peak_rss_mb():
+    if resource is None:
+        return float("nan")
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kilobytes on Linux
+
+
+def timed(label, count, action):
+    started = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:10} {elapsed:7.1f} s  {count / elapsed:9.0f} events/s")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time .ics import and export on a synthetic file.")
+    parser.add_argument("--events", type=int, default=500000)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    here = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # EventManager keeps its files in the working directory
+        try:
+            path = os.path.join(workdir, "timetable.ics")
+            start, end = write_ics(path, args.events, args.years, random.Random(1))
+            print(f"{args.events} events over {args.years} years, {os.path.getsize(path) / 1e6:.0f} MB")
+            manager = EventManager()
+            counts = timed("import", args.events, lambda: manager.import_ics(path))
+            print("    " + ", ".join(f"{kind}: {count}" for kind, count in sorted(counts.items())))
+            counts = timed("re-import", args.events, lambda: manager.import_ics(path))
+            print("    " + ", ".join(f"{kind}: {count}" for kind, count in sorted(counts.items())))
+            exported = timed("export", args.events,
+                             lambda: manager.export_ics(os.path.join(workdir, "export.ics"), start, end))
+            print(f"    {exported} events written")
+            print(f"  peak RSS {peak_rss_mb():.0f} MB")
+        finally:
+            os.chdir(here)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Reading and writing iCalendar (.ics) files.
+
+Files are read a line at a time: folded lines are joined as they arrive
+and each VEVENT is handed on as soon as its END line is seen, so memory
+does not grow with the size of the file. Nested components (alarms) are
+skipped.
+
+Times become local "YYYY-MM-DD" / "HH:MM" strings, as in timetable.txt.
+UTC times are converted to local time, and so are times with a TZID the
+system time zone database knows; other times are taken as they are.
+All-day events are put at 00:00. Only the repeat rules the calendar can
+store (see event_rules) are understood: daily, weekly or monthly, every
+N, until a date or for a number of times, and weekly on given weekdays.
+
+Events are written without time zone, one per occurrence, with lines
+folded at 75 octets as the format requires.
+"""
+import collections
+import functools
+import hashlib
+import heapq
+import itertools
+from datetime import date, datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+from event_rules import FREQUENCIES, RecurrenceRule
+
+CALENDAR_START = "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Student Assistant App//Calendar//EN\r\nCALSCALE:GREGORIAN\r\n"
+CALENDAR_END = "END:VCALENDAR\r\n"
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+RRULE_PARTS = {"FREQ", "INTERVAL", "UNTIL", "COUNT", "BYDAY", "BYMONTHDAY", "WKST"}
+MAX_COUNT = 10000  # largest COUNT= accepted in a repeat rule
+# The properties read; lines of any others are not parsed at all.
+WANTED = ("DTSTART", "SUMMARY", "UID", "RRULE", "EXDATE", "RECURRENCE-ID", "STATUS")
+NO_TITLE = "(No title)"
+
+# key is the UID, with "/RECURRENCE-ID" added for a changed occurrence of a
+# repeating event; signature changes whenever anything imported changes.
+IcsEvent = collections.namedtuple(
+    "IcsEvent", "key uid date time name rrule exdates recurrence_date cancelled signature")
+
+
+def unfold(f):
+    """Yield (line_no, line) for the logical lines of an open .ics file."""
+    pending, start = None, 0
+    for line_no, raw in enumerate(f, 1):
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending:
+            yield start, pending
+        pending, start = line, line_no
+    if pending:
+        yield start, pending
+
+
+def parse_property(line):
+    """Split 'NAME;PARAM=value:VALUE' into (NAME, {PARAM: value}, VALUE)."""
+    if '"' in line:
+        quoted = False
+        for colon, ch in enumerate(line):
+            if ch == '"':
+                quoted = not quoted
+            elif ch == ":" and not quoted:
+                break
+        else:
+            colon = -1
+    else:
+        colon = line.find(":")
+    if colon < 0:
+        raise ValueError("missing ':'")
+    name, *parts = line[:colon].split(";")
+    params = {}
+    for part in parts:
+        key, _, value = part.partition("=")
+        params[key.upper()] = value.strip('"')
+    return name.upper(), params, line[colon + 1:]
+
+
+def iter_vevents(lines):
+    """Yield (line_no, properties) for each VEVENT in lines (from unfold);
+    properties maps a property name to its [(params, value)]."""
+    props, depth, start = None, 0, 0
+    for line_no, line in lines:
+        if props is None:
+            if line.upper() == "BEGIN:VEVENT":
+                props, depth, start = {}, 0, line_no
+            continue
+        if line[:1] in "BEbe":
+            head = line[:6].upper()
+            if head == "BEGIN:":
+                depth += 1
+                continue
+            if head[:4] == "END:":
+                if depth:
+                    depth -= 1
+                else:
+                    yield start, props
+                    props = None
+                continue
+        # Names are case-insensitive but nearly always upper case.
+        if not depth and (line.startswith(WANTED) or line[:1].islower() and line[:13].upper().startswith(WANTED)):
+            try:
+                name, params, value = parse_property(line)
+            except ValueError:
+                continue
+            props.setdefault(name, []).append((params, value))
+
+
+def unescape_text(value):
+    if "\\" not in value:
+        return value
+    out = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == "\\":
+            ch = next(chars, "")
+            ch = "\n" if ch in "nN" else ch
+        out.append(ch)
+    return "".join(out)
+
+
+def escape_text(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r", "").replace("\n", "\\n"))
+
+
+@functools.lru_cache(maxsize=None)
+def _zone(tzid):
+    if not tzid or ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(tzid)
+    except (KeyError, ValueError, OSError):  # unknown or malformed zone name
+        return None
+
+
+def local_time(value, params=None):
+    """Return ("YYYY-MM-DD", "HH:MM") for a DATE or DATE-TIME value."""
+    params = params or {}
+    value = value.strip()
+    if len(value) == 8 or params.get("VALUE", "").upper() == "DATE":
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8])).isoformat(), "00:00"
+    if len(value) < 15 or value[8] not in "Tt" or not value[9:15].isdigit():
+        raise ValueError(f"invalid date-time {value!r}")
+    zone = timezone.utc if value.endswith(("Z", "z")) else _zone(params.get("TZID"))
+    moment = datetime(int(value[:4]), int(value[4:6]), int(value[6:8]), int(value[9:11]), int(value[11:13]))
+    if zone is None:  # the common case, done without formatting a datetime
+        return f"{value[:4]}-{value[4:6]}-{value[6:8]}", f"{value[9:11]}:{value[11:13]}"
+    moment = moment.replace(tzinfo=zone).astimezone()
+    return f"{moment.year:04d}-{moment.month:02d}-{moment.day:02d}", f"{moment.hour:02d}:{moment.minute:02d}"
+
+
+def _first(props, name):
+    values = props.get(name)
+    return values[0] if values else ({}, "")
+
+
+def event_from(props):
+    """Return the IcsEvent for one VEVENT's properties, or raise ValueError saying what is wrong."""
+    params, value = _first(props, "DTSTART")
+    if not value:
+        raise ValueError("missing DTSTART")
+    try:
+        date_str, time_str = local_time(value, params)
+    except ValueError:
+        raise ValueError(f"invalid DTSTART {value!r}")
+    name = " ".join(unescape_text(_first(props, "SUMMARY")[1]).split()) or NO_TITLE
+    uid = _first(props, "UID")[1].strip()
+    rrule = None
+    if "RRULE" in props:
+        rrule = {}
+        for part in _first(props, "RRULE")[1].split(";"):
+            key, _, part_value = part.partition("=")
+            rrule[key.upper()] = part_value.upper()
+    try:
+        exdates = sorted({local_time(day, exdate_params)[0] for exdate_params, days in props.get("EXDATE", ())
+                          for day in days.split(",") if day})
+        recurrence_params, recurrence_id = _first(props, "RECURRENCE-ID")
+        recurrence_date = local_time(recurrence_id, recurrence_params)[0] if recurrence_id else None
+    except ValueError:
+        raise ValueError("invalid EXDATE or RECURRENCE-ID")
+    cancelled = _first(props, "STATUS")[1].strip().upper() == "CANCELLED"
+    # Events without a UID are told apart by what they contain.
+    key = uid or f"{date_str} {time_str} {name}"
+    if recurrence_date:
+        key += "/" + recurrence_id.strip()
+    rrule_text = ";".join(f"{k}={v}" for k, v in sorted(rrule.items())) if rrule is not None else ""
+    signature = hashlib.sha1(repr((date_str, time_str, name, rrule_text, exdates, cancelled))
+                             .encode("utf-8")).hexdigest()[:16]
+    return IcsEvent(key, uid, date_str, time_str, name, rrule, exdates, recurrence_date, cancelled, signature)
+
+
+def rules_for(event):
+    """Return the RecurrenceRules for a repeating IcsEvent (one per weekday
+    for BYDAY=MO,WE,...), or raise ValueError if its RRULE cannot be kept."""
+    rrule = event.rrule
+    freq = rrule.get("FREQ", "").lower()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"unsupported repeat frequency {rrule.get('FREQ', '')!r}")
+    unsupported = set(rrule) - RRULE_PARTS
+    if unsupported:
+        raise ValueError("unsupported repeat rule part " + ", ".join(sorted(unsupported)))
+    try:
+        interval = int(rrule.get("INTERVAL", "1"))
+        count = int(rrule["COUNT"]) if "COUNT" in rrule else None
+        until = local_time(rrule["UNTIL"])[0] if "UNTIL" in rrule else None
+    except ValueError:
+        raise ValueError("invalid INTERVAL, COUNT or UNTIL")
+    if interval < 1 or (count is not None and not 1 <= count <= MAX_COUNT):
+        raise ValueError("unsupported INTERVAL or COUNT")
+
+    start = date.fromisoformat(event.date)
+    starts = [start]
+    if "BYDAY" in rrule:
+        days = rrule["BYDAY"].split(",")
+        if freq != "weekly" or not set(days) <= set(WEEKDAYS):
+            raise ValueError(f"unsupported BYDAY={rrule['BYDAY']}")
+        # Weeks are counted from the start of the first event's week.
+        week_start = WEEKDAYS.index(rrule.get("WKST", "MO")) if rrule.get("WKST", "MO") in WEEKDAYS else 0
+        first_week = start - timedelta(days=(start.weekday() - week_start) % 7)
+        starts = []
+        for day in sorted(set(days), key=WEEKDAYS.index):
+            first = first_week + timedelta(days=(WEEKDAYS.index(day) - week_start) % 7)
+            starts.append(first if first >= start else first + timedelta(weeks=interval))
+    if "BYMONTHDAY" in rrule and (freq != "monthly" or rrule["BYMONTHDAY"] != str(start.day)):
+        raise ValueError(f"unsupported BYMONTHDAY={rrule['BYMONTHDAY']}")
+
+    if count is not None:
+        # COUNT includes the dates EXDATE leaves out.
+        plain = [RecurrenceRule(day.isoformat(), event.time, event.name, freq, interval) for day in starts]
+        occurrences = list(itertools.islice(heapq.merge(*(rule.dates(start, date.max) for rule in plain)), count))
+        until = occurrences[-1].isoformat()
+    rule_id = "ics-" + hashlib.sha1(event.key.encode("utf-8")).hexdigest()[:16]
+    return [RecurrenceRule(day.isoformat(), event.time, event.name, freq, interval, until,
+                           event.exdates, f"{rule_id}-{i}") for i, day in enumerate(starts)]
+
+
+def fold(line):
+    """Return line ending in CRLF, split into 75-octet lines as the format requires."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and data[end] & 0xC0 == 0x80:  # not inside a UTF-8 character
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def event_uid(date_str, time_str, name):
+    return hashlib.sha1(f"{date_str}|{time_str}|{name}".encode("utf-8")).hexdigest() + "@student-assistant-app"
+
+
+def format_vevent(date_str, time_str, name, stamp):
+    """Return one VEVENT; stamp is the DTSTAMP, e.g. "20250901T120000Z"."""
+    start = f"{date_str.replace('-', '')}T{time_str.replace(':', '')}00"
+    return ("BEGIN:VEVENT\r\n" + fold(f"UID:{event_uid(date_str, time_str, name)}")
+            + f"DTSTAMP:{stamp}\r\nDTSTART:{start}\r\n" + fold(f"SUMMARY:{escape_text(name)}")
+            + "END:VEVENT\r\n")
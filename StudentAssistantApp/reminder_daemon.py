@@ -0,0 +1,140 @@
+"""Reminders delivered without the reminder window open.
+
+    python reminder_daemon.py [--sink print|notify] [--check-every 10] [--stats] [reminders.json]
+
+The daemon reads reminders.json into a heap of (time, task, rule) and sleeps
+until the next reminder is due, or until it is time to check the file
+again if that comes first. A check is a single stat() (see
+file_utils.file_signature); the file is read again only if it changed.
+A file that cannot be read, e.g. one caught half written, is read again
+at the next check, and the reminders read before are kept meanwhile.
+
+Due reminders go to a sink, any callable sink(time, task): print_sink
+writes a line to stdout and notify_sink shows a desktop notification
+with notify-send. Each reminder is delivered once. Reminders already past
+when the daemon starts are not delivered, as in the reminder window; if
+the window is open too, both show the reminder. A repeating reminder's
+rule is (start, repeat, until, interval), and once delivered it goes
+back on the heap at its next occurrence (see
+reminder_scheduler.next_occurrence).
+"""
+import argparse
+import heapq
+import json
+import subprocess
+import time
+
+from file_utils import file_signature
+from reminder_scheduler import minute_now, next_occurrence, seconds_until
+
+CHECK_EVERY = 10  # seconds between checks of the reminders file
+
+
+def print_sink(time_str, task):
+    print(f"{time_str}  🔔 {task}", flush=True)
+
+
+def notify_sink(time_str, task):
+    subprocess.run(["notify-send", "Reminder", f"{task} (at {time_str})"], check=False)
+
+
+SINKS = {"print": print_sink, "notify": notify_sink}
+
+
+class ReminderDaemon:
+    def __init__(self, reminder_file="reminders.json", sink=print_sink, check_every=CHECK_EVERY):
+        self.reminder_file = reminder_file
+        self.sink = sink
+        self.check_every = check_every
+        self.signature = None
+        self.heap = []  # (time, task, rule), rule () if the reminder does not repeat
+        # Reminders before this minute have been delivered or were past, and
+        # so have those of this minute in delivered_now.
+        self.done = minute_now()
+        self.delivered_now = set()
+        self.wakeups = self.reloads = self.delivered = 0
+
+    def reload_if_changed(self):
+        """Read the reminders again if the file changed; return True if it was read."""
+        signature = file_signature(self.reminder_file)
+        if signature == self.signature:
+            return False
+        try:
+            if signature is None:
+                reminders = []
+            else:
+                with open(self.reminder_file, "r", encoding="utf-8") as f:
+                    reminders = json.load(f)
+            heap = []
+            for r in reminders:
+                time_str, rule = r["time"], ()
+                if r.get("repeat"):
+                    rule = (r["start"], r["repeat"], r.get("until") or "", r.get("interval", 1))
+                    if time_str < self.done:  # not moved on since it was last due
+                        time_str = next_occurrence(*rule[:3], self.done, rule[3])
+                if time_str and time_str >= self.done and (time_str, r["task"]) not in self.delivered_now:
+                    heap.append((time_str, r["task"], rule))
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        heapq.heapify(heap)
+        self.heap, self.signature = heap, signature
+        self.reloads += 1
+        return True
+
+    def deliver_due(self, now=None):
+        """Send every reminder due at or before now ("YYYY-MM-DD HH:MM") to the sink."""
+        now = now or minute_now()
+        if now > self.done:
+            self.done, self.delivered_now = now, set()
+        while self.heap and self.heap[0][0] <= now:
+            time_str, task, rule = heapq.heappop(self.heap)
+            self.sink(time_str, task)
+            self.delivered += 1
+            if time_str == now:
+                self.delivered_now.add((time_str, task))
+            next_time = next_occurrence(*rule[:3], now, rule[3]) if rule else None
+            if next_time:
+                heapq.heappush(self.heap, (next_time, task, rule))
+
+    def wait(self):
+        """Return the seconds to sleep until the next reminder or file check."""
+        if self.heap:
+            return min(self.check_every, seconds_until(self.heap[0][0]))
+        return self.check_every
+
+    def run(self, seconds=None):
+        """Deliver reminders until interrupted, or for the given number of seconds."""
+        end = time.monotonic() + seconds if seconds is not None else None
+        self.reload_if_changed()
+        while True:
+            self.deliver_due()
+            delay = self.wait()
+            if end is not None:
+                delay = min(delay, end - time.monotonic())
+                if delay <= 0:
+                    return
+            time.sleep(delay)
+            self.wakeups += 1
+            self.reload_if_changed()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deliver reminders without the reminder window.")
+    parser.add_argument("reminder_file", nargs="?", default="reminders.json")
+    parser.add_argument("--sink", choices=sorted(SINKS), default="print")
+    parser.add_argument("--check-every", type=float, default=CHECK_EVERY,
+                        help="seconds between checks of the file for changes")
+    parser.add_argument("--stats", action="store_true", help="print wakeups and reloads on exit")
+    args = parser.parse_args(argv)
+    daemon = ReminderDaemon(args.reminder_file, SINKS[args.sink], args.check_every)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    if args.stats:
+        print(f"wakeups: {daemon.wakeups}, reloads: {daemon.reloads}, delivered: {daemon.delivered}, "
+              f"pending: {len(daemon.heap)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Footprint and wakeup benchmark for reminder_daemon.ReminderDaemon.
+
+    python reminder_daemon_benchmark.py [--reminders 100000] [--seconds 5] [--check-every 60]
+
+Writes a reminders file of future reminders, a tenth of them repeating,
+in a temporary directory, and reports:
+- the time to load it and the memory the daemon's heap holds (measured
+  with tracemalloc), and the process's peak RSS;
+- the time to notice a change and read the file again;
+- the wakeups, reloads and deliveries while the daemon runs idle for the
+  given number of seconds.
+Idle, the daemon should wake about once per --check-every seconds and
+read the file only when it changes.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from reminder_daemon import ReminderDaemon
+from reminder_scheduler import TIME_FORMAT
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def make_reminders(count, rng):
+    first = datetime.now().replace(second=0, microsecond=0) + timedelta(days=1)
+    reminders = []
+    for n in range(count):
+        time_str = (first + timedelta(minutes=rng.randrange(365 * 24 * 60))).strftime(TIME_FORMAT)
+        reminder = {"id": f"{n:032x}", "task": f"Task {n}", "time": time_str}
+        if n % 10 == 0:
+            reminder.update(repeat=rng.choice(FREQUENCIES), start=time_str)
+        reminders.append(reminder)
+    return reminders
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the reminder daemon's memory and wakeups.")
+    parser.add_argument("--reminders", type=int, default=100000)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--check-every", type=float, default=60)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "reminders.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(make_reminders(args.reminders, random.Random(1)), f)
+        delivered = []
+        daemon = ReminderDaemon(path, lambda time_str, task: delivered.append(task), args.check_every)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        daemon.reload_if_changed()
+        load = time.perf_counter() - started
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{len(daemon.heap)} reminders loaded in {load:.2f} s; heap holds {held / 1e6:.1f} MB")
+        if resource is not None:
+            print(f"  peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+        started = time.perf_counter()
+        unchanged = daemon.reload_if_changed()
+        check = time.perf_counter() - started
+        os.utime(path)
+        started = time.perf_counter()
+        changed = daemon.reload_if_changed()
+        reload = time.perf_counter() - started
+        print(f"  check of an unchanged file {check * 1e6:.0f} us (read: {unchanged}); "
+              f"after a change {reload:.2f} s (read: {changed})")
+
+        daemon.wakeups = daemon.reloads = daemon.delivered = 0
+        daemon.run(args.seconds)
+        print(f"  idle {args.seconds:g} s checking every {args.check_every:g} s: {daemon.wakeups} wakeups, "
+              f"{daemon.reloads} reloads, {daemon.delivered} delivered")
+
+
+if __name__ == "__main__":
+    main()
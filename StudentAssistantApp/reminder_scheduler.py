@@ -0,0 +1,97 @@
+"""Working out which reminders are due, and when the next one is.
+
+ReminderSchedule keeps the pending reminders in a min-heap keyed by
+their "YYYY-MM-DD HH:MM" time, which sorts like the time itself. Finding
+the next due reminder is a look at the top of the heap, and taking the
+due ones off is O(log n) each, so a window or daemon can sleep until
+exactly the next reminder instead of checking them all every minute.
+
+A change does not search the heap: the reminder is pushed again and its
+older entry, no longer matching, is dropped when it reaches the top. A
+reminder is due once, unless it is changed (edited or snoozed) later.
+
+A repeating reminder is one record: "repeat" (daily, weekly or monthly),
+"start", the time of its first occurrence, and optionally "interval"
+(every so many days, weeks or months) and "until", the last date. Its
+"time" is always the next occurrence; when that comes due,
+next_occurrence works out the one after and the reminder is scheduled
+again, so occurrences are never listed in advance.
+"""
+import heapq
+import itertools
+from datetime import datetime
+
+from event_rules import RecurrenceRule
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+MAX_WAIT = 3600  # seconds; timers are re-armed at least this often, in case the clock jumps
+
+
+def minute_now():
+    return datetime.now().strftime(TIME_FORMAT)
+
+
+def seconds_until(time_str, now=None):
+    """Seconds from now (a datetime) until time_str, or 0 if it has passed."""
+    delay = (datetime.strptime(time_str, TIME_FORMAT) - (now or datetime.now())).total_seconds()
+    return min(max(delay, 0), MAX_WAIT)
+
+
+def next_occurrence(start, repeat, until, after, interval=1):
+    """Return the first occurrence after after ("YYYY-MM-DD HH:MM") of a rule
+    repeating from start ("YYYY-MM-DD HH:MM"), or None if it has ended."""
+    start_date, start_time = start.split(" ")
+    return RecurrenceRule(start_date, start_time, "", repeat, interval, until, rule_id="reminder").next_after(after)
+
+
+class ReminderSchedule:
+    def __init__(self, reminders=(), since=None):
+        # Reminders due before since ("YYYY-MM-DD HH:MM") are past and never due.
+        self.since = since or minute_now()
+        self.counter = itertools.count()
+        self.entries = {}  # id(reminder) -> number of its live heap entry
+        # (time, number, reminder); entries whose number is not the live one are stale.
+        self.heap = [entry for entry in map(self._entry, reminders) if entry]
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _entry(self, reminder):
+        self.entries.pop(id(reminder), None)
+        if reminder["time"] < self.since:
+            return None
+        number = next(self.counter)
+        self.entries[id(reminder)] = number
+        return reminder["time"], number, reminder
+
+    def add(self, reminder):
+        """Schedule a new reminder, or one whose time has changed."""
+        entry = self._entry(reminder)
+        if entry:
+            heapq.heappush(self.heap, entry)
+        if len(self.heap) > 2 * len(self.entries) + 64:  # mostly superseded entries
+            self.heap = [entry for entry in self.heap if self.entries.get(id(entry[2])) == entry[1]]
+            heapq.heapify(self.heap)
+
+    def discard(self, reminder):
+        self.entries.pop(id(reminder), None)
+
+    def next_due(self):
+        """Return the time of the next reminder due, or None."""
+        heap = self.heap
+        while heap and self.entries.get(id(heap[0][2])) != heap[0][1]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now=None):
+        """Take off and return, oldest first, every reminder due at or before now."""
+        now = now or minute_now()
+        due = []
+        while True:
+            time_str = self.next_due()
+            if time_str is None or time_str > now:
+                return due
+            _, _, reminder = heapq.heappop(self.heap)
+            del self.entries[id(reminder)]
+            due.append(reminder)
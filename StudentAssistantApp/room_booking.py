@@ -1,48 +1,174 @@
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
-import json
-import os
+from datetime import datetime, timedelta
+from booking_client import BookingClient
+from booking_service import BookingError, BookingService
+from booking_store import open_store, slot_label
+from availability import AvailabilityMatrix
+from room_config import DEFAULT_CONFIG, RoomConfig
+
+def weekly_occurrences(booking, until_date_str, every_weeks=1):
+    """Return copies of booking repeated every `every_weeks` weeks from its date up to and including until_date_str."""
+    day = datetime.strptime(booking["date"], "%Y-%m-%d").date()
+    until = datetime.strptime(until_date_str, "%Y-%m-%d").date()
+    occurrences = []
+    while day <= until:
+        occurrences.append(dict(booking, date=day.strftime("%Y-%m-%d")))
+        day += timedelta(weeks=every_weeks)
+    return occurrences
+
+def load_room_config():
+    try:
+        return RoomConfig.load()
+    except ValueError:
+        messagebox.showwarning("Config Error", "Could not read rooms.json. Using the default venues.")
+        return RoomConfig(DEFAULT_CONFIG["venues"], DEFAULT_CONFIG["slot_minutes"])
 
 class BookingManager:
-    """Handles booking data and file operations."""
-    def __init__(self, bookings_file="bookings.json"):
+    """Handles booking data through a BookingService, or a BookingClient for a shared server."""
+    def __init__(self, bookings_file="bookings.json", service=None):
         self.bookings_file = bookings_file
-        self.bookings = self.load_bookings()
+        if service is None:
+            service = BookingService(open_store(bookings_file), load_room_config())
+        self.service = service
+        self.availability = None
+        self.seen_version = None
+        self.load_bookings()
 
     def load_bookings(self):
-        if os.path.exists(self.bookings_file):
-            try:
-                with open(self.bookings_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                messagebox.showwarning("Data Load Error", "Could not load booking data. File might be corrupted. Starting with empty bookings.")
-                return []
-        return []
+        try:
+            problems = self.service.load()
+            self.seen_version, _ = self.service.changes_since(None)
+            if problems:
+                messagebox.showwarning("Booking Conflicts", "\n".join(problems))
+        except ValueError:
+            messagebox.showwarning("Data Load Error", "Could not load booking data. File might be corrupted. Starting with empty bookings.")
+        except BookingError as e:
+            self.report(e)
+        # A client that could not reach its server still needs venues to show.
+        self.room_config = self.service.room_config or load_room_config()
 
     def save_bookings(self):
+        self._call(self.service.save)
+
+    def report(self, error, parent=None):
+        show = messagebox.showwarning if error.status == 400 else messagebox.showerror
+        if parent is None:
+            show(error.title, error.message)
+        else:
+            show(error.title, error.message, parent=parent)
+
+    def _call(self, action, *args, parent=None, default=None):
+        # Every BookingError is shown to the user here; callers get `default`.
+        try:
+            return action(*args)
+        except BookingError as e:
+            self.report(e, parent)
+            return default
+
+    def check_booking(self, booking, parent=None):
+        """Show why booking cannot be made, if it cannot, and return whether it can."""
+        try:
+            self.service.validate(booking)
+        except BookingError as e:
+            self.report(e, parent)
+            return False
+        return True
+
+    def poll_external_changes(self):
+        """Pick up bookings changed elsewhere since the last poll.
+
+        Returns [(old booking, new booking)] (old is None for additions, new
+        is None for cancellations), or None if everything should be re-read.
+        The changes include this manager's own, which are safe to apply
+        again: each replays in order what was already done.
+        """
         try:
-            with open(self.bookings_file, 'w') as f:
-                json.dump(self.bookings, f, indent=4)
-        except IOError:
-            messagebox.showerror("Data Save Error", "Could not save booking data to file.")
+            self.seen_version, changes = self.service.changes_since(self.seen_version)
+        except BookingError:
+            return []
+        if self.availability:
+            if changes is None:
+                self.availability.reset()
+            else:
+                for old_booking, booking in changes:
+                    if old_booking is not None:
+                        self.availability.released(old_booking)
+                    if booking is not None:
+                        self.availability.booked(booking)
+        return changes
+
+    def find_conflict(self, venue, date_str, start_time, end_time, ignore_id=None):
+        """Return a booking of this venue that overlaps the given times, or None."""
+        return self._call(self.service.find_conflict, venue, date_str, start_time, end_time, ignore_id)
+
+    def bookings_page(self, offset, limit):
+        return self._call(self.service.page, offset, limit, default=[])
+
+    def get_booking(self, booking_id):
+        return self._call(self.service.get, booking_id)
+
+    def bookings_on(self, date_str):
+        return self._call(self.service.on_date, date_str, default=[])
+
+    def bookings_for_venue(self, venue):
+        return self._call(self.service.for_venue, venue, default=[])
+
+    def bookings_by(self, name):
+        return self._call(self.service.by_name, name, default=[])
+
+    def add_booking(self, fields, parent=None):
+        """Book venue/date/start_time/end_time/name; return the stored booking, or None."""
+        booking = self._call(self.service.book, fields, parent=parent)
+        if booking is not None and self.availability:
+            self.availability.booked(booking)
+        return booking
+
+    def add_bookings(self, bookings, skip_conflicts=False, parent=None):
+        """Book several bookings at once; see BookingService.book_many.
+        Returns (booked, conflicts), or None if the request failed."""
+        result = self._call(self.service.book_many, bookings, skip_conflicts, parent=parent)
+        if result is not None and self.availability:
+            for booking in result[0]:
+                self.availability.booked(booking)
+        return result
+
+    def update_booking(self, booking_id, changes):
+        old_booking = self.get_booking(booking_id) if self.availability else None
+        booking = self._call(self.service.update, booking_id, changes)
+        if booking is not None and self.availability and old_booking is not None:
+            self.availability.released(old_booking)
+            self.availability.booked(booking)
+        return booking
+
+    def remove_booking(self, booking_id):
+        booking = self._call(self.service.cancel, booking_id)
+        if booking is not None and self.availability:
+            self.availability.released(booking)
+        return booking
 
 class DiscussionRoomBookingApp(BookingManager):
-    def __init__(self, master):
-        super().__init__()  # BookingManager init
+    PAGE_SIZE = 200  # Treeview rows fetched at a time as the list is scrolled
+    WATCH_INTERVAL_MS = 2000  # how often to look for bookings made in other windows
+
+    def __init__(self, master, bookings_file="bookings.json", service=None):
+        super().__init__(bookings_file, service)  # BookingManager init
         self.master = master
         master.title("Discussion Room Booking System")
         master.geometry("800x700")
 
-        self.venues = ["Library Discussion Room", "Cyber Centre Meeting Room"]
-        self.time_slots = [
-            "09:00 - 10:00", "10:00 - 11:00", "11:00 - 12:00",
-            "12:00 - 13:00", "13:00 - 14:00", "14:00 - 15:00",
-            "15:00 - 16:00", "16:00 - 17:00"
-        ]
+        self.venues = self.room_config.venues
+        self.time_slots = self.room_config.time_slots
+        self.start_times = self.room_config.boundaries[:-1]
+        self.end_times = self.room_config.boundaries[1:]
+        self.availability = AvailabilityMatrix(self.venues, self.time_slots, self.bookings_on)
 
-        self.editing_booking_idx = -1
+        self.editing_booking_id = None
+        self.loaded_rows = 0
+        self.all_rows_loaded = False
         self.availability_chart_window = None
+        self.availability_chart = None
 
         style = ttk.Style()
         style.configure("TFrame", background="#f0f0f0")
@@ -72,17 +198,24 @@ class DiscussionRoomBookingApp(BookingManager):
         self.date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
         self.date_entry.grid(row=1, column=1, sticky="ew", pady=5, padx=5)
 
-        ttk.Label(self.form_frame, text="Select Time Slot:").grid(row=2, column=0, sticky="w", pady=5, padx=5)
-        self.time_combobox = ttk.Combobox(self.form_frame, values=self.time_slots, state="readonly")
-        self.time_combobox.set(self.time_slots[0])
-        self.time_combobox.grid(row=2, column=1, sticky="ew", pady=5, padx=5)
+        ttk.Label(self.form_frame, text="Start Time:").grid(row=2, column=0, sticky="w", pady=5, padx=5)
+        self.start_combobox = ttk.Combobox(self.form_frame, values=self.start_times, state="readonly")
+        self.start_combobox.set(self.start_times[0])
+        self.start_combobox.grid(row=2, column=1, sticky="ew", pady=5, padx=5)
+
+        ttk.Label(self.form_frame, text="End Time:").grid(row=3, column=0, sticky="w", pady=5, padx=5)
+        self.end_combobox = ttk.Combobox(self.form_frame, values=self.end_times, state="readonly")
+        self.end_combobox.set(self.end_times[0])
+        self.end_combobox.grid(row=3, column=1, sticky="ew", pady=5, padx=5)
 
-        ttk.Label(self.form_frame, text="Your Name:").grid(row=3, column=0, sticky="w", pady=5, padx=5)
+        ttk.Label(self.form_frame, text="Your Name:").grid(row=4, column=0, sticky="w", pady=5, padx=5)
         self.name_entry = ttk.Entry(self.form_frame)
-        self.name_entry.grid(row=3, column=1, sticky="ew", pady=5, padx=5)
+        self.name_entry.grid(row=4, column=1, sticky="ew", pady=5, padx=5)
 
         self.book_button = ttk.Button(self.form_frame, text="Book Room", command=self.book_room)
-        self.book_button.grid(row=4, column=0, columnspan=2, pady=15)
+        self.book_button.grid(row=5, column=0, pady=15)
+        self.weekly_button = ttk.Button(self.form_frame, text="Book Weekly...", command=self.open_weekly_dialog)
+        self.weekly_button.grid(row=5, column=1, pady=15)
         self.form_frame.grid_columnconfigure(1, weight=1)
 
         self.bookings_frame = ttk.LabelFrame(self.main_frame, text="Current Bookings", padding="15")
@@ -104,9 +237,9 @@ class DiscussionRoomBookingApp(BookingManager):
         self.bookings_tree.column("Booked By", width=120, stretch=tk.YES)
         self.bookings_tree.column("Booked On", width=130, stretch=tk.NO, anchor=tk.CENTER)
 
-        tree_scrollbar = ttk.Scrollbar(self.bookings_frame, orient="vertical", command=self.bookings_tree.yview)
-        tree_scrollbar.pack(side="right", fill="y")
-        self.bookings_tree.configure(yscrollcommand=tree_scrollbar.set)
+        self.tree_scrollbar = ttk.Scrollbar(self.bookings_frame, orient="vertical", command=self.bookings_tree.yview)
+        self.tree_scrollbar.pack(side="right", fill="y")
+        self.bookings_tree.configure(yscrollcommand=self.on_tree_scroll)
 
         self.action_buttons_frame = ttk.Frame(self.main_frame, style="TFrame")
         self.action_buttons_frame.pack(pady=10, padx=10, fill=tk.X)
@@ -126,6 +259,21 @@ class DiscussionRoomBookingApp(BookingManager):
 
         master.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.update_bookings_display()
+        self.master.after(self.WATCH_INTERVAL_MS, self.watch_bookings)
+
+    def watch_bookings(self):
+        changes = self.poll_external_changes()
+        if changes is None:
+            self.reload_bookings_tree()
+            self.update_chart_if_open()
+        elif changes:
+            for old_booking, booking in changes:
+                if booking is None:
+                    self.hide_booking_row(old_booking["id"])
+                else:
+                    self.show_booking_row(booking)
+            self.update_chart_if_open()
+        self.master.after(self.WATCH_INTERVAL_MS, self.watch_bookings)
 
     def on_closing(self):
         self.save_bookings()
@@ -140,50 +288,89 @@ class DiscussionRoomBookingApp(BookingManager):
             self.edit_button.config(state="disabled")
             self.cancel_button.config(state="disabled")
 
-    def validate_booking_inputs(self, venue, date_str, time_slot, name):
-        if not venue or not date_str or not time_slot or not name:
-            messagebox.showwarning("Input Error", "All fields must be filled.")
-            return False
-
-        try:
-            booking_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            if booking_date < datetime.now().date():
-                messagebox.showwarning("Invalid Date", "Booking date cannot be in the past.")
-                return False
-        except ValueError:
-            messagebox.showwarning("Invalid Date", "Please enter date in YYYY-MM-DD format.")
-            return False
-        return True
+    def form_booking(self):
+        return {
+            "venue": self.venue_combobox.get(),
+            "date": self.date_entry.get(),
+            "start_time": self.start_combobox.get(),
+            "end_time": self.end_combobox.get(),
+            "name": self.name_entry.get().strip(),
+        }
 
     def book_room(self):
-        venue = self.venue_combobox.get()
-        date_str = self.date_entry.get()
-        time_slot = self.time_combobox.get()
-        name = self.name_entry.get().strip()
+        # The service validates the booking and reports any problem.
+        new_booking = self.add_booking(self.form_booking())
+        if new_booking is None:
+            return
+        self.show_booking_row(new_booking)
+        self.reset_form()
+        self.update_chart_if_open()
+        messagebox.showinfo("Booking Confirmed", "Your room has been successfully booked!")
+        self.name_entry.delete(0, tk.END)
 
-        if not self.validate_booking_inputs(venue, date_str, time_slot, name):
+    def open_weekly_dialog(self):
+        base_booking = self.form_booking()
+        if not self.check_booking(base_booking):
+            return
+        venue, date_str = base_booking["venue"], base_booking["date"]
+        start_time, end_time = base_booking["start_time"], base_booking["end_time"]
+
+        win = tk.Toplevel(self.master)
+        win.title("Recurring Booking")
+        win.transient(self.master)
+        frame = ttk.Frame(win, padding="15")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(frame, text=f"{venue}, {start_time} - {end_time}, starting {date_str}").grid(row=0, column=0, columnspan=2, sticky="w", pady=5)
+        ttk.Label(frame, text="Repeat every (weeks):").grid(row=1, column=0, sticky="w", pady=5, padx=5)
+        weeks_combobox = ttk.Combobox(frame, values=["1", "2", "3", "4"], state="readonly", width=5)
+        weeks_combobox.set("1")
+        weeks_combobox.grid(row=1, column=1, sticky="w", pady=5, padx=5)
+        ttk.Label(frame, text="Until (YYYY-MM-DD):").grid(row=2, column=0, sticky="w", pady=5, padx=5)
+        until_entry = ttk.Entry(frame)
+        until_entry.grid(row=2, column=1, sticky="ew", pady=5, padx=5)
+        ttk.Button(frame, text="Book All", command=lambda: self.book_weekly(
+            win, base_booking, until_entry.get(), int(weeks_combobox.get())
+        )).grid(row=3, column=0, columnspan=2, pady=10)
+
+    def book_weekly(self, win, base_booking, until_date_str, every_weeks):
+        try:
+            occurrences = weekly_occurrences(base_booking, until_date_str, every_weeks)
+        except ValueError:
+            messagebox.showwarning("Invalid Date", "Please enter date in YYYY-MM-DD format.", parent=win)
+            return
+        if not occurrences:
+            messagebox.showwarning("Invalid Date", "The end date must not be before the first booking.", parent=win)
             return
 
-        for booking in self.bookings:
-            if (booking["venue"] == venue and
-                booking["date"] == date_str and
-                booking["time_slot"] == time_slot):
-                messagebox.showerror("Booking Conflict", f"The room {venue} is already booked for {date_str} at {time_slot}.")
+        result = self.add_bookings(occurrences, parent=win)
+        if result is None:
+            return
+        booked, conflicts = result
+        if conflicts:
+            clash_dates = ", ".join(booking["date"] for booking, _ in conflicts[:10])
+            if len(conflicts) > 10:
+                clash_dates += ", ..."
+            free_count = len(occurrences) - len(conflicts)
+            if not free_count:
+                messagebox.showerror("Booking Conflict", f"All {len(occurrences)} dates are already booked: {clash_dates}", parent=win)
                 return
+            if not messagebox.askyesno(
+                "Booking Conflict",
+                f"{len(conflicts)} of {len(occurrences)} dates are already booked: {clash_dates}\n\n"
+                f"Book the other {free_count} dates?", parent=win):
+                return
+            result = self.add_bookings(occurrences, skip_conflicts=True, parent=win)
+            if result is None or not result[0]:
+                return
+            booked, conflicts = result
 
-        new_booking = {
-            "venue": venue,
-            "date": date_str,
-            "time_slot": time_slot,
-            "name": name,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self.bookings.append(new_booking)
-        self.save_bookings()
-        self.update_bookings_display()
+        for booking in booked:
+            self.show_booking_row(booking)
+        self.reset_form()
         self.update_chart_if_open()
-        messagebox.showinfo("Booking Confirmed", "Your room has been successfully booked!")
-        self.name_entry.delete(0, tk.END)
+        win.destroy()
+        messagebox.showinfo("Booking Confirmed", f"{len(booked)} weekly bookings were made.")
 
     def edit_booking_setup(self):
         selected_item = self.bookings_tree.selection()
@@ -191,52 +378,35 @@ class DiscussionRoomBookingApp(BookingManager):
             messagebox.showwarning("No Selection", "Please select a booking to edit.")
             return
 
-        item_id = selected_item[0]
-        self.editing_booking_idx = int(item_id)
-        booking_to_edit = self.bookings[self.editing_booking_idx]
+        booking_to_edit = self.get_booking(selected_item[0])
+        if booking_to_edit is None:
+            messagebox.showerror("Booking Not Found", "This booking no longer exists.")
+            return
+        self.editing_booking_id = selected_item[0]
 
         self.venue_combobox.set(booking_to_edit["venue"])
         self.date_entry.delete(0, tk.END)
         self.date_entry.insert(0, booking_to_edit["date"])
-        self.time_combobox.set(booking_to_edit["time_slot"])
+        self.start_combobox.set(booking_to_edit["start_time"])
+        self.end_combobox.set(booking_to_edit["end_time"])
         self.name_entry.delete(0, tk.END)
         self.name_entry.insert(0, booking_to_edit["name"])
 
         self.book_button.config(text="Save Changes", command=self.save_edited_booking)
-        self.form_frame.config(text=f"Edit Booking (ID: {self.editing_booking_idx + 1})")
+        self.weekly_button.config(state="disabled")
+        self.form_frame.config(text=f"Edit Booking (ID: {self.bookings_tree.index(self.editing_booking_id) + 1})")
         messagebox.showinfo("Edit Mode", "Form loaded with selected booking. Make changes and click 'Save Changes'.")
 
     def save_edited_booking(self):
-        if self.editing_booking_idx == -1:
+        if self.editing_booking_id is None:
             messagebox.showerror("Error", "No booking selected for editing. Please select one first.")
             return
 
-        venue = self.venue_combobox.get()
-        date_str = self.date_entry.get()
-        time_slot = self.time_combobox.get()
-        name = self.name_entry.get().strip()
-
-        if not self.validate_booking_inputs(venue, date_str, time_slot, name):
+        updated = self.update_booking(self.editing_booking_id, self.form_booking())
+        if updated is None:
             return
 
-        for i, booking in enumerate(self.bookings):
-            if i != self.editing_booking_idx:
-                if (booking["venue"] == venue and
-                    booking["date"] == date_str and
-                    booking["time_slot"] == time_slot):
-                    messagebox.showerror("Booking Conflict", f"The room {venue} is already booked for {date_str} at {time_slot} by another booking.")
-                    return
-
-        self.bookings[self.editing_booking_idx].update({
-            "venue": venue,
-            "date": date_str,
-            "time_slot": time_slot,
-            "name": name,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
-
-        self.save_bookings()
-        self.update_bookings_display()
+        self.show_booking_row(updated)
         self.update_chart_if_open()
         messagebox.showinfo("Edit Confirmed", "Booking successfully updated!")
         self.reset_form()
@@ -247,22 +417,25 @@ class DiscussionRoomBookingApp(BookingManager):
             messagebox.showwarning("No Selection", "Please select a booking to cancel.")
             return
 
-        item_id = selected_item[0]
-        booking_idx = int(item_id)
+        booking_id = selected_item[0]
+        booking = self.get_booking(booking_id)
+        if booking is None:
+            messagebox.showerror("Booking Not Found", "This booking no longer exists.")
+            return
 
         confirm = messagebox.askyesno(
             "Confirm Cancellation",
             f"Are you sure you want to cancel the booking for:\n"
-            f"Venue: {self.bookings[booking_idx]['venue']}\n"
-            f"Date: {self.bookings[booking_idx]['date']}\n"
-            f"Time: {self.bookings[booking_idx]['time_slot']}\n"
-            f"By: {self.bookings[booking_idx]['name']}?"
+            f"Venue: {booking['venue']}\n"
+            f"Date: {booking['date']}\n"
+            f"Time: {booking['time_slot']}\n"
+            f"By: {booking['name']}?"
         )
 
         if confirm:
-            del self.bookings[booking_idx]
-            self.save_bookings()
-            self.update_bookings_display()
+            if self.remove_booking(booking_id) is None:
+                return
+            self.hide_booking_row(booking_id)
             self.update_chart_if_open()
             messagebox.showinfo("Cancellation Confirmed", "Booking successfully cancelled.")
             self.reset_form()
@@ -271,32 +444,64 @@ class DiscussionRoomBookingApp(BookingManager):
         self.venue_combobox.set(self.venues[0])
         self.date_entry.delete(0, tk.END)
         self.date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
-        self.time_combobox.set(self.time_slots[0])
+        self.start_combobox.set(self.start_times[0])
+        self.end_combobox.set(self.end_times[0])
         self.name_entry.delete(0, tk.END)
         self.book_button.config(text="Book Room", command=self.book_room)
+        self.weekly_button.config(state="normal")
         self.form_frame.config(text="Book a Room")
-        self.editing_booking_idx = -1
+        self.editing_booking_id = None
         self.edit_button.config(state="disabled")
         self.cancel_button.config(state="disabled")
         self.bookings_tree.selection_remove(self.bookings_tree.selection())
 
     def update_bookings_display(self):
-        for i in self.bookings_tree.get_children():
-            self.bookings_tree.delete(i)
-
-        if not self.bookings:
-            pass
-        else:
-            for i, booking in enumerate(self.bookings):
-                self.bookings_tree.insert("", "end", iid=str(i), values=(
-                    booking["venue"],
-                    booking["date"],
-                    booking["time_slot"],
-                    booking["name"],
-                    booking["timestamp"]
-                ))
+        self.reload_bookings_tree()
         self.reset_form()
 
+    def reload_bookings_tree(self):
+        # Full reload; single changes go through show_booking_row / hide_booking_row.
+        self.bookings_tree.delete(*self.bookings_tree.get_children())
+        self.loaded_rows = 0
+        self.all_rows_loaded = False
+        self.load_more_bookings()
+
+    def load_more_bookings(self):
+        page = self.bookings_page(self.loaded_rows, self.PAGE_SIZE)
+        for booking in page:
+            self.bookings_tree.insert("", "end", iid=booking["id"], values=self.booking_row_values(booking))
+        self.loaded_rows += len(page)
+        self.all_rows_loaded = len(page) < self.PAGE_SIZE
+
+    def on_tree_scroll(self, first, last):
+        self.tree_scrollbar.set(first, last)
+        if not self.all_rows_loaded and float(last) > 0.9:
+            self.load_more_bookings()
+
+    @staticmethod
+    def booking_row_values(booking):
+        return (
+            booking["venue"],
+            booking["date"],
+            booking["time_slot"],
+            booking["name"],
+            booking["timestamp"]
+        )
+
+    def show_booking_row(self, booking):
+        """Insert or refresh one booking's row. New bookings that belong to a
+        page not loaded yet are left for load_more_bookings."""
+        if self.bookings_tree.exists(booking["id"]):
+            self.bookings_tree.item(booking["id"], values=self.booking_row_values(booking))
+        elif self.all_rows_loaded:
+            self.bookings_tree.insert("", "end", iid=booking["id"], values=self.booking_row_values(booking))
+            self.loaded_rows += 1
+
+    def hide_booking_row(self, booking_id):
+        if self.bookings_tree.exists(booking_id):
+            self.bookings_tree.delete(booking_id)
+            self.loaded_rows -= 1
+
     def update_chart_if_open(self):
         if self.availability_chart_window and self.availability_chart_window.winfo_exists():
             self.update_availability_chart_display(
@@ -340,85 +545,129 @@ class DiscussionRoomBookingApp(BookingManager):
             self.availability_chart_window.grab_release()
             self.availability_chart_window.destroy()
             self.availability_chart_window = None
+            self.availability_chart = None
 
     def update_availability_chart_display(self, chart_frame, selected_date_str):
-        for widget in chart_frame.winfo_children():
-            widget.destroy()
-
         try:
             selected_date = datetime.strptime(selected_date_str, "%Y-%m-%d").date()
         except ValueError:
             messagebox.showwarning("Invalid Date", "Please enter a valid date in YYYY-MM-DD format for the chart.")
             return
 
-        ttk.Label(chart_frame, text="", style="Gray.TLabel", relief="solid", borderwidth=1).grid(row=0, column=0, sticky="nsew", padx=1, pady=1)
-        for col_idx, time_slot in enumerate(self.time_slots):
-            ttk.Label(chart_frame, text=time_slot, style="Gray.TLabel", relief="solid", borderwidth=1).grid(row=0, column=col_idx + 1, sticky="nsew", padx=1, pady=1)
-            chart_frame.grid_columnconfigure(col_idx + 1, weight=1)
-
-        for row_idx, venue in enumerate(self.venues):
-            ttk.Label(chart_frame, text=venue, style="Gray.TLabel", relief="solid", borderwidth=1).grid(row=row_idx + 1, column=0, sticky="nsew", padx=1, pady=1)
-            chart_frame.grid_rowconfigure(row_idx + 1, weight=1)
-
-            for col_idx, time_slot in enumerate(self.time_slots):
-                is_booked = False
-                booked_by = ""
-                for booking in self.bookings:
-                    if (booking["venue"] == venue and
-                        booking["date"] == selected_date_str and
-                        booking["time_slot"] == time_slot):
-                        is_booked = True
-                        booked_by = booking["name"]
-                        break
-
-                display_text = "Booked" if is_booked else "Available"
-                tooltip_text = f"Venue: {venue}\nDate: {selected_date_str}\nTime: {time_slot}\n"
-                if is_booked:
-                    tooltip_text += f"Booked by: {booked_by}"
-                    bg_color =  "#ffadad"
-                else:
-                    bg_color = "#a8e6cf"
-
-                availability_label = ttk.Label(chart_frame, text=display_text, background=bg_color,
-                                               relief="solid", borderwidth=1)
-                availability_label.grid(row=row_idx + 1, column=col_idx + 1, sticky="nsew", padx=1, pady=1)
-                self.create_tooltip(availability_label, tooltip_text)
-
-    def create_tooltip(self, widget, text):
-        tooltip_window = None
-        id = None
-
-        def show_tooltip(event):
-            nonlocal tooltip_window, id
-            x, y, cx, cy = widget.bbox("insert")
-            x = x + widget.winfo_rootx() + 25
-            y = y + widget.winfo_rooty() + 20
-
-            tooltip_window = tk.Toplevel(widget)
-            tooltip_window.wm_overrideredirect(True)
-            tooltip_window.wm_geometry(f"+{x}+{y}")
-
-            label = tk.Label(tooltip_window, text=text, background="#ffffe0", relief="solid",
-                             borderwidth=1, wraplength=200, justify=tk.LEFT)
-            label.pack(ipadx=1)
-            id = widget.after(500, lambda: None)
-
-        def hide_tooltip(event):
-            nonlocal tooltip_window, id
-            if tooltip_window:
-                tooltip_window.destroy()
-                tooltip_window = None
-            if id:
-                widget.after_cancel(id)
-                id = None
-
-        widget.bind("<Enter>", show_tooltip)
-        widget.bind("<Leave>", hide_tooltip)
-
-def run_booking_app():
+        if self.availability_chart is None or self.availability_chart.frame is not chart_frame:
+            self.availability_chart = AvailabilityChart(chart_frame, self.describe_slot)
+        occupied = self.availability.bitmap(selected_date_str)
+        self.availability_chart.render(
+            self.venues, self.time_slots, selected_date_str,
+            lambda venue, time_slot: self.cell_state(occupied, venue, time_slot)
+        )
+
+    def cell_state(self, occupied, venue, time_slot):
+        if not self.room_config.is_open(venue, *time_slot):
+            return "closed"
+        return "booked" if occupied & self.availability.bit(venue, time_slot) else "available"
+
+    def describe_slot(self, venue, date_str, time_slot):
+        tooltip_text = f"Venue: {venue}\nDate: {date_str}\nTime: {slot_label(*time_slot)}\n"
+        booking = self.find_conflict(venue, date_str, *time_slot)
+        if booking:
+            tooltip_text += f"Booked by: {booking['name']}"
+        return tooltip_text
+
+
+class AvailabilityChart:
+    """Venue x time-slot grid that is built once per shape and then updated in place.
+
+    render() only reconfigures cells whose state changed, and every
+    cell shares one tooltip window whose text is worked out on hover.
+    widgets_created counts every label made, for measuring refresh cost
+    (see availability_benchmark.py).
+    """
+    STATE_LOOK = {
+        "booked": ("Booked", "#ffadad"),
+        "available": ("Available", "#a8e6cf"),
+        "closed": ("Closed", "#d0d0d0"),
+    }
+
+    def __init__(self, frame, describe):
+        # describe(venue, date_str, time_slot) returns the tooltip text for a cell.
+        self.frame = frame
+        self.describe = describe
+        self.shape = None
+        self.date_str = None
+        self.cells = {}
+        self.cell_of = {}
+        self.states = {}
+        self.widgets_created = 0
+        self.tooltip_window = None
+        self.tooltip_label = None
+
+    def _label(self, **options):
+        self.widgets_created += 1
+        return ttk.Label(self.frame, relief="solid", borderwidth=1, **options)
+
+    def _build(self, venues, time_slots):
+        for widget in self.frame.winfo_children():
+            widget.destroy()
+        self.cells = {}
+        self.cell_of = {}
+        self.states = {}
+
+        self._label(text="", style="Gray.TLabel").grid(row=0, column=0, sticky="nsew", padx=1, pady=1)
+        for col_idx, time_slot in enumerate(time_slots):
+            self._label(text=slot_label(*time_slot), style="Gray.TLabel").grid(row=0, column=col_idx + 1, sticky="nsew", padx=1, pady=1)
+            self.frame.grid_columnconfigure(col_idx + 1, weight=1)
+
+        for row_idx, venue in enumerate(venues):
+            self._label(text=venue, style="Gray.TLabel").grid(row=row_idx + 1, column=0, sticky="nsew", padx=1, pady=1)
+            self.frame.grid_rowconfigure(row_idx + 1, weight=1)
+            for col_idx, time_slot in enumerate(time_slots):
+                cell = self._label(text="")
+                cell.grid(row=row_idx + 1, column=col_idx + 1, sticky="nsew", padx=1, pady=1)
+                cell.bind("<Enter>", self.show_tooltip)
+                cell.bind("<Leave>", self.hide_tooltip)
+                self.cells[(venue, time_slot)] = cell
+                self.cell_of[str(cell)] = (venue, time_slot)
+        self.shape = (tuple(venues), tuple(time_slots))
+
+    def render(self, venues, time_slots, date_str, cell_state):
+        """Show date_str; cell_state(venue, time_slot) returns "booked", "available" or "closed"."""
+        if self.shape != (tuple(venues), tuple(time_slots)):
+            self._build(venues, time_slots)
+        self.date_str = date_str
+        for cell_key, cell in self.cells.items():
+            state = cell_state(*cell_key)
+            if self.states.get(cell_key) != state:
+                text, background = self.STATE_LOOK[state]
+                cell.configure(text=text, background=background)
+                self.states[cell_key] = state
+
+    def show_tooltip(self, event):
+        venue, time_slot = self.cell_of[str(event.widget)]
+        if self.tooltip_window is None or not self.tooltip_window.winfo_exists():
+            self.tooltip_window = tk.Toplevel(self.frame)
+            self.tooltip_window.wm_overrideredirect(True)
+            self.tooltip_label = tk.Label(self.tooltip_window, background="#ffffe0", relief="solid",
+                                          borderwidth=1, wraplength=200, justify=tk.LEFT)
+            self.tooltip_label.pack(ipadx=1)
+        x = event.widget.winfo_rootx() + 25
+        y = event.widget.winfo_rooty() + 20
+        self.tooltip_label.config(text=self.describe(venue, self.date_str, time_slot))
+        self.tooltip_window.wm_geometry(f"+{x}+{y}")
+        self.tooltip_window.deiconify()
+
+    def hide_tooltip(self, event):
+        if self.tooltip_window is not None and self.tooltip_window.winfo_exists():
+            self.tooltip_window.withdraw()
+
+
+def run_booking_app(bookings_file="bookings.json", server_url=None):
+    """Open the app on a local bookings file, or as a client of booking_server.py if server_url is given."""
     root = tk.Tk()
-    app = DiscussionRoomBookingApp(root)
+    service = BookingClient(server_url) if server_url else None
+    app = DiscussionRoomBookingApp(root, bookings_file, service)
     root.mainloop()
 
 if __name__ == "__main__":
-    run_booking_app()
\ No newline at end of file
+    # python room_booking.py [http://host:port]
+    run_booking_app(server_url=sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
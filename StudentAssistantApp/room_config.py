@@ -0,0 +1,71 @@
+"""Venue list, opening hours and booking grid, read from rooms.json.
+
+rooms.json looks like:
+
+    {
+        "slot_minutes": 60,
+        "venues": [
+            {"name": "Library Discussion Room", "open": "09:00", "close": "17:00"}
+        ]
+    }
+
+Times are "HH:MM". The grid runs from the earliest opening to the latest
+closing time in steps of slot_minutes; bookings may span several steps.
+"""
+import json
+import os
+
+DEFAULT_CONFIG = {
+    "slot_minutes": 60,
+    "venues": [
+        {"name": "Library Discussion Room", "open": "09:00", "close": "17:00"},
+        {"name": "Cyber Centre Meeting Room", "open": "09:00", "close": "17:00"},
+    ],
+}
+
+
+def to_minutes(time_str):
+    hours, minutes = time_str.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def to_time_str(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class RoomConfig:
+    def __init__(self, venues, slot_minutes=60):
+        # venues: list of {"name", "open", "close"} dicts, in display order
+        self.hours = {venue["name"]: (venue["open"], venue["close"]) for venue in venues}
+        self.venues = [venue["name"] for venue in venues]
+        self.slot_minutes = slot_minutes
+        first = min(to_minutes(opening) for opening, _ in self.hours.values())
+        last = max(to_minutes(closing) for _, closing in self.hours.values())
+        self.boundaries = [to_time_str(m) for m in range(first, last + 1, slot_minutes)]
+        # (start_time, end_time) for every step of the grid
+        self.time_slots = list(zip(self.boundaries, self.boundaries[1:]))
+
+    @classmethod
+    def load(cls, config_file="rooms.json"):
+        """Read config_file, falling back to DEFAULT_CONFIG if it does not exist.
+        Raises ValueError if the file is not valid."""
+        config = DEFAULT_CONFIG
+        if os.path.exists(config_file):
+            with open(config_file, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        try:
+            return cls(config["venues"], config.get("slot_minutes", 60))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid room configuration: {e}")
+
+    def as_dict(self):
+        """Return the configuration in the rooms.json layout."""
+        return {
+            "slot_minutes": self.slot_minutes,
+            "venues": [{"name": venue, "open": self.hours[venue][0], "close": self.hours[venue][1]}
+                       for venue in self.venues],
+        }
+
+    def is_open(self, venue, start_time, end_time):
+        opening, closing = self.hours[venue]
+        return opening <= start_time < end_time <= closing
@@ -0,0 +1,60 @@
+"""The calendar events and reminders shared by the apps of one process.
+
+The menu opens the calendar and the reminder app as often as the user
+likes, all in one process. Their data is read from disk the first time
+it is needed and then kept here, so reopening an app or switching
+between them does not parse the files again, and every open window works
+on the same objects.
+
+Both managers are Publishers: each change they make is passed to their
+subscribers as callback(change, item), so windows redraw when another
+window changes the data, and reminders made from a calendar event follow
+the event when it is moved or deleted.
+"""
+
+
+class Publisher:
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        """Call callback(change, item) after each change; return a function that stops it."""
+        self.subscribers.append(callback)
+        return lambda: self.subscribers.remove(callback) if callback in self.subscribers else None
+
+    def publish(self, change, item=None):
+        for callback in list(self.subscribers):
+            callback(change, item)
+
+
+_calendar_events = None
+_reminders = None
+
+
+def calendar_events():
+    """Return the process's event_manager.EventManager, creating it on first use."""
+    global _calendar_events
+    if _calendar_events is None:
+        from event_manager import EventManager
+        _calendar_events = EventManager()
+        _calendar_events.subscribe(_follow_calendar)
+    return _calendar_events
+
+
+def reminders():
+    """Return the process's simple_reminder_app.ReminderManager, creating it on first use."""
+    global _reminders
+    if _reminders is None:
+        from simple_reminder_app import ReminderManager
+        _reminders = ReminderManager()
+    return _reminders
+
+
+def _follow_calendar(change, item):
+    # Reminders set from a calendar event move or go with it.
+    if change == "removed":
+        reminders().follow_event(item, None)
+    elif change == "replaced":
+        reminders().follow_event(*item)
+    elif change == "rules":
+        reminders().follow_rule(item, _calendar_events.recurring.rules.get(item))
@@ -1,34 +1,331 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
 import datetime
+import bisect
 import calendar
 import json
 import os
+import threading
+import uuid
+import shared_store
+from event_rules import FREQUENCIES
+from file_utils import DebouncedWriter
+from reminder_scheduler import ReminderSchedule, minute_now, next_occurrence, seconds_until
+from shared_store import Publisher
 
-class ReminderManager:
+NO_REPEAT = "Does not repeat"
+LIST_ROWS = 10  # reminders shown at once
+RULE_KEYS = ("repeat", "start", "until", "interval")
+
+class ReminderManager(Publisher):
+    """Holds the reminders, as self.reminders, a dict of id -> {"id", "task", "time"}.
+
+    A repeating reminder also has "repeat", "start" and maybe "interval"
+    and "until" (see reminder_scheduler), and its "time" is its next
+    occurrence. A reminder set from a calendar event also has "event":
+    [date, time, name], or "rule": the id of a repeating event, and
+    follows that event (see shared_store). Each change is published as
+    ("added", reminder), ("updated", reminder) or ("removed", reminder).
+
+    self.order is a sorted list of (time, id), for showing the reminders in
+    time order a window at a time; it is kept sorted as reminders change
+    rather than sorted again. self.schedule (see reminder_scheduler) knows
+    which reminders are due next; those due before the manager was made are
+    taken as past, except that repeating ones move on to their next
+    occurrence.
+
+    Saving only marks the reminders changed. A background thread writes
+    them a moment after the last of a burst of changes (see
+    file_utils.DebouncedWriter), through a temp file and a rename, keeping
+    the file before as <file>.bak. A write that fails is tried again, and
+    self.writer.error says why it failed. self.lock is held while the
+    reminders are changed or copied for writing. If the file cannot be
+    read, it is moved to <file>.corrupt and the reminders are read from
+    <file>.bak; self.load_problem then says what happened.
+    """
     def __init__(self, reminder_file="reminders.json"):
+        Publisher.__init__(self)
         self.REMINDER_FILE = reminder_file
-        self.reminders = self.load_reminders()
+        self.lock = threading.Lock()
+        loaded = self.load_reminders()
+        self.writer = DebouncedWriter(reminder_file, self.snapshot, backup=reminder_file + ".bak")
+        now = minute_now()
+        self.reminders = {}
+        for reminder in loaded:
+            if "id" not in reminder:  # saved before reminders had ids
+                reminder["id"] = uuid.uuid4().hex
+                self.load_problem = self.load_problem or ""
+            if reminder.get("repeat") and reminder["time"] < now:
+                reminder["time"] = self._next_time(reminder, now) or reminder["time"]
+            self.reminders[reminder["id"]] = reminder
+        if self.load_problem is not None:
+            self.save_reminders()  # put back the file that was moved aside, or add the ids
+            self.load_problem = self.load_problem or None
+        self.order = sorted((reminder["time"], reminder_id) for reminder_id, reminder in self.reminders.items())
+        self.schedule = ReminderSchedule(self.reminders.values(), now)
 
     def load_reminders(self):
-        if os.path.exists(self.REMINDER_FILE):
-            with open(self.REMINDER_FILE, "r") as f:
-                return json.load(f)
-        return []
+        backup = self.REMINDER_FILE + ".bak"
+        problems = []
+        reminders = []
+        for path in (self.REMINDER_FILE, backup):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                if not isinstance(loaded, list) or not all(
+                        isinstance(r, dict) and isinstance(r.get("task"), str) and isinstance(r.get("time"), str)
+                        for r in loaded):
+                    raise ValueError("not a list of reminders")
+            except FileNotFoundError:  # a missing file is no reminders, not damage
+                break
+            except (OSError, ValueError) as e:
+                problems.append(f"{path} could not be read ({e}).")
+                if path == self.REMINDER_FILE:
+                    try:
+                        os.replace(path, path + ".corrupt")
+                        problems.append(f"It was moved to {path}.corrupt.")
+                    except OSError as move_error:
+                        problems.append(f"It could not be moved aside ({move_error}).")
+                continue
+            reminders = loaded
+            if problems:
+                problems.append(f"The reminders were restored from {path}.")
+            break
+        self.load_problem = "\n".join(problems) or None
+        return reminders
 
     def save_reminders(self):
-        with open(self.REMINDER_FILE, "w") as f:
-            json.dump(self.reminders, f, indent=4)
+        self.writer.changed()
+
+    def snapshot(self):
+        with self.lock:
+            reminders = [dict(reminder) for reminder in self.reminders.values()]
+        return json.dumps(reminders, indent=4)
+
+    def position(self, reminder_id):
+        """Return where a reminder is in self.order."""
+        return bisect.bisect_left(self.order, (self.reminders[reminder_id]["time"], reminder_id))
+
+    def _next_time(self, reminder, after):
+        """Return a repeating reminder's first occurrence after after, or None."""
+        return next_occurrence(reminder["start"], reminder["repeat"], reminder.get("until"), after,
+                               reminder.get("interval", 1))
+
+    def _timing(self, time_str, repeat=None, until=None, interval=1):
+        """Return the "time" and rule fields for a reminder at time_str,
+        repeating if repeat is given; raise ValueError if it never comes."""
+        timing = {"time": time_str}
+        if repeat:
+            timing.update(repeat=repeat, start=time_str)
+            if until:
+                timing["until"] = until
+            if interval > 1:
+                timing["interval"] = interval
+            now = minute_now()
+            if until and until < time_str[:10]:
+                raise ValueError("The reminder has no occurrences left.")
+            if time_str < now:
+                timing["time"] = self._next_time(timing, now)
+                if timing["time"] is None:
+                    raise ValueError("The reminder has no occurrences left.")
+        return timing
+
+    def _set(self, reminder, fields, clear_rule=False):
+        """Change a reminder's fields, keeping self.order and self.schedule in step."""
+        with self.lock:
+            del self.order[self.position(reminder["id"])]
+            if clear_rule:
+                for key in RULE_KEYS:
+                    reminder.pop(key, None)
+            reminder.update(fields)
+            bisect.insort(self.order, (reminder["time"], reminder["id"]))
+        self.schedule.add(reminder)
+
+    def _drop(self, reminder):
+        with self.lock:
+            del self.order[self.position(reminder["id"])]
+            del self.reminders[reminder["id"]]
+        self.schedule.discard(reminder)
+
+    def add(self, task, time_str, repeat=None, until=None, event=None, rule=None, interval=1):
+        reminder = {"id": uuid.uuid4().hex, "task": task, **self._timing(time_str, repeat, until, interval)}
+        if event:
+            reminder["event"] = list(event)
+        if rule:
+            reminder["rule"] = rule
+        with self.lock:
+            self.reminders[reminder["id"]] = reminder
+            bisect.insort(self.order, (reminder["time"], reminder["id"]))
+        self.schedule.add(reminder)
+        self.save_reminders()
+        self.publish("added", reminder)
+        return reminder
+
+    def update(self, reminder_id, task, time_str, repeat=None, until=None, interval=1):
+        reminder = self.reminders[reminder_id]
+        self._set(reminder, dict(task=task, **self._timing(time_str, repeat, until, interval)), clear_rule=True)
+        self.save_reminders()
+        self.publish("updated", reminder)
 
-class ReminderApp(ReminderManager):
-    def __init__(self, master):
-        super().__init__()
+    def remove(self, reminder_id):
+        reminder = self.reminders[reminder_id]
+        self._drop(reminder)
+        self.save_reminders()
+        self.publish("removed", reminder)
+        return reminder
+
+    def snooze(self, reminder_id, minutes):
+        """Put off the reminder's next occurrence; a repeating reminder keeps its rule."""
+        reminder = self.reminders[reminder_id]
+        old_time = datetime.datetime.strptime(reminder["time"], "%Y-%m-%d %H:%M")
+        self._set(reminder, {"time": (old_time + datetime.timedelta(minutes=minutes)).strftime("%Y-%m-%d %H:%M")})
+        self.save_reminders()
+        self.publish("updated", reminder)
+
+    def follow_event(self, old_event, new_event):
+        """Move the reminders set from calendar event old_event to new_event,
+        or remove them if new_event is None. Events are (date, time, name)."""
+        old_event = list(old_event)
+        followers = [r for r in self.reminders.values() if r.get("event") == old_event]
+        if not followers:
+            return
+        for reminder in followers:
+            if new_event:
+                date_str, time_str, name = new_event
+                self._set(reminder, {"task": name, "time": f"{date_str} {time_str}", "event": list(new_event)})
+            else:
+                self._drop(reminder)
+        self.save_reminders()
+        for reminder in followers:
+            self.publish("updated" if new_event else "removed", reminder)
+
+    def follow_rule(self, rule_id, rule):
+        """Bring the reminders set from repeating calendar event rule_id into
+        line with its event_rules.RecurrenceRule, or remove them if rule is None.
+
+        A reminder is timed again only if the rule's pattern changed, so a
+        snooze survives a skipped occurrence or a new name. If the
+        occurrence it waits for is skipped, it moves on to the next one.
+        """
+        followers = [r for r in self.reminders.values() if r.get("rule") == rule_id]
+        if not followers:
+            return
+        changes = []
+        for reminder in followers:
+            if rule is None:
+                self._drop(reminder)
+                changes.append(("removed", reminder))
+                continue
+            start = f"{rule.start} {rule.time}"
+            fields, clear_rule = {"task": rule.name}, False
+            if (reminder.get("repeat"), reminder.get("interval", 1), reminder.get("start"), reminder.get("until")) \
+                    != (rule.freq, rule.interval, start, rule.until):
+                try:
+                    fields.update(self._timing(start, rule.freq, rule.until, rule.interval))
+                    clear_rule = True
+                except ValueError:  # no occurrences left; it keeps its timing
+                    pass
+            elif reminder["time"][:10] in rule.exceptions and reminder["time"][11:] == rule.time:
+                fields["time"] = rule.next_after(reminder["time"])
+                if fields["time"] is None:  # that was the last occurrence
+                    self._drop(reminder)
+                    changes.append(("removed", reminder))
+                    continue
+            self._set(reminder, fields, clear_rule)
+            changes.append(("updated", reminder))
+        self.save_reminders()
+        for change, reminder in changes:
+            self.publish(change, reminder)
+
+    def take_due(self):
+        """Return (time, task) for the reminders that have come due since the
+        last call, oldest first. Repeating reminders move on to their next
+        occurrence and are scheduled again."""
+        due = self.schedule.pop_due()
+        fired = [(reminder["time"], reminder["task"]) for reminder in due]
+        repeating = [reminder for reminder in due if reminder.get("repeat")]
+        if repeating:
+            now = minute_now()
+            for reminder in repeating:
+                next_time = self._next_time(reminder, now)
+                if next_time:
+                    self._set(reminder, {"time": next_time})
+            self.save_reminders()
+            for reminder in repeating:
+                self.publish("updated", reminder)
+        return fired
+
+class ReminderApp:
+    """The reminder window, on the shared ReminderManager (see shared_store);
+    the list redraws whenever the manager publishes a change.
+
+    A single after() timer is kept armed for the next reminder due, and
+    re-armed on every change; when it goes off, every reminder due by then
+    is shown, so none is lost while the window was busy.
+
+    The list shows the reminders in time order, LIST_ROWS at a time from
+    self.top in the manager's order, with its own scrollbar; only those
+    rows are in the Listbox, and a redraw rewrites only the rows that
+    changed, so it costs the same however many reminders there are. The
+    selection is kept as a reminder id, so it stays on the same reminder
+    as the list moves.
+    """
+    def __init__(self, master, manager=None):
+        self.manager = manager or shared_store.reminders()
         self.master = master
         self.master.title("Simple Reminder App")
         self.master.geometry("450x420")
         self.master.configure(bg="#f0f8ff")
+        self.top = 0
+        self.selected_id = None
+        self.shown = []  # (id, row text) in the Listbox
         self.setup_ui()
+        self.timer = None
+        self.save_check = None
+        self.save_error = None  # the save error last shown
+        self.unsubscribe = self.manager.subscribe(self.on_reminders_changed)
+        self.master.bind("<Destroy>", self.on_destroy, add="+")
         self.check_reminders()
+        if self.manager.load_problem:
+            messagebox.showwarning("Reminders Recovered", self.manager.load_problem)
+            self.manager.load_problem = None
+
+    def on_reminders_changed(self, change, item):
+        self.refresh_listbox()
+        self.arm_timer()
+        if self.save_check is None:
+            # Look for a failed save once the background write has had its chance.
+            writer = self.manager.writer
+            self.save_check = self.master.after(int((writer.max_delay + 1) * 1000), self.check_saved)
+
+    def check_saved(self):
+        self.save_check = None
+        writer = self.manager.writer
+        error = writer.error
+        if error is not None and error is not self.save_error:
+            self.save_error = error
+            messagebox.showerror("Data Save Error",
+                                 f"Could not save reminders ({error}). They will be saved again shortly.")
+        if writer.pending():
+            self.save_check = self.master.after(int((writer.max_delay + 1) * 1000), self.check_saved)
+
+    def on_destroy(self, event):
+        if event.widget is self.master:
+            self.unsubscribe()
+            if self.timer:
+                self.master.after_cancel(self.timer)
+                self.timer = None
+            if self.save_check:
+                self.master.after_cancel(self.save_check)
+                self.save_check = None
+
+    def arm_timer(self):
+        if self.timer:
+            self.master.after_cancel(self.timer)
+            self.timer = None
+        next_due = self.manager.schedule.next_due()
+        if next_due is not None:
+            self.timer = self.master.after(int(seconds_until(next_due) * 1000) + 1, self.check_reminders)
 
     def open_calendar(self, entry):
         def pick_date(year, month):
@@ -68,8 +365,21 @@ class ReminderApp(ReminderManager):
             fg="#2f4f4f"
         )
         title_label.pack(pady=10)
-        self.listbox = tk.Listbox(self.master, width=55, height=10, font=("Arial", 11), bg="#ffffff")
-        self.listbox.pack(pady=10)
+        list_frame = tk.Frame(self.master, bg="#f0f8ff")
+        list_frame.pack(pady=10)
+        self.listbox = tk.Listbox(list_frame, width=53, height=LIST_ROWS, font=("Arial", 11), bg="#ffffff",
+                                  exportselection=False)
+        self.listbox.pack(side=tk.LEFT)
+        self.scrollbar = tk.Scrollbar(list_frame, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        self.listbox.bind("<<ListboxSelect>>", self.on_select)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll_to(self.top - e.delta // 120))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll_to(self.top - 1))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll_to(self.top + 1))
+        self.listbox.bind("<Up>", lambda e: self.on_arrow(-1))
+        self.listbox.bind("<Down>", lambda e: self.on_arrow(1))
+        for key, rows in (("<Prior>", -LIST_ROWS), ("<Next>", LIST_ROWS)):
+            self.listbox.bind(key, lambda e, rows=rows: self.scroll_to(self.top + rows) or "break")
         self.refresh_listbox()
         btn_frame = tk.Frame(self.master, bg="#f0f8ff")
         btn_frame.pack()
@@ -84,15 +394,72 @@ class ReminderApp(ReminderManager):
         quit_btn = tk.Button(btn_frame, text="Quit", width=15, bg="red", fg="white", command=self.quit_app)
         quit_btn.grid(row=1, column=0, columnspan=4, pady=10)
 
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.manager.order)))
+        elif action == "scroll":
+            self.scroll_to(self.top + int(amount) * (LIST_ROWS if unit == "pages" else 1))
+
+    def on_arrow(self, step):
+        """Move the selection up or down a reminder, moving the window along
+        when it is already on the first or last row shown."""
+        selection = self.listbox.curselection()
+        edge = 0 if step < 0 else len(self.shown) - 1
+        if not selection or selection[0] != edge:
+            return None  # the Listbox moves the selection itself
+        position = self.top + edge + step
+        if 0 <= position < len(self.manager.order):
+            self.selected_id = self.manager.order[position][1]
+            self.scroll_to(self.top + step)
+        return "break"
+
+    def scroll_to(self, top):
+        self.top = top
+        self.refresh_listbox()
+
+    def on_select(self, event):
+        selection = self.listbox.curselection()
+        if selection and selection[0] < len(self.shown):
+            self.selected_id = self.shown[selection[0]][0]
+
+    def selected(self, title):
+        """Return the id of the selected reminder, or warn and return None."""
+        if self.selected_id in self.manager.reminders:
+            return self.selected_id
+        messagebox.showwarning(title, "Please select a reminder.")
+        return None
+
     def refresh_listbox(self):
-        self.listbox.delete(0, tk.END)
-        for i, r in enumerate(self.reminders):
-            self.listbox.insert(tk.END, f"{i+1}. {r['task']} at {r['time']}")
+        order = self.manager.order
+        self.top = max(0, min(self.top, len(order) - LIST_ROWS))
+        rows = []
+        for number, (_, reminder_id) in enumerate(order[self.top:self.top + LIST_ROWS], self.top + 1):
+            r = self.manager.reminders[reminder_id]
+            repeat = f" (repeats {r['repeat']})" if r.get("repeat") else ""
+            rows.append((reminder_id, f"{number}. {r['task']} at {r['time']}{repeat}"))
+        for i, row in enumerate(rows):
+            if i >= len(self.shown):
+                self.listbox.insert(tk.END, row[1])
+            elif self.shown[i] != row:
+                self.listbox.delete(i)
+                self.listbox.insert(i, row[1])
+        if len(self.shown) > len(rows):
+            self.listbox.delete(len(rows), tk.END)
+        self.shown = rows
+        self.listbox.selection_clear(0, tk.END)
+        for i, (reminder_id, _) in enumerate(rows):
+            if reminder_id == self.selected_id:
+                self.listbox.selection_set(i)
+                self.listbox.activate(i)
+        if order:
+            self.scrollbar.set(self.top / len(order), (self.top + len(rows)) / len(order))
+        else:
+            self.scrollbar.set(0, 1)
 
-    def validate_datetime(self, time_str):
+    def validate_datetime(self, time_str, allow_past=False):
         try:
             dt = datetime.datetime.strptime(time_str, "%Y-%m-%d %H:%M")
-            if dt < datetime.datetime.now():
+            if dt < datetime.datetime.now() and not allow_past:
                 return False
             return True
         except ValueError:
@@ -101,7 +468,7 @@ class ReminderApp(ReminderManager):
     def add_reminder(self):
         win = tk.Toplevel(self.master)
         win.title("Add Reminder")
-        win.geometry("300x280")
+        win.geometry("300x380")
         win.configure(bg="#f0f8ff")
         tk.Label(win, text="Task:", bg="#f0f8ff").pack(pady=5)
         task_entry = tk.Entry(win, width=30)
@@ -121,33 +488,48 @@ class ReminderApp(ReminderManager):
         minute_combo = ttk.Combobox(time_frame, width=5, textvariable=minute_var, values=[f"{i:02d}" for i in range(60)])
         minute_combo.set("00")
         minute_combo.pack(side=tk.LEFT, padx=2)
+        repeat_var = self.repeat_picker(win, None)
         def save_new_reminder():
             task = task_entry.get()
             date_str = date_entry.get()
             hour = hour_var.get()
             minute = minute_var.get()
             time_str = f"{date_str} {hour}:{minute}"
-            if task and self.validate_datetime(time_str):
-                self.reminders.append({"task": task, "time": time_str})
-                self.save_reminders()
-                self.refresh_listbox()
+            repeat = self.repeat_choice(repeat_var)
+            if task and self.validate_datetime(time_str, allow_past=bool(repeat)):
+                try:
+                    self.manager.add(task, time_str, repeat)
+                except ValueError as e:
+                    messagebox.showerror("Invalid Input", str(e))
+                    return
                 messagebox.showinfo("Reminder Added", "Your reminder was added successfully!")
                 win.destroy()
             else:
                 messagebox.showerror("Invalid Input", "Please enter a valid task and a future date/time.")
         tk.Button(win, text="Save", bg="#90ee90", command=save_new_reminder).pack(pady=10)
 
+    def repeat_picker(self, win, repeat):
+        """Add a Repeat combobox to a dialog and return its variable."""
+        tk.Label(win, text="Repeat:", bg="#f0f8ff").pack(pady=5)
+        repeat_var = tk.StringVar(value=repeat.capitalize() if repeat else NO_REPEAT)
+        ttk.Combobox(win, width=16, textvariable=repeat_var, state="readonly",
+                     values=[NO_REPEAT] + [freq.capitalize() for freq in FREQUENCIES]).pack(pady=5)
+        return repeat_var
+
+    def repeat_choice(self, repeat_var):
+        repeat = repeat_var.get()
+        return None if repeat == NO_REPEAT else repeat.lower()
+
     def edit_reminder(self):
-        selection = self.listbox.curselection()
-        if selection:
-            idx = selection[0]
-            current_task = self.reminders[idx]["task"]
-            current_time = self.reminders[idx]["time"]
+        reminder_id = self.selected("Edit Reminder")
+        if reminder_id:
+            current_task = self.manager.reminders[reminder_id]["task"]
+            current_time = self.manager.reminders[reminder_id]["time"]
             current_date, current_clock = current_time.split(" ")
             current_hour, current_minute = current_clock.split(":")
             win = tk.Toplevel(self.master)
             win.title("Edit Reminder")
-            win.geometry("300x280")
+            win.geometry("300x380")
             win.configure(bg="#f0f8ff")
             tk.Label(win, text="Task:", bg="#f0f8ff").pack(pady=5)
             task_entry = tk.Entry(win, width=30)
@@ -167,55 +549,56 @@ class ReminderApp(ReminderManager):
             hour_combo.pack(side=tk.LEFT, padx=2)
             minute_combo = ttk.Combobox(time_frame, width=5, textvariable=minute_var, values=[f"{i:02d}" for i in range(60)])
             minute_combo.pack(side=tk.LEFT, padx=2)
+            current_repeat = self.manager.reminders[reminder_id].get("repeat")
+            current_until = self.manager.reminders[reminder_id].get("until")
+            current_interval = self.manager.reminders[reminder_id].get("interval", 1)
+            repeat_var = self.repeat_picker(win, current_repeat)
             def save_edit_reminder():
                 task = task_entry.get()
                 date_str = date_entry.get()
                 hour = hour_var.get()
                 minute = minute_var.get()
                 new_time = f"{date_str} {hour}:{minute}"
-                if task and self.validate_datetime(new_time):
-                    self.reminders[idx] = {"task": task, "time": new_time}
-                    self.save_reminders()
-                    self.refresh_listbox()
+                repeat = self.repeat_choice(repeat_var)
+                if task and self.validate_datetime(new_time, allow_past=bool(repeat)):
+                    try:
+                        same_rule = repeat == current_repeat
+                        self.manager.update(reminder_id, task, new_time, repeat, current_until if same_rule else None,
+                                            current_interval if same_rule else 1)
+                    except (ValueError, KeyError) as e:  # KeyError: deleted meanwhile
+                        messagebox.showerror("Invalid Input", str(e) if isinstance(e, ValueError)
+                                             else "The reminder has been deleted.")
+                        return
                     win.destroy()
                 else:
                     messagebox.showerror("Invalid Input", "Please enter a valid task and a future date/time.")
             tk.Button(win, text="Save", bg="#87ceeb", command=save_edit_reminder).pack(pady=10)
-        else:
-            messagebox.showwarning("Edit Reminder", "Please select a reminder.")
 
     def delete_reminder(self):
-        selection = self.listbox.curselection()
-        if selection:
-            idx = selection[0]
-            self.reminders.pop(idx)
-            self.save_reminders()
-            self.refresh_listbox()
-        else:
-            messagebox.showwarning("Delete Reminder", "Please select a reminder.")
+        reminder_id = self.selected("Delete Reminder")
+        if reminder_id:
+            self.selected_id = None
+            self.manager.remove(reminder_id)
 
     def snooze_reminder(self):
-        selection = self.listbox.curselection()
-        if selection:
-            idx = selection[0]
+        reminder_id = self.selected("Snooze Reminder")
+        if reminder_id:
             snooze_mins = simpledialog.askinteger("Snooze Reminder", "Enter snooze minutes:", minvalue=1)
-            if snooze_mins:
-                old_time = datetime.datetime.strptime(self.reminders[idx]["time"], "%Y-%m-%d %H:%M")
-                new_time = old_time + datetime.timedelta(minutes=snooze_mins)
-                self.reminders[idx]["time"] = new_time.strftime("%Y-%m-%d %H:%M")
-                self.save_reminders()
-                self.refresh_listbox()
-        else:
-            messagebox.showwarning("Snooze Reminder", "Please select a reminder.")
+            if snooze_mins and reminder_id in self.manager.reminders:
+                self.manager.snooze(reminder_id, snooze_mins)
 
     def check_reminders(self):
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-        for r in self.reminders:
-            if r["time"] == now:
-                messagebox.showinfo("Reminder", f"🔔 {r['task']} (at {r['time']})")
-        self.master.after(60000, self.check_reminders)
+        self.timer = None
+        due = self.manager.take_due()
+        self.arm_timer()
+        if due:
+            messagebox.showinfo("Reminder", "\n".join(f"🔔 {task} (at {time_str})" for time_str, task in due))
 
     def quit_app(self):
+        try:
+            self.manager.writer.flush()
+        except OSError as e:
+            messagebox.showerror("Data Save Error", f"Could not save reminders ({e}).")
         self.master.destroy()
 
 def run_reminder_app():
@@ -0,0 +1,108 @@
+"""Single-edit benchmark for timetable_store.MonthShards and MonthBatch.
+
+    python timetable_benchmark.py [--sizes 1000,10000,100000,1000000] [--years 10] [--runs 20]
+
+Fills a temporary timetable.d with a MonthBatch up to each size in turn,
+events spread evenly over the years, then times a single add, edit and
+delete in a random month two ways:
+- reading the month and writing it back with write_month, the way
+  EventManager.save_events does;
+- through a MonthBatch of one row, the way imports do.
+Each run adds a row, edits it and deletes it again, so the store keeps
+its size. An edit rewrites only its month's file, so its cost follows
+the events per month, not the total. It exits with status 1 if a month
+does not end up as it started.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from timetable_store import MonthShards
+
+NAMES = 5300  # distinct event names
+
+
+def event(n, years):
+    """Return the n-th synthetic event; every month gets the same share."""
+    month = n % (years * 12)
+    date_str = f"{2025 + month // 12:04d}-{month % 12 + 1:02d}-{n // (years * 12) % 28 + 1:02d}"
+    return date_str, f"{8 + n % 12:02d}:{'30' if n % 24 >= 12 else '00'}", f"Course {n % NAMES} lecture"
+
+
+def write_month_edit(shards, month_key, change):
+    rows = list(shards.read_month(month_key))
+    change(rows)
+    rows.sort()
+    shards.write_month(month_key, rows)
+
+
+def replace(rows, old, new):
+    rows.remove(old)
+    rows.append(new)
+
+
+def batch_edit(shards, add=None, remove=None):
+    batch = shards.batch()
+    if remove is not None:
+        batch.remove(*remove)
+    if add is not None:
+        batch.add(*add)
+    batch.commit()
+
+
+def timed(action):
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time single timetable edits as the number of events grows.")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    rng = random.Random(1)
+
+    print(f"{'events':>8} {'per month':>9}   {'write_month add/edit/del ms':>29}     "
+          f"{'MonthBatch add/edit/del ms':>29}")
+    with tempfile.TemporaryDirectory() as workdir:
+        shards = MonthShards(os.path.join(workdir, "timetable.d"), os.path.join(workdir, "timetable.txt"))
+        filled = 0
+        for size in sizes:
+            started = time.perf_counter()
+            batch = shards.batch()
+            for n in range(filled, size):
+                batch.add(*event(n, args.years))
+            batch.commit()
+            fill = time.perf_counter() - started
+            filled = size
+            months = shards.months()
+
+            totals = [0.0] * 6
+            for run in range(args.runs):
+                month_key = rng.choice(months)
+                before = sorted(shards.read_month(month_key))
+                added = (f"{month_key}-{rng.randrange(1, 29):02d}", "07:00", f"Benchmark {run}")
+                edited = (added[0], "07:30", added[2])
+                totals[0] += timed(lambda: write_month_edit(shards, month_key, lambda rows: rows.append(added)))
+                totals[1] += timed(lambda: write_month_edit(shards, month_key,
+                                                            lambda rows: replace(rows, added, edited)))
+                totals[2] += timed(lambda: write_month_edit(shards, month_key, lambda rows: rows.remove(edited)))
+                totals[3] += timed(lambda: batch_edit(shards, add=added))
+                totals[4] += timed(lambda: batch_edit(shards, add=edited, remove=added))
+                totals[5] += timed(lambda: batch_edit(shards, remove=edited))
+                if sorted(shards.read_month(month_key)) != before:
+                    print(f"FAIL: {month_key} changed after adding, editing and deleting one event")
+                    sys.exit(1)
+            means = [total / args.runs * 1000 for total in totals]
+            print(f"{size:8} {size // len(months):9}   {means[0]:9.2f} {means[1]:9.2f} {means[2]:9.2f}     "
+                  f"{means[3]:9.2f} {means[4]:9.2f} {means[5]:9.2f}   (filled in {fill:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Reading and writing timetable.txt.
+
+Each line is "YYYY-MM-DD | HH:MM | name". The name is everything after the
+second separator, so it may itself contain " | ". Backslashes, newlines
+and carriage returns in a name are written as \\\\, \\n and \\r.
+
+The file is read in large binary blocks. Lines outside the requested
+date range are skipped by comparing their first bytes, without decoding or
+splitting them. Lines that cannot be parsed are skipped and reported as
+BadRow rather than stopping the load. The first scan also records which
+blocks hold which months, so later months are loaded by reading only
+those blocks.
+"""
+import collections
+import os
+import re
+from datetime import date
+
+BLOCK_SIZE = 1 << 20
+SEPARATOR = " | "
+TIME_RE = re.compile(r"([01]\d|2[0-3]):[0-5]\d")
+DATE_PREFIX_RE = re.compile(rb"\d{4}-\d\d-\d\d")
+
+BadRow = collections.namedtuple("BadRow", "path line_no text reason")
+
+
+def escape_name(name):
+    return name.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def unescape_name(text):
+    if "\\" not in text:
+        return text
+    out = []
+    chars = iter(text)
+    for ch in chars:
+        if ch == "\\":
+            ch = next(chars, "\\")
+            ch = {"n": "\n", "r": "\r", "\\": "\\"}.get(ch, "\\" + ch)
+        out.append(ch)
+    return "".join(out)
+
+
+def format_event(date_str, time_str, name):
+    return f"{date_str}{SEPARATOR}{time_str}{SEPARATOR}{escape_name(name)}\n"
+
+
+def parse_line(text):
+    """Return (date_str, time_str, name) for one line, or raise ValueError saying what is wrong."""
+    parts = text.split(SEPARATOR, 2)
+    if len(parts) != 3:
+        raise ValueError("expected 'date | time | name'")
+    date_str, time_str, name = parts
+    try:
+        if len(date_str) != 10:
+            raise ValueError
+        date.fromisoformat(date_str)
+    except ValueError:
+        raise ValueError(f"invalid date {date_str!r}")
+    if not TIME_RE.fullmatch(time_str):
+        raise ValueError(f"invalid time {time_str!r}")
+    if not name.strip():
+        raise ValueError("missing event name")
+    return date_str, time_str, unescape_name(name)
+
+
+def iter_blocks(f, block_size=BLOCK_SIZE):
+    """Yield (offset, bytes) for consecutive blocks of f that end on a line break
+    (except perhaps the last)."""
+    offset = f.tell()
+    carry = b""
+    while True:
+        data = f.read(block_size)
+        if not data:
+            if carry:
+                yield offset, carry
+            return
+        data = carry + data
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            carry = data
+            continue
+        block, carry = data[:cut], data[cut:]
+        yield offset, block
+        offset += len(block)
+
+
+def block_lines(block):
+    lines = block.split(b"\n")
+    if lines[-1] == b"":
+        lines.pop()
+    return [line[:-1] if line.endswith(b"\r") else line for line in lines]
+
+
+class TimetableFile:
+    def __init__(self, path, block_size=BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+        # month_blocks: b"YYYY-MM" -> [(offset, length, first line number)] of
+        # the blocks holding that month, valid while the file keeps signature.
+        self.month_blocks = None
+        self.signature = None
+
+    def _signature(self):
+        st = os.stat(self.path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def read(self, start=None, end=None, bad_rows=None):
+        """Yield (date_str, time_str, name) for every row with start <= date <= end.
+
+        start and end are "YYYY-MM-DD" strings; either may be None. Rows that
+        cannot be parsed are appended to bad_rows, if given, as BadRow.
+        """
+        if not os.path.exists(self.path):
+            return
+        low = start.encode("ascii") if start else b""
+        high = end.encode("ascii") if end else b"\xff"
+        if self.month_blocks is None or self.signature != self._signature():
+            yield from self._scan(low, high, bad_rows)
+        else:
+            yield from self._read_indexed(low, high, bad_rows)
+
+    def _rows(self, lines, first_line, low, high, bad_rows, scanning=False):
+        for line_no, line in enumerate(lines, first_line):
+            if not line:
+                continue
+            if not (low <= line[:10] <= high):
+                # A row without a date belongs to no range, so the full scan
+                # is the only chance to report it.
+                if scanning and bad_rows is not None and not DATE_PREFIX_RE.match(line):
+                    bad_rows.append(BadRow(self.path, line_no, line.decode("utf-8", "replace"), "missing date"))
+                continue
+            try:
+                yield parse_line(line.decode("utf-8"))
+            except ValueError as e:
+                if bad_rows is not None:
+                    bad_rows.append(BadRow(self.path, line_no, line.decode("utf-8", "replace"), str(e)))
+
+    def _scan(self, low, high, bad_rows):
+        # Reads the whole file, indexing it on the way.
+        month_blocks = {}
+        line_no = 1
+        with open(self.path, "rb") as f:
+            signature = self._signature()
+            for offset, block in iter_blocks(f, self.block_size):
+                lines = block_lines(block)
+                for month in {line[:7] for line in lines if line}:
+                    month_blocks.setdefault(month, []).append((offset, len(block), line_no))
+                yield from self._rows(lines, line_no, low, high, bad_rows, scanning=True)
+                line_no += len(lines)
+        self.month_blocks, self.signature = month_blocks, signature
+
+    def _read_indexed(self, low, high, bad_rows):
+        low_month, high_month = low[:7], high[:7]
+        blocks = sorted({block for month, month_blocks in self.month_blocks.items()
+                         if low_month <= month <= high_month for block in month_blocks})
+        with open(self.path, "rb") as f:
+            for offset, length, first_line in blocks:
+                f.seek(offset)
+                yield from self._rows(block_lines(f.read(length)), first_line, low, high, bad_rows)
+
+    def rewrite(self, out, skip_months, rows):
+        """Write the file anew to the binary file out: every line whose month is
+        not in skip_months ("YYYY-MM" strings) is copied as it is, then rows
+        ((date_str, time_str, name) for the skipped months) are added. Lines
+        of skipped months that do not parse are kept, so nothing unreadable
+        is lost by saving."""
+        skip = {month.encode("ascii") for month in skip_months}
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for _, block in iter_blocks(f, self.block_size):
+                    for line in block_lines(block):
+                        if not line:
+                            continue
+                        if line[:7] in skip:
+                            try:
+                                parse_line(line.decode("utf-8"))
+                                continue
+                            except ValueError:
+                                pass
+                        out.write(line + b"\n")
+        for row in rows:
+            out.write(format_event(*row).encode("utf-8"))
+        self.month_blocks = None
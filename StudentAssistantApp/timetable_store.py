@@ -0,0 +1,188 @@
+"""Calendar events stored as one file per month.
+
+timetable.d/2025-09.txt holds September 2025's events, one row per line
+in the timetable.txt format (see timetable_format). Saving an edit
+rewrites only that month's file, through a temp file and an atomic
+rename, so its cost depends on how busy the month is, not on how many
+events there are in total. Opening a month reads just its own file.
+
+An old single timetable.txt is split into month files the first time the
+store is used, in one streaming pass, and then renamed to
+timetable.txt.migrated. Rows of it without a readable date are kept in
+timetable.d/unreadable.txt.
+
+Bulk changes (imports) go through a MonthBatch: rows are spilled to
+per-month staging files as they come, then each month touched is
+rewritten once.
+"""
+import collections
+import os
+import shutil
+from datetime import datetime
+
+from file_utils import atomic_writer
+from timetable_format import DATE_PREFIX_RE, BadRow, TimetableFile, block_lines, format_event, iter_blocks
+
+UNREADABLE = "unreadable"
+MIGRATION_BUFFER = 8 << 20  # bytes of rows held before they are flushed to month files
+
+
+class MonthShards:
+    def __init__(self, directory="timetable.d", legacy_file="timetable.txt"):
+        self.directory = directory
+        self.legacy_file = legacy_file
+        self.files = {}  # month key -> TimetableFile
+
+    def path(self, month_key):
+        return os.path.join(self.directory, f"{month_key}.txt")
+
+    def _file(self, month_key):
+        if month_key not in self.files:
+            self.files[month_key] = TimetableFile(self.path(month_key))
+        return self.files[month_key]
+
+    def months(self):
+        """Return the sorted month keys ("YYYY-MM") that have a file."""
+        self.migrate()
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(self.directory)
+                      if name.endswith(".txt") and name != f"{UNREADABLE}.txt")
+
+    def read_month(self, month_key, bad_rows=None):
+        """Yield (date_str, time_str, name) for every row of one month."""
+        self.migrate(bad_rows)
+        yield from self._file(month_key).read(bad_rows=bad_rows)
+
+    def read(self, start=None, end=None, bad_rows=None):
+        """Yield rows with start <= date <= end, month by month."""
+        self.migrate(bad_rows)
+        for month_key in self.months():
+            if (start is None or month_key >= start[:7]) and (end is None or month_key <= end[:7]):
+                yield from self._file(month_key).read(start, end, bad_rows)
+
+    def write_month(self, month_key, rows):
+        """Replace one month's rows. Lines of its file that could not be read are kept."""
+        self.migrate()
+        os.makedirs(self.directory, exist_ok=True)
+        shard = self._file(month_key)
+        with atomic_writer(shard.path, "wb") as f:
+            shard.rewrite(f, [month_key], rows)
+            empty = f.tell() == 0
+        if empty:
+            os.remove(shard.path)
+
+    def batch(self):
+        return MonthBatch(self)
+
+    def migrate(self, bad_rows=None):
+        """Split the legacy single file into month files, once."""
+        if os.path.isdir(self.directory) or not os.path.exists(self.legacy_file):
+            return
+        tmp_dir = self.directory + ".tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        for name in os.listdir(tmp_dir):  # left over from an interrupted migration
+            os.remove(os.path.join(tmp_dir, name))
+        buffers, buffered = {}, 0
+        dates = {}  # date prefix -> month key, or UNREADABLE if it is not a real date
+        with open(self.legacy_file, "rb") as f:
+            line_no = 0
+            for _, block in iter_blocks(f):
+                for line in block_lines(block):
+                    line_no += 1
+                    if not line:
+                        continue
+                    month_key = dates.get(line[:10])
+                    if month_key is None:
+                        month_key = dates[line[:10]] = self._month_key(line)
+                    if month_key == UNREADABLE and bad_rows is not None:
+                        bad_rows.append(self._bad_row(line_no, line))
+                    buffers.setdefault(month_key, []).append(line + b"\n")
+                    buffered += len(line) + 1
+                if buffered > MIGRATION_BUFFER:
+                    self._flush(tmp_dir, buffers)
+                    buffers, buffered = {}, 0
+        self._flush(tmp_dir, buffers)
+        for name in os.listdir(tmp_dir):
+            with open(os.path.join(tmp_dir, name), "rb") as f:
+                os.fsync(f.fileno())
+        os.replace(tmp_dir, self.directory)
+        os.replace(self.legacy_file, self.legacy_file + ".migrated")
+
+    @staticmethod
+    def _month_key(line):
+        if not DATE_PREFIX_RE.match(line):
+            return UNREADABLE
+        try:
+            datetime.strptime(line[:10].decode("ascii"), "%Y-%m-%d")
+        except ValueError:  # e.g. 2025-13-01
+            return UNREADABLE
+        return line[:7].decode("ascii")
+
+    def _bad_row(self, line_no, line):
+        reason = "invalid date" if DATE_PREFIX_RE.match(line) else "missing date"
+        return BadRow(self.legacy_file, line_no, line.decode("utf-8", "replace"), reason)
+
+    @staticmethod
+    def _flush(tmp_dir, buffers):
+        for month_key, lines in buffers.items():
+            with open(os.path.join(tmp_dir, f"{month_key}.txt"), "ab") as f:
+                f.writelines(lines)
+
+
+class MonthBatch:
+    """Rows to add to and take out of many months, written by commit().
+
+    Added rows are held in memory only up to MIGRATION_BUFFER bytes at a
+    time, then appended to staging files, one per month, under
+    <directory>.batch.
+    """
+    def __init__(self, shards):
+        self.shards = shards
+        self.tmp_dir = shards.directory + ".batch"
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)  # left over from an interrupted batch
+        self.buffers, self.buffered = {}, 0
+        self.removals = {}  # month key -> Counter of rows
+        self.staged = set()
+
+    def add(self, date_str, time_str, name):
+        line = format_event(date_str, time_str, name).encode("utf-8")
+        self.buffers.setdefault(date_str[:7], []).append(line)
+        self.buffered += len(line)
+        if self.buffered > MIGRATION_BUFFER:
+            self._flush()
+
+    def remove(self, date_str, time_str, name):
+        """Take out one copy of a row, if the month has it."""
+        self.removals.setdefault(date_str[:7], collections.Counter())[(date_str, time_str, name)] += 1
+
+    def _flush(self):
+        if self.buffers:
+            os.makedirs(self.tmp_dir, exist_ok=True)
+            MonthShards._flush(self.tmp_dir, self.buffers)
+            self.staged.update(self.buffers)
+        self.buffers, self.buffered = {}, 0
+
+    def commit(self):
+        """Rewrite every month touched, once each, and return their keys.
+        Added rows the month already has are not added again."""
+        self._flush()
+        months = sorted(self.staged | set(self.removals))
+        for month_key in months:
+            removals = self.removals.get(month_key, collections.Counter())
+            rows = []
+            for row in self.shards.read_month(month_key):
+                if removals[row]:
+                    removals[row] -= 1
+                else:
+                    rows.append(row)
+            present = set(rows)
+            if month_key in self.staged:
+                for row in TimetableFile(os.path.join(self.tmp_dir, f"{month_key}.txt")).read():
+                    if row not in present:
+                        rows.append(row)
+                        present.add(row)
+            rows.sort()
+            self.shards.write_month(month_key, rows)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        return months